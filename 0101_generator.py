@@ -1,7 +1,12 @@
 import time
 import random
 from math import log, sqrt
-from typing import Generator, Tuple
+from typing import Generator, Optional, Tuple
+
+import numpy as np
+
+from escape_time import mandelbrot
+from tile_renderer import TiledRenderer
 
 def mandelbrot_generator(c: complex, max_iter: int = 100) -> Generator[Tuple[int, complex], None, int]:
     """
@@ -64,9 +69,13 @@ def color_generator(iterations: int, max_iter: int) -> Tuple[int, int, int]:
 def render_mandelbrot(width: int, height: int, 
                       xmin: float, xmax: float, 
                       ymin: float, ymax: float,
-                      max_iter: int = 100) -> None:
+                      max_iter: int = 100,
+                      vectorized: bool = True,
+                      renderer: Optional[TiledRenderer] = None) -> None:
     """
-    Renders the Mandelbrot set using generator functions.
+    Renders the Mandelbrot set, either with the vectorized escape-time engine
+    or pixel by pixel with the generator functions. A TiledRenderer spreads
+    the vectorized render over its worker processes.
     """
     print(f"Rendering Mandelbrot set ({width}x{height})...")
     start_time = time.time()
@@ -75,6 +84,22 @@ def render_mandelbrot(width: int, height: int,
     chars = " .:-=+*#%@"
     output = []
     
+    if vectorized:
+        # The generator's last yielded n is one less than the escape count
+        if renderer is not None:
+            counts = renderer.render(xmin, xmax, ymin, ymax, width, height, max_iter,
+                                     endpoint=False)
+        else:
+            counts = mandelbrot(xmin, xmax, ymin, ymax, width, height, max_iter,
+                                endpoint=False)
+        iterations = counts - 1
+        char_idx = np.minimum(iterations * len(chars) // max_iter, len(chars) - 1)
+        lookup = np.array(list(chars))
+        output = [''.join(row) + '\n' for row in lookup[char_idx]]
+        print(''.join(output))
+        print(f"Rendered in {time.time() - start_time:.2f} seconds")
+        return
+    
     for x, y, c in pixel_generator(width, height, xmin, xmax, ymin, ymax):
         gen = mandelbrot_generator(c, max_iter)
         iterations = -1
@@ -124,7 +149,7 @@ def interesting_points_generator() -> Generator[Tuple[float, float, str], None,
     while True:
         yield random.choice(points)
 
-def main():
+def main(workers: int = 1):
     print("Mandelbrot Set Explorer")
     print("=======================")
     
@@ -140,15 +165,17 @@ def main():
     print("\nExploring interesting points...")
     points_gen = interesting_points_generator()
     
-    for i in range(3):
-        x, y, name = next(points_gen)
-        print(f"\nZooming into {name} at ({x:.4f}, {y:.4f})")
-        
-        zoom_gen = zoom_generator(x, y, 0.5)
-        for j in range(3):
-            xmin, xmax, ymin, ymax = next(zoom_gen)
-            render_mandelbrot(width, height, xmin, xmax, ymin, ymax, max_iter=100)
-            time.sleep(0.5)
+    with TiledRenderer(workers, tile_size=16) as renderer:
+        for i in range(3):
+            x, y, name = next(points_gen)
+            print(f"\nZooming into {name} at ({x:.4f}, {y:.4f})")
+            
+            zoom_gen = zoom_generator(x, y, 0.5)
+            for j in range(3):
+                xmin, xmax, ymin, ymax = next(zoom_gen)
+                render_mandelbrot(width, height, xmin, xmax, ymin, ymax, max_iter=100,
+                                  renderer=renderer)
+                time.sleep(0.5)
     
     print("\nExploration complete!")
 
@@ -3,9 +3,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import colorsys
 
+from creature_array import CreatureArray, hsv_to_rgb, nearest_within, pairs_within, rgb_to_hsv
+from food_index import FoodArray, FoodIndex
+
 @dataclass
 class Creature:
     x: float
@@ -19,31 +22,34 @@ class Creature:
     age: int = 0
     food_eaten: int = 0
     
-    def move(self, width: int, height: int, food_positions: List[Tuple[float, float]]):
+    def nearest_food(self, food_positions) -> Optional[Tuple[float, float]]:
+        """Position of the nearest food within vision range, or None"""
+        if isinstance(food_positions, FoodIndex):
+            found = food_positions.nearest(self.x, self.y, self.vision_range)
+            return food_positions.position(found[0]) if found else None
+        if not food_positions:
+            return None
+        distances = [np.sqrt((self.x - fx)**2 + (self.y - fy)**2) 
+                    for fx, fy in food_positions]
+        min_idx = np.argmin(distances)
+        if distances[min_idx] < self.vision_range:
+            return food_positions[min_idx]
+        return None
+    
+    def move(self, width: int, height: int, food_positions, rng=random):
         """Move creature towards nearest food or randomly wander"""
-        if food_positions:
-            # Find nearest food
-            distances = [np.sqrt((self.x - fx)**2 + (self.y - fy)**2) 
-                        for fx, fy in food_positions]
-            min_idx = np.argmin(distances)
-            target_x, target_y = food_positions[min_idx]
-            
-            # Move towards food if within vision range
-            if distances[min_idx] < self.vision_range:
-                dx = target_x - self.x
-                dy = target_y - self.y
-                norm = np.sqrt(dx**2 + dy**2)
-                if norm > 0:
-                    self.x += (dx / norm) * self.speed
-                    self.y += (dy / norm) * self.speed
-            else:
-                # Random walk
-                angle = random.uniform(0, 2 * np.pi)
-                self.x += np.cos(angle) * self.speed
-                self.y += np.sin(angle) * self.speed
+        target = self.nearest_food(food_positions)
+        if target is not None:
+            # Move towards food within vision range
+            dx = target[0] - self.x
+            dy = target[1] - self.y
+            norm = np.sqrt(dx**2 + dy**2)
+            if norm > 0:
+                self.x += (dx / norm) * self.speed
+                self.y += (dy / norm) * self.speed
         else:
             # Random walk
-            angle = random.uniform(0, 2 * np.pi)
+            angle = rng.uniform(0, 2 * np.pi)
             self.x += np.cos(angle) * self.speed
             self.y += np.sin(angle) * self.speed
         
@@ -54,49 +60,78 @@ class Creature:
         # Energy cost for movement
         self.energy -= 0.01 * self.speed
         
-    def reproduce(self) -> 'Creature':
+    def reproduce(self, rng=random) -> 'Creature':
         """Create offspring with mutated traits"""
         mutation_rate = 0.2
         child = Creature(
-            x=self.x + random.uniform(-10, 10),
-            y=self.y + random.uniform(-10, 10),
+            x=self.x + rng.uniform(-10, 10),
+            y=self.y + rng.uniform(-10, 10),
             energy=50,
-            speed=max(0.1, self.speed + random.uniform(-mutation_rate, mutation_rate)),
-            size=max(1, self.size + random.uniform(-mutation_rate, mutation_rate)),
-            vision_range=max(5, self.vision_range + random.uniform(-mutation_rate*5, mutation_rate*5)),
-            color=self.mutate_color(self.color),
+            speed=max(0.1, self.speed + rng.uniform(-mutation_rate, mutation_rate)),
+            size=max(1, self.size + rng.uniform(-mutation_rate, mutation_rate)),
+            vision_range=max(5, self.vision_range + rng.uniform(-mutation_rate*5, mutation_rate*5)),
+            color=self.mutate_color(self.color, rng),
             generation=self.generation + 1
         )
         self.energy -= 30  # Reproduction cost
         return child
     
-    def mutate_color(self, parent_color: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    def mutate_color(self, parent_color: Tuple[float, float, float], rng=random) -> Tuple[float, float, float]:
         """Slightly mutate the creature's color"""
         h, s, v = colorsys.rgb_to_hsv(*parent_color)
-        h = (h + random.uniform(-0.05, 0.05)) % 1.0
-        s = max(0, min(1, s + random.uniform(-0.1, 0.1)))
-        v = max(0.3, min(1, v + random.uniform(-0.1, 0.1)))
+        h = (h + rng.uniform(-0.05, 0.05)) % 1.0
+        s = max(0, min(1, s + rng.uniform(-0.1, 0.1)))
+        v = max(0.3, min(1, v + rng.uniform(-0.1, 0.1)))
         return colorsys.hsv_to_rgb(h, s, v)
 
 class Ecosystem:
-    def __init__(self, width: int = 800, height: int = 600, initial_creatures: int = 20):
+    def __init__(self, width: int = 800, height: int = 600, initial_creatures: int = 20,
+                 max_food: int = 50, max_creatures: int = 100, use_arrays: bool = False,
+                 rng=None, np_rng=None):
         self.width = width
         self.height = height
         self.creatures: List[Creature] = []
-        self.food_positions: List[Tuple[float, float]] = []
-        self.max_food = 50
+        # Indexed so lookups and consumption stay cheap with thousands of pieces
+        self.food_positions = FoodIndex(cell_size=32)
+        self.max_food = max_food
+        self.max_creatures = max_creatures
         self.generation = 0
         
+        # Sources of randomness; the global generators unless explicit ones
+        # (see run_control.make_rngs) are given, which makes runs reproducible
+        self.rng = rng if rng is not None else random
+        self.np_rng = np_rng if np_rng is not None else np.random
+        
+        # With use_arrays, creatures live in a CreatureArray (which also stands in
+        # for the creature list) and food in a FoodArray, and update() applies
+        # each rule to the whole population at once
+        self.use_arrays = use_arrays
+        if use_arrays:
+            self.creatures = CreatureArray(capacity=max(initial_creatures, 64))
+            self.food_positions = FoodArray()
+            n = initial_creatures
+            self.creatures.add_many(
+                x=self.np_rng.uniform(0, width, n),
+                y=self.np_rng.uniform(0, height, n),
+                energy=self.np_rng.uniform(40, 80, n),
+                speed=self.np_rng.uniform(0.5, 2.0, n),
+                size=self.np_rng.uniform(2, 5, n),
+                vision_range=self.np_rng.uniform(20, 60, n),
+                color=self.np_rng.random((n, 3))
+            )
+            self.spawn_food()
+            return
+        
         # Initialize creatures with random traits
         for _ in range(initial_creatures):
             self.creatures.append(Creature(
-                x=random.uniform(0, width),
-                y=random.uniform(0, height),
-                energy=random.uniform(40, 80),
-                speed=random.uniform(0.5, 2.0),
-                size=random.uniform(2, 5),
-                vision_range=random.uniform(20, 60),
-                color=(random.random(), random.random(), random.random())
+                x=self.rng.uniform(0, width),
+                y=self.rng.uniform(0, height),
+                energy=self.rng.uniform(40, 80),
+                speed=self.rng.uniform(0.5, 2.0),
+                size=self.rng.uniform(2, 5),
+                vision_range=self.rng.uniform(20, 60),
+                color=(self.rng.random(), self.rng.random(), self.rng.random())
             ))
         
         # Initialize food
@@ -104,31 +139,38 @@ class Ecosystem:
     
     def spawn_food(self):
         """Spawn food at random locations"""
+        if self.use_arrays:
+            n = self.max_food - len(self.food_positions)
+            if n > 0:
+                self.food_positions.add_many(self.np_rng.uniform(10, self.width - 10, n),
+                                             self.np_rng.uniform(10, self.height - 10, n))
+            return
         while len(self.food_positions) < self.max_food:
-            self.food_positions.append((
-                random.uniform(10, self.width - 10),
-                random.uniform(10, self.height - 10)
-            ))
+            self.food_positions.add(
+                self.rng.uniform(10, self.width - 10),
+                self.rng.uniform(10, self.height - 10)
+            )
     
     def update(self):
         """Update ecosystem state"""
+        if self.use_arrays:
+            self.update_arrays()
+            return
+        
         # Move creatures
         for creature in self.creatures:
-            creature.move(self.width, self.height, self.food_positions)
+            creature.move(self.width, self.height, self.food_positions, self.rng)
             creature.age += 1
             
             # Check for food consumption
-            for food_pos in self.food_positions[:]:
-                distance = np.sqrt((creature.x - food_pos[0])**2 + 
-                                 (creature.y - food_pos[1])**2)
-                if distance < creature.size + 3:
-                    creature.energy += 20
-                    creature.food_eaten += 1
-                    self.food_positions.remove(food_pos)
+            for food in self.food_positions.within(creature.x, creature.y, creature.size + 3):
+                creature.energy += 20
+                creature.food_eaten += 1
+                self.food_positions.remove(food)
             
             # Reproduction
-            if creature.energy > 70 and len(self.creatures) < 100:
-                self.creatures.append(creature.reproduce())
+            if creature.energy > 70 and len(self.creatures) < self.max_creatures:
+                self.creatures.append(creature.reproduce(self.rng))
         
         # Remove dead creatures
         self.creatures = [c for c in self.creatures if c.energy > 0 and c.age < 1000]
@@ -140,8 +182,89 @@ class Ecosystem:
         if self.creatures:
             self.generation = max(c.generation for c in self.creatures)
     
+    def update_arrays(self):
+        """Update every creature at once with the same rules as Creature.move and update.
+        
+        Rules apply to the whole population in turn rather than creature by
+        creature: everyone moves, then food is shared out (each piece to the
+        earliest creature in reach), then parents reproduce and the dead are
+        removed. Newborns first move on the next step.
+        """
+        pop = self.creatures
+        food = self.food_positions
+        n = len(pop)
+        x, y, speed, size = pop.x, pop.y, pop.speed, pop.size
+        
+        # Move towards the nearest food in vision, otherwise wander
+        target = nearest_within(x, y, pop.vision_range, food.x, food.y, cell_size=32)
+        seen = target >= 0
+        dx = np.zeros(n)
+        dy = np.zeros(n)
+        dx[seen] = food.x[target[seen]] - x[seen]
+        dy[seen] = food.y[target[seen]] - y[seen]
+        norm = np.sqrt(dx**2 + dy**2)
+        heading = seen & (norm > 0)
+        dx[heading] /= norm[heading]
+        dy[heading] /= norm[heading]
+        wander = ~seen
+        angle = self.np_rng.uniform(0, 2 * np.pi, wander.sum())
+        dx[wander] = np.cos(angle)
+        dy[wander] = np.sin(angle)
+        x += dx * speed
+        y += dy * speed
+        np.maximum(size, np.minimum(self.width - size, x), out=x)
+        np.maximum(size, np.minimum(self.height - size, y), out=y)
+        pop.energy[:] -= 0.01 * speed
+        pop.age[:] += 1
+        
+        # Each piece of food goes to the earliest creature that reaches it
+        i, j, _ = pairs_within(x, y, size + 3, food.x, food.y, cell_size=32)
+        if len(i):
+            order = np.lexsort((i, j))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = j[order][1:] != j[order][:-1]
+            eaten = np.bincount(i[order][first], minlength=n)
+            pop.energy[:] += 20 * eaten
+            pop.food_eaten[:] += eaten
+            uneaten = np.ones(len(food), dtype=bool)
+            uneaten[j[order][first]] = False
+            food.keep(uneaten)
+        
+        # Reproduction, up to the population cap
+        parents = np.flatnonzero(pop.energy > 70)[:max(0, self.max_creatures - n)]
+        if len(parents):
+            k = len(parents)
+            mutation_rate = 0.2
+            hsv = rgb_to_hsv(pop.color[parents])
+            hsv[:, 0] = (hsv[:, 0] + self.np_rng.uniform(-0.05, 0.05, k)) % 1.0
+            hsv[:, 1] = np.clip(hsv[:, 1] + self.np_rng.uniform(-0.1, 0.1, k), 0, 1)
+            hsv[:, 2] = np.clip(hsv[:, 2] + self.np_rng.uniform(-0.1, 0.1, k), 0.3, 1)
+            pop.add_many(
+                x=pop.x[parents] + self.np_rng.uniform(-10, 10, k),
+                y=pop.y[parents] + self.np_rng.uniform(-10, 10, k),
+                energy=np.full(k, 50.0),
+                speed=np.maximum(0.1, pop.speed[parents] + self.np_rng.uniform(-mutation_rate, mutation_rate, k)),
+                size=np.maximum(1, pop.size[parents] + self.np_rng.uniform(-mutation_rate, mutation_rate, k)),
+                vision_range=np.maximum(5, pop.vision_range[parents] + self.np_rng.uniform(-mutation_rate*5, mutation_rate*5, k)),
+                color=hsv_to_rgb(hsv),
+                generation=pop.generation[parents] + 1
+            )
+            pop.energy[parents] -= 30  # Reproduction cost
+        
+        # Remove dead creatures
+        pop.keep((pop.energy > 0) & (pop.age < 1000))
+        
+        # Spawn new food
+        self.spawn_food()
+        
+        # Track generation
+        if len(pop):
+            self.generation = pop.max_generation()
+    
     def get_stats(self) -> dict:
         """Get ecosystem statistics"""
+        if self.use_arrays:
+            return self.creatures.stats()
         if not self.creatures:
             return {}
         
@@ -4,9 +4,13 @@ import shutil
 import os
 from datetime import datetime
 
+from terminal_frame import TerminalRenderer
+
 class MatrixClock:
-    def __init__(self):
+    def __init__(self, diff_render=False):
         self.width, self.height = shutil.get_terminal_size()
+        # With diff_render, frames go through a TerminalRenderer that only rewrites changed cells
+        self.screen = TerminalRenderer(self.width, self.height) if diff_render else None
         self.matrix_chars = 'ｱｲｳｴｵｶｷｸｹｺｻｼｽｾｿﾀﾁﾂﾃﾄﾅﾆﾇﾈﾉﾊﾋﾌﾍﾎﾏﾐﾑﾒﾓﾔﾕﾖﾗﾘﾙﾚﾛﾜﾝ01'
         self.rain_drops = []
         self.clock_display = []
@@ -65,23 +69,25 @@ class MatrixClock:
     def render_frame(self):
         """Render the complete frame"""
         # Clear screen
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if self.screen is None:
+            os.system('cls' if os.name == 'nt' else 'clear')
         
-        # Create buffer
+        # Create buffer, with the color of each cell as SGR parameters
         buffer = [[' ' for _ in range(self.width)] for _ in range(self.height)]
+        colors = [['' for _ in range(self.width)] for _ in range(self.height)]
         
         # Draw matrix rain
         for drop in self.rain_drops:
             for i in range(drop['length']):
                 y = int(drop['y'] - i)
                 if 0 <= y < self.height and 0 <= drop['x'] < self.width:
-                    char = random.choice(self.matrix_chars)
+                    buffer[y][drop['x']] = random.choice(self.matrix_chars)
                     if i == 0:
-                        buffer[y][drop['x']] = '\033[1;37m' + char + '\033[0m'  # White for head
+                        colors[y][drop['x']] = '1;37'  # White for head
                     elif i < 3:
-                        buffer[y][drop['x']] = '\033[1;32m' + char + '\033[0m'  # Bright green
+                        colors[y][drop['x']] = '1;32'  # Bright green
                     else:
-                        buffer[y][drop['x']] = '\033[0;32m' + char + '\033[0m'  # Dim green
+                        colors[y][drop['x']] = '0;32'  # Dim green
         
         # Draw clock
         ascii_time = self.get_ascii_time()
@@ -98,14 +104,23 @@ class MatrixClock:
                     for char_x, char in enumerate(line):
                         if char == '█' and x + char_x < self.width:
                             # Create glow effect
-                            buffer[y][x + char_x] = '\033[1;33;40m' + char + '\033[0m'
+                            buffer[y][x + char_x] = char
+                            colors[y][x + char_x] = '1;33;40'
+        
+        info_text = f"Matrix Clock - {datetime.now().strftime('%Y-%m-%d')} | Press Ctrl+C to exit"
+        if self.screen is not None:
+            # The info line takes the bottom row instead of scrolling the screen
+            self.screen.blit(buffer, attrs=colors)
+            self.screen.text(0, self.height - 1, info_text.center(self.width), '1;36')
+            self.screen.present()
+            return
         
         # Render buffer to screen
-        for row in buffer:
-            print(''.join(row))
+        for row, row_colors in zip(buffer, colors):
+            print(''.join(f'\033[{color}m{char}\033[0m' if color else char
+                          for char, color in zip(row, row_colors)))
         
         # Add info text
-        info_text = f"Matrix Clock - {datetime.now().strftime('%Y-%m-%d')} | Press Ctrl+C to exit"
         print(f"\033[1;36m{info_text.center(self.width)}\033[0m")
     
     def run(self):
@@ -116,8 +131,10 @@ class MatrixClock:
                 self.render_frame()
                 time.sleep(0.1)
         except KeyboardInterrupt:
+            if self.screen is not None:
+                self.screen.close()
             print("\n\033[1;32mMatrix Clock terminated. Stay in the matrix.\033[0m")
 
 if __name__ == "__main__":
-    clock = MatrixClock()
+    clock = MatrixClock(diff_render=True)
     clock.run()
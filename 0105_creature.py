@@ -3,8 +3,12 @@ import math
 import os
 import time
 
+from food_index import FoodIndex
+from terminal_frame import TerminalRenderer
+
 class Creature:
-    def __init__(self, x, y, dna=None):
+    def __init__(self, x, y, dna=None, rng=random):
+        self.rng = rng
         self.x = x
         self.y = y
         self.energy = 100
@@ -15,21 +19,21 @@ class Creature:
         if dna is None:
             # Random DNA for first generation
             self.dna = {
-                'speed': random.uniform(0.5, 2.0),
-                'size': random.uniform(3, 8),
-                'vision_range': random.uniform(20, 60),
-                'metabolism': random.uniform(0.5, 2.0),
-                'reproduction_threshold': random.uniform(150, 250),
-                'color_r': random.randint(50, 255),
-                'color_g': random.randint(50, 255),
-                'color_b': random.randint(50, 255)
+                'speed': self.rng.uniform(0.5, 2.0),
+                'size': self.rng.uniform(3, 8),
+                'vision_range': self.rng.uniform(20, 60),
+                'metabolism': self.rng.uniform(0.5, 2.0),
+                'reproduction_threshold': self.rng.uniform(150, 250),
+                'color_r': self.rng.randint(50, 255),
+                'color_g': self.rng.randint(50, 255),
+                'color_b': self.rng.randint(50, 255)
             }
         else:
             # Inherit DNA with mutations
             self.dna = {}
             for trait, value in dna.items():
                 if isinstance(value, (int, float)):
-                    mutation = random.gauss(0, 0.1)
+                    mutation = self.rng.gauss(0, 0.1)
                     if isinstance(value, int):
                         new_value = max(0, min(255, int(value + value * mutation)))
                     else:
@@ -38,7 +42,7 @@ class Creature:
                 else:
                     self.dna[trait] = value
         
-        self.direction = random.uniform(0, 2 * math.pi)
+        self.direction = self.rng.uniform(0, 2 * math.pi)
         self.alive = True
     
     def move(self, width, height):
@@ -46,7 +50,7 @@ class Creature:
             return
         
         # Random walk with momentum
-        self.direction += random.gauss(0, 0.3)
+        self.direction += self.rng.gauss(0, 0.3)
         
         # Move based on speed from DNA
         dx = math.cos(self.direction) * self.dna['speed']
@@ -80,9 +84,10 @@ class Creature:
         if self.can_reproduce():
             # Create offspring with mutated DNA
             offspring = Creature(
-                self.x + random.uniform(-10, 10),
-                self.y + random.uniform(-10, 10),
-                self.dna
+                self.x + self.rng.uniform(-10, 10),
+                self.y + self.rng.uniform(-10, 10),
+                self.dna,
+                self.rng
             )
             offspring.generation = self.generation + 1
             self.energy /= 2  # Reproduction costs energy
@@ -93,37 +98,47 @@ class Creature:
         self.energy = min(self.energy + food_amount, 300)
 
 class Food:
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random):
         self.x = x
         self.y = y
-        self.energy = random.uniform(20, 40)
+        self.energy = rng.uniform(20, 40)
 
 class Ecosystem:
-    def __init__(self, width=100, height=40):
+    def __init__(self, width=100, height=40, initial_creatures=20, initial_food=50, rng=None,
+                 diff_render=False):
+        # The global generator unless an explicit one (see run_control.make_rngs)
+        # is given, which makes runs reproducible
+        self.rng = rng if rng is not None else random
         self.width = width
         self.height = height
+        # With diff_render, frames go through a TerminalRenderer that only rewrites changed
+        # cells; the five rows below the grid hold the stats
+        self.screen = TerminalRenderer(width, height + 5) if diff_render else None
         self.creatures = []
-        self.food = []
+        self.food = FoodIndex(cell_size=16)  # Food objects, indexed by position
         self.generation = 0
         self.time_step = 0
         
         # Initialize with random creatures
-        for _ in range(20):
+        for _ in range(initial_creatures):
             self.creatures.append(
                 Creature(
-                    random.uniform(0, width),
-                    random.uniform(0, height)
+                    self.rng.uniform(0, width),
+                    self.rng.uniform(0, height),
+                    rng=self.rng
                 )
             )
         
         # Initialize with food
-        for _ in range(50):
-            self.food.append(
-                Food(
-                    random.uniform(0, width),
-                    random.uniform(0, height)
-                )
-            )
+        for _ in range(initial_food):
+            self.add_food(Food(
+                self.rng.uniform(0, width),
+                self.rng.uniform(0, height),
+                self.rng
+            ))
+    
+    def add_food(self, food):
+        self.food.add(food.x, food.y, food)
     
     def update(self):
         self.time_step += 1
@@ -135,17 +150,18 @@ class Ecosystem:
             creature.update()
             
             # Check for food
-            for food in self.food[:]:
+            vision = creature.dna['vision_range']
+            for handle in self.food.within(creature.x, creature.y, vision):
+                food = self.food.values[handle]
                 distance = math.sqrt((creature.x - food.x)**2 + (creature.y - food.y)**2)
-                if distance < creature.dna['vision_range']:
-                    # Move towards food
-                    angle_to_food = math.atan2(food.y - creature.y, food.x - creature.x)
-                    creature.direction = angle_to_food
-                    
-                    # Eat if close enough
-                    if distance < creature.dna['size']:
-                        creature.eat_food(food.energy)
-                        self.food.remove(food)
+                # Move towards food
+                angle_to_food = math.atan2(food.y - creature.y, food.x - creature.x)
+                creature.direction = angle_to_food
+                
+                # Eat if close enough
+                if distance < creature.dna['size']:
+                    creature.eat_food(food.energy)
+                    self.food.remove(handle)
             
             # Reproduction
             if creature.can_reproduce():
@@ -160,13 +176,12 @@ class Ecosystem:
         self.creatures = [c for c in self.creatures if c.alive]
         
         # Add new food periodically
-        if random.random() < 0.3:
-            self.food.append(
-                Food(
-                    random.uniform(0, self.width),
-                    random.uniform(0, self.height)
-                )
-            )
+        if self.rng.random() < 0.3:
+            self.add_food(Food(
+                self.rng.uniform(0, self.width),
+                self.rng.uniform(0, self.height),
+                self.rng
+            ))
         
         # Track generations
         if self.creatures:
@@ -193,7 +208,8 @@ class Ecosystem:
         }
     
     def render(self):
-        os.system('clear' if os.name == 'posix' else 'cls')
+        if self.screen is None:
+            os.system('clear' if os.name == 'posix' else 'cls')
         
         # Create grid
         grid = [['.' for _ in range(self.width)] for _ in range(self.height)]
@@ -216,19 +232,32 @@ class Ecosystem:
                 else:
                     grid[y][x] = '.'
         
+        stats = self.get_stats()
+        lines = [
+            f"Time: {self.time_step} | Generation: {stats['generation']} | Population: {stats['population']}",
+            f"Avg Energy: {stats['avg_energy']:.1f} | Avg Speed: {stats['avg_speed']:.2f}",
+            f"Avg Size: {stats['avg_size']:.2f} | Avg Vision: {stats['avg_vision']:.1f}",
+            f"Food available: {len(self.food)}",
+        ]
+        if self.screen is not None:
+            self.screen.clear()
+            self.screen.blit(grid)
+            for i, line in enumerate(lines):
+                self.screen.text(0, self.height + 1 + i, line)
+            self.screen.present()
+            return
+        
         # Print grid
         for row in grid:
             print(''.join(row))
         
         # Print stats
-        stats = self.get_stats()
-        print(f"\nTime: {self.time_step} | Generation: {stats['generation']} | Population: {stats['population']}")
-        print(f"Avg Energy: {stats['avg_energy']:.1f} | Avg Speed: {stats['avg_speed']:.2f}")
-        print(f"Avg Size: {stats['avg_size']:.2f} | Avg Vision: {stats['avg_vision']:.1f}")
-        print(f"Food available: {len(self.food)}")
+        print()
+        for line in lines:
+            print(line)
 
 def main():
-    ecosystem = Ecosystem()
+    ecosystem = Ecosystem(diff_render=True)
     
     try:
         while True:
@@ -236,6 +265,7 @@ def main():
             ecosystem.render()
             time.sleep(0.1)
     except KeyboardInterrupt:
+        ecosystem.screen.close()
         print("\nSimulation ended. Final stats:")
         stats = ecosystem.get_stats()
         for key, value in stats.items():
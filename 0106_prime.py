@@ -1,33 +1,31 @@
+import os
 import sys
 import math
-from functools import lru_cache
 from itertools import islice
 from collections import deque
 import time
 
+import numpy as np
+
+from bench import measure
+from primality import PrimalityService
+from prime_engine import WheelSieve
+from prime_parallel import ParallelSieve
+
 class PrimeFinder:
     """Optimized prime number generator using multiple performance techniques"""
     
-    def __init__(self, limit):
+    def __init__(self, limit, cache_path=None):
         self.limit = limit
         self._primes_cache = {}
         self._wheel = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+        # Bitmap lookups below 2**20, deterministic Miller-Rabin above, memoized
+        # per finder and optionally on disk (see primality.PrimalityService)
+        self.primality = PrimalityService(cache_path)
         
-    @lru_cache(maxsize=1000)
     def _is_prime_cached(self, n):
-        """Memoized primality test using wheel factorization"""
-        if n < 2:
-            return False
-        for p in self._wheel:
-            if n % p == 0:
-                return n == p
-        
-        # Check up to sqrt(n) using 6k ± 1 optimization
-        limit = int(math.isqrt(n))
-        for i in range(31, limit + 1, 6):
-            if n % i == 0 or n % (i + 2) == 0:
-                return False
-        return True
+        """Memoized primality test: small-prime bitmap, then Miller-Rabin"""
+        return self.primality.is_prime(n)
     
     def sieve_generator(self):
         """Memory-efficient sieve using generator pattern"""
@@ -65,27 +63,38 @@ class PrimeFinder:
                 if is_prime and (low + i) >= 2:
                     yield low + i
     
-    def benchmark_methods(self):
-        """Compare different optimization approaches"""
+    def benchmark_methods(self, warmup=1, repeat=5, memory=True):
+        """Compare different optimization approaches (see bench.measure)"""
         methods = [
-            ("Cached Wheel Factorization", self._test_cached),
+            ("Cached Primality Test", self._test_cached),
+            ("Batch Primality Test", self._test_batch),
             ("Sieve Generator", self._test_sieve),
-            ("Segmented Sieve", self._test_segmented)
+            ("Segmented Sieve", self._test_segmented),
+            ("Wheel-30 Bit Sieve", self._test_wheel)
         ]
+        # Scaling of the multi-process range sieve, up to the cores available
+        for workers in (1, 2, 4, 8):
+            if workers <= (os.cpu_count() or 1):
+                methods.append((f"Parallel Sieve x{workers}",
+                                lambda workers=workers: self._test_parallel(workers)))
         
-        print(f"Finding primes up to {self.limit:,}")
-        print("-" * 50)
+        print(f"Finding primes up to {self.limit:,} (best/median/IQR of {repeat} after {warmup} warmup)")
+        print("-" * 86)
         
         for name, method in methods:
-            start = time.perf_counter()
-            count = method()
-            elapsed = time.perf_counter() - start
-            print(f"{name:25} | {count:8,} primes | {elapsed:6.3f}s")
+            stats = measure(lambda: method, warmup, repeat, memory)
+            peak = '' if stats['peak_bytes'] is None else f" | {stats['peak_bytes'] / 2**20:7.1f} MB"
+            print(f"{name:25} | {stats['result']:8,} primes | {stats['min']:6.3f}s | "
+                  f"{stats['median']:6.3f}s | {stats['iqr']:6.3f}s{peak}")
     
     def _test_cached(self):
-        """Test cached wheel factorization method"""
+        """Test cached primality method"""
         return sum(1 for i in range(2, self.limit + 1) if self._is_prime_cached(i))
     
+    def _test_batch(self):
+        """Test vectorized primality over the whole range"""
+        return int(self.primality.is_prime_many(np.arange(2, self.limit + 1)).sum())
+    
     def _test_sieve(self):
         """Test sieve generator method"""
         return sum(1 for _ in self.sieve_generator())
@@ -93,6 +102,15 @@ class PrimeFinder:
     def _test_segmented(self):
         """Test segmented sieve method"""
         return sum(1 for _ in self.segmented_sieve())
+    
+    def _test_wheel(self):
+        """Test packed wheel-30 segmented sieve"""
+        return WheelSieve().count(self.limit)
+    
+    def _test_parallel(self, workers):
+        """Test multi-process segmented sieve"""
+        with ParallelSieve(workers) as sieve:
+            return sieve.pi(self.limit)
 
 def demonstrate_optimizations():
     """Show various Python performance optimization techniques"""
@@ -179,7 +197,7 @@ if __name__ == "__main__":
     prime_finder.benchmark_methods()
     
     print("\nOptimization Techniques Demonstrated:")
-    print("• Memoization with @lru_cache")
+    print("• Memoization of Miller-Rabin results, optionally on disk")
     print("• Generator patterns for memory efficiency")
     print("• Pre-allocation of data structures")
     print("• Efficient data structure selection (sets vs lists)")
@@ -2,6 +2,13 @@ import pygame
 import numpy as np
 import random
 import math
+from force_solvers import make_solver
+from particle_array import ParticleArray, ParticleView
+from spatial_hash import SpatialHash
+
+GRAVITY_CUTOFF = 200  # Particles further apart than this don't attract
+CONNECTION_DISTANCE = 100  # Particles closer than this are joined by a line
+MOUSE_REPEL_RADIUS = 150
 
 class Particle:
     def __init__(self, x, y, screen_width, screen_height):
@@ -17,12 +24,13 @@ class Particle:
             random.randint(100, 255)
         )
         self.trail = []
+        self.trail_point = (x, y)
         self.max_trail_length = 20
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.gravity_strength = 0.1
         
-    def update(self, particles, mouse_pos=None):
+    def _apply_gravity(self, particles):
         # Apply gravity to other particles
         for other in particles:
             if other != self:
@@ -30,13 +38,21 @@ class Particle:
                 dy = other.y - self.y
                 distance = math.sqrt(dx**2 + dy**2)
                 
-                if distance > 0 and distance < 200:
+                if distance > 0 and distance < GRAVITY_CUTOFF:
                     # Gravitational attraction
                     force = (self.gravity_strength * self.mass * other.mass) / (distance**2)
                     ax = force * (dx / distance) / self.mass
                     ay = force * (dy / distance) / self.mass
                     self.vx += ax
                     self.vy += ay
+    
+    def update(self, particles, mouse_pos=None, acceleration=None, record_trail=True):
+        if acceleration is not None:
+            # Gravity already computed for the whole system by a force solver
+            self.vx += acceleration[0]
+            self.vy += acceleration[1]
+        else:
+            self._apply_gravity(particles)
         
         # Mouse interaction
         if mouse_pos:
@@ -44,7 +60,7 @@ class Particle:
             dy = mouse_pos[1] - self.y
             distance = math.sqrt(dx**2 + dy**2)
             
-            if distance < 150 and distance > 0:
+            if distance < MOUSE_REPEL_RADIUS and distance > 0:
                 # Repel from mouse
                 force = 50 / distance
                 self.vx -= force * (dx / distance)
@@ -58,10 +74,11 @@ class Particle:
         self.x += self.vx
         self.y += self.vy
         
-        # Add to trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > self.max_trail_length:
-            self.trail.pop(0)
+        # Add to trail; the point is taken before bouncing, so a caller that
+        # times trails separately can record it later with record_trail()
+        self.trail_point = (self.x, self.y)
+        if record_trail:
+            self.record_trail()
         
         # Bounce off walls
         if self.x - self.radius < 0 or self.x + self.radius > self.screen_width:
@@ -72,28 +89,43 @@ class Particle:
             self.vy *= -0.8
             self.y = max(self.radius, min(self.screen_height - self.radius, self.y))
     
+    def record_trail(self):
+        self.trail.append(self.trail_point)
+        if len(self.trail) > self.max_trail_length:
+            self.trail.pop(0)
+    
     def draw(self, screen):
-        # Draw trail
-        for i, pos in enumerate(self.trail):
-            alpha = i / len(self.trail)
-            trail_color = tuple(int(c * alpha) for c in self.color)
-            pygame.draw.circle(screen, trail_color, (int(pos[0]), int(pos[1])), 
-                             int(self.radius * alpha * 0.5))
-        
-        # Draw particle with glow effect
-        for i in range(3):
-            glow_radius = self.radius * (3 - i)
-            glow_alpha = 0.1 * (i + 1)
-            glow_color = tuple(int(c * glow_alpha) for c in self.color)
-            pygame.draw.circle(screen, glow_color, (int(self.x), int(self.y)), 
-                             int(glow_radius))
-        
-        # Draw main particle
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 
-                         int(self.radius))
+        draw_particle(screen, self.x, self.y, self.radius, self.color, self.trail)
+
+def draw_particle(screen, x, y, radius, color, trail):
+    """Draw one particle with its trail and glow"""
+    # Draw trail
+    for i, pos in enumerate(trail):
+        alpha = i / len(trail)
+        trail_color = tuple(int(c * alpha) for c in color)
+        pygame.draw.circle(screen, trail_color, (int(pos[0]), int(pos[1])), 
+                         int(radius * alpha * 0.5))
+    
+    # Draw particle with glow effect
+    for i in range(3):
+        glow_radius = radius * (3 - i)
+        glow_alpha = 0.1 * (i + 1)
+        glow_color = tuple(int(c * glow_alpha) for c in color)
+        pygame.draw.circle(screen, glow_color, (int(x), int(y)), 
+                         int(glow_radius))
+    
+    # Draw main particle
+    pygame.draw.circle(screen, color, (int(x), int(y)), 
+                     int(radius))
+
+class ArrayParticle(ParticleView):
+    """Particle backed by a row of a ParticleArray, drawn like Particle"""
+    __slots__ = ()
+    draw = Particle.draw
 
 class ParticleSystem:
-    def __init__(self, width=1200, height=800, num_particles=50):
+    def __init__(self, width=1200, height=800, num_particles=50, solver=None, theta=0.5,
+                 use_arrays=False, use_spatial_hash=True):
         pygame.init()
         self.width = width
         self.height = height
@@ -105,25 +137,162 @@ class ParticleSystem:
         self.mouse_pos = None
         self.show_connections = True
         
+        # None keeps the per-particle gravity loop; 'exact' or 'barnes_hut'
+        # computes gravity for every particle at once
+        self.solver = None
+        if solver is not None:
+            options = {'theta': theta} if solver == 'barnes_hut' else {}
+            self.solver = make_solver(solver, G=0.1, cutoff=GRAVITY_CUTOFF, **options)
+        
+        # Grid for neighbour queries; None falls back to scanning every particle
+        self.grid = SpatialHash(CONNECTION_DISTANCE) if use_spatial_hash else None
+        
+        # With use_arrays, particle state lives in a ParticleArray and is updated
+        # as whole-array operations; gravity then always goes through a solver
+        self.store = None
+        self.trail_points = None  # Positions from the last update_arrays, before bouncing
+        if use_arrays:
+            self.store = ParticleArray(trail_length=20)
+            if self.solver is None:
+                self.solver = make_solver('exact', G=0.1, cutoff=GRAVITY_CUTOFF)
+        
         # Create particles
         for _ in range(num_particles):
             x = random.uniform(50, width - 50)
             y = random.uniform(50, height - 50)
-            self.particles.append(Particle(x, y, width, height))
+            self.add_particle(x, y)
     
-    def draw_connections(self):
+    def add_particle(self, x, y):
+        """Create a particle at (x, y) in whichever storage is in use"""
+        if self.store is None:
+            self.particles.append(Particle(x, y, self.width, self.height))
+            return
+        # Same random draws, in the same order, as Particle.__init__
+        vx = random.uniform(-2, 2)
+        vy = random.uniform(-2, 2)
+        radius = random.uniform(2, 8)
+        color = (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
+        index = self.store.add(x, y, vx, vy, radius * 0.5, radius, color)
+        self.particles.append(ArrayParticle(self.store, index))
+    
+    def clear_particles(self):
+        """Remove all particles"""
+        self.particles.clear()
+        if self.grid is not None:
+            self.grid.clear()
+        if self.store is not None:
+            self.store.clear()
+    
+    def update_arrays(self, record_trail=True):
+        """Advance every particle in the store at once, in the same order as Particle.update"""
+        store = self.store
+        store.apply_accelerations(self.solver.accelerations(store.pos, store.mass))
+        
+        if self.mouse_pos:
+            # Repel from mouse
+            delta = np.array(self.mouse_pos, dtype=float) - store.pos
+            distance = np.hypot(delta[:, 0], delta[:, 1])
+            near = (distance < MOUSE_REPEL_RADIUS) & (distance > 0)
+            force = 50 / distance[near]
+            store.vel[near] -= (force / distance[near])[:, None] * delta[near]
+        
+        store.damp(0.99)
+        store.integrate()
+        # Trail points are taken before bouncing, as in Particle.update
+        self.trail_points = store.pos.copy()
+        if record_trail:
+            self.record_trails()
+        store.bounce(self.width, self.height, 0.8)
+    
+    def compute_gravity(self):
+        """Accelerations for all particles from the force solver"""
+        pos = np.array([(p.x, p.y) for p in self.particles])
+        mass = np.array([p.mass for p in self.particles])
+        return self.solver.accelerations(pos, mass)
+    
+    def connected_pairs(self):
+        """Pairs of particles closer than CONNECTION_DISTANCE, with their distance"""
+        if self.grid is not None:
+            self.grid.sync(self.particles)
+            return self.grid.pairs_within(CONNECTION_DISTANCE)
+        
+        pairs = []
         for i, p1 in enumerate(self.particles):
             for p2 in self.particles[i+1:]:
                 dx = p1.x - p2.x
                 dy = p1.y - p2.y
                 distance = math.sqrt(dx**2 + dy**2)
                 
-                if distance < 100:
-                    alpha = 1 - (distance / 100)
-                    color = (100 * alpha, 150 * alpha, 255 * alpha)
-                    pygame.draw.line(self.screen, color, 
-                                   (int(p1.x), int(p1.y)), 
-                                   (int(p2.x), int(p2.y)), 1)
+                if distance < CONNECTION_DISTANCE:
+                    pairs.append((p1, p2, distance))
+        return pairs
+    
+    def draw_connections(self):
+        for p1, p2, distance in self.connected_pairs():
+            alpha = 1 - (distance / CONNECTION_DISTANCE)
+            color = (100 * alpha, 150 * alpha, 255 * alpha)
+            pygame.draw.line(self.screen, color, 
+                           (int(p1.x), int(p1.y)), 
+                           (int(p2.x), int(p2.y)), 1)
+    
+    def record_trails(self):
+        """Add the positions reached in the last update to every particle's trail"""
+        if self.store is not None:
+            points = self.trail_points
+            if points is None or len(points) != len(self.store):
+                # Not stepped since particles were added: record where they are now
+                points = self.store.pos
+            self.store.record_trail(points=points)
+        else:
+            for particle in self.particles:
+                particle.record_trail()
+    
+    def step(self, record_trail=True):
+        """Advance the simulation by one frame without drawing"""
+        if self.store is not None:
+            if self.particles:
+                self.update_arrays(record_trail)
+        else:
+            self.update_particles(record_trail)
+    
+    def draw(self):
+        """Draw particles and connections to the screen surface"""
+        if self.store is not None:
+            # One read of the store per frame instead of one per particle attribute
+            for (x, y), radius, color, trail in zip(*self.store.draw_lists()):
+                draw_particle(self.screen, x, y, radius, color, trail)
+        else:
+            for particle in self.particles:
+                particle.draw(self.screen)
+        
+        # Draw connections between nearby particles
+        if self.show_connections:
+            self.draw_connections()
+    
+    def update_particles(self, record_trail=True):
+        """Update particles one at a time with Particle.update"""
+        accelerations = [None] * len(self.particles)
+        if self.solver is not None and self.particles:
+            accelerations = self.compute_gravity()
+        
+        if self.grid is None:
+            for particle, acceleration in zip(self.particles, accelerations):
+                particle.update(self.particles, self.mouse_pos, acceleration, record_trail)
+            return
+        
+        # Each particle only sees particles inside its gravity cutoff, and only
+        # those near the mouse are repelled. Particles move one at a time, so the
+        # grid is updated after each one to keep later queries exact.
+        self.grid.sync(self.particles)
+        repelled = ()
+        if self.mouse_pos:
+            repelled = set(self.grid.query_point(self.mouse_pos[0], self.mouse_pos[1],
+                                                 MOUSE_REPEL_RADIUS))
+        for particle, acceleration in zip(self.particles, accelerations):
+            nearby = self.grid.neighbors(particle, GRAVITY_CUTOFF) if acceleration is None else ()
+            mouse_pos = self.mouse_pos if particle in repelled else None
+            particle.update(nearby, mouse_pos, acceleration, record_trail)
+            self.grid.move(particle, particle.x, particle.y)
     
     def run(self):
         while self.running:
@@ -134,20 +303,17 @@ class ParticleSystem:
                     if event.key == pygame.K_SPACE:
                         # Add new particle at mouse position
                         if self.mouse_pos:
-                            self.particles.append(
-                                Particle(self.mouse_pos[0], self.mouse_pos[1], 
-                                       self.width, self.height)
-                            )
+                            self.add_particle(self.mouse_pos[0], self.mouse_pos[1])
                     elif event.key == pygame.K_c:
                         # Toggle connections
                         self.show_connections = not self.show_connections
                     elif event.key == pygame.K_r:
                         # Reset particles
-                        self.particles.clear()
+                        self.clear_particles()
                         for _ in range(50):
                             x = random.uniform(50, self.width - 50)
                             y = random.uniform(50, self.height - 50)
-                            self.particles.append(Particle(x, y, self.width, self.height))
+                            self.add_particle(x, y)
                 elif event.type == pygame.MOUSEMOTION:
                     self.mouse_pos = event.pos
             
@@ -155,13 +321,8 @@ class ParticleSystem:
             self.screen.fill((10, 10, 20))
             
             # Update and draw particles
-            for particle in self.particles:
-                particle.update(self.particles, self.mouse_pos)
-                particle.draw(self.screen)
-            
-            # Draw connections between nearby particles
-            if self.show_connections:
-                self.draw_connections()
+            self.step()
+            self.draw()
             
             # Draw instructions
             font = pygame.font.Font(None, 24)
@@ -2,6 +2,9 @@ import curses
 import random
 import time
 import math
+from collections import deque
+
+from snake_grid import DistanceField, OccupancyGrid
 
 # --- Configuration ---
 WIDTH = 40
@@ -11,6 +14,7 @@ START_LENGTH = 3
 FOOD_COUNT = 5
 SNAKE_CHARS = ['@', '#', '*']
 FOOD_CHAR = 'o'
+PATHFINDING = True  # Steer along a shared BFS distance field instead of straight at food
 
 class Vector:
     """A simple 2D vector class for movement calculations."""
@@ -36,8 +40,8 @@ class Food:
         self.y = y
 
 class Snake:
-    def __init__(self, x, y, char, color):
-        self.body = [Vector(x, y) for _ in range(START_LENGTH)]
+    def __init__(self, x, y, char, color, grid, owner):
+        self.body = deque(Vector(x, y) for _ in range(START_LENGTH))
         self.direction = Vector(random.choice([-1, 0, 1]), random.choice([-1, 0, 1]))
         # Ensure non-zero start direction
         while self.direction.x == 0 and self.direction.y == 0:
@@ -46,8 +50,13 @@ class Snake:
         self.color = color
         self.alive = True
         self.grow_pending = 0
+        # Every segment is registered in the shared grid under this snake's id
+        self.grid = grid
+        self.owner = owner
+        for segment in self.body:
+            grid.occupy(segment.x, segment.y, owner)
 
-    def move(self, target_pos, all_snakes):
+    def move(self, target_pos):
         if not self.alive:
             return
 
@@ -73,29 +82,9 @@ class Snake:
                 continue
 
             next_pos = head.add(move)
-            
-            # Boundary check
-            if next_pos.x < 0 or next_pos.x >= WIDTH or next_pos.y < 0 or next_pos.y >= HEIGHT:
-                continue
 
-            # Self-collision check
-            collision = False
-            for segment in self.body:
-                if next_pos.x == segment.x and next_pos.y == segment.y:
-                    collision = True
-                    break
-            
-            # Collision with other snakes
-            if not collision:
-                for other in all_snakes:
-                    if other != self and other.alive:
-                        for segment in other.body:
-                            if next_pos.x == segment.x and next_pos.y == segment.y:
-                                collision = True
-                                break
-                    if collision: break
-
-            if collision:
+            # Boundary, self and other snake collisions in one grid lookup
+            if self.grid.blocked(next_pos.x, next_pos.y):
                 continue
 
             # Heuristic: Choose move that minimizes distance to food
@@ -114,15 +103,48 @@ class Snake:
                      # Fallback to keep momentum if food is far
                      best_move = move if best_move == self.direction else best_move
 
-        self.direction = best_move
-        new_head = head.add(self.direction)
+        self.advance(best_move)
+
+    def follow(self, field):
+        """Pick the free neighbour closest to food in a DistanceField; None if no food is reachable"""
+        head = self.body[-1]
+        best_move = None
+        best_dist = field.UNREACHABLE
+        for move in (Vector(0, -1), Vector(0, 1), Vector(-1, 0), Vector(1, 0)):
+            # Don't reverse immediately
+            if move.x == -self.direction.x and move.y == -self.direction.y:
+                continue
+            x, y = head.x + move.x, head.y + move.y
+            # The field predates this tick's moves, so cells taken since are checked again
+            if self.grid.blocked(x, y):
+                continue
+            dist = field.distance(x, y)
+            # Ties keep the current heading
+            if dist < best_dist or (dist == best_dist and dist != field.UNREACHABLE
+                                    and move.x == self.direction.x and move.y == self.direction.y):
+                best_dist = dist
+                best_move = move
+        return best_move
+
+    def advance(self, direction):
+        """Take one step in direction, growing if food was eaten"""
+        self.direction = direction
+        new_head = self.body[-1].add(self.direction)
         
         self.body.append(new_head)
+        self.grid.occupy(new_head.x, new_head.y, self.owner)
         
         if self.grow_pending > 0:
             self.grow_pending -= 1
         else:
-            self.body.pop(0) # Remove tail
+            tail = self.body.popleft() # Remove tail
+            self.grid.vacate(tail.x, tail.y)
+
+    def die(self):
+        """Stop moving and free the cells of the body, which no longer blocks others"""
+        self.alive = False
+        for segment in self.body:
+            self.grid.vacate(segment.x, segment.y)
 
     def check_eat(self, foods):
         if not self.alive:
@@ -133,10 +155,91 @@ class Snake:
             if head.x == food.x and head.y == food.y:
                 foods.remove(food)
                 self.grow_pending += 1
-                foods.append(Food(random.randint(0, WIDTH-1), random.randint(0, HEIGHT-1)))
+                foods.append(Food(random.randint(0, self.grid.width-1), random.randint(0, self.grid.height-1)))
                 return True
         return False
 
+def create_snakes(count, grid):
+    """count snakes at random spots of the grid, with owner ids 1..count"""
+    snakes = []
+    for i in range(count):
+        s = Snake(random.randint(5, grid.width-5), random.randint(5, grid.height-5),
+                  SNAKE_CHARS[i % 3], i % 3 + 1, grid, i + 1)
+        snakes.append(s)
+    return snakes
+
+def update_snakes(snakes, foods, field=None, timings=None):
+    """Move every living snake once, in order; returns the snakes that moved.
+
+    With a DistanceField, it is refilled from all food once and every snake
+    follows it, falling back to greedy steering when no food is reachable.
+    timings, if given, accumulates seconds per phase ('field', 'move', 'eat').
+    """
+    start = time.perf_counter()
+    if field is not None:
+        field.compute((f.x, f.y) for f in foods)
+    field_time = time.perf_counter() - start
+    move_time = eat_time = 0.0
+
+    moved = []
+    for snake in snakes:
+        if snake.alive:
+            moved.append(snake)
+            start = time.perf_counter()
+
+            step = snake.follow(field) if field is not None else None
+            if step is not None:
+                snake.advance(step)
+            else:
+                # Find nearest food
+                nearest_food = None
+                min_dist = float('inf')
+                for f in foods:
+                    d = math.sqrt((snake.body[-1].x - f.x)**2 + (snake.body[-1].y - f.y)**2)
+                    if d < min_dist:
+                        min_dist = d
+                        nearest_food = f
+
+                if nearest_food:
+                    snake.move(Vector(nearest_food.x, nearest_food.y))
+
+            # Check collision with walls (simple check)
+            head = snake.body[-1]
+            if not snake.grid.inside(head.x, head.y):
+                snake.die()
+
+            middle = time.perf_counter()
+            snake.check_eat(foods)
+            eat_time += time.perf_counter() - middle
+            move_time += middle - start
+
+    if timings is not None:
+        for phase, seconds in (('field', field_time), ('move', move_time), ('eat', eat_time)):
+            timings[phase] = timings.get(phase, 0.0) + seconds
+    return moved
+
+def benchmark_snakes(num_snakes=200, width=400, height=200, length=50, ticks=200, pathfinding=PATHFINDING):
+    """Time update_snakes headless on a big board with many long snakes, phase by phase"""
+    random.seed(0)
+    grid = OccupancyGrid(width, height)
+    field = DistanceField(grid) if pathfinding else None
+    snakes = create_snakes(num_snakes, grid)
+    for snake in snakes:
+        snake.grow_pending = length - START_LENGTH
+    foods = [Food(random.randint(0, width-1), random.randint(0, height-1)) for _ in range(FOOD_COUNT)]
+
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(ticks):
+        update_snakes(snakes, foods, field, timings)
+    elapsed = time.perf_counter() - start
+    alive = sum(snake.alive for snake in snakes)
+    segments = sum(len(snake.body) for snake in snakes if snake.alive)
+    breakdown = ", ".join(f"{phase} {1000*seconds/ticks:.2f} ms" for phase, seconds in timings.items())
+    print(f"{num_snakes} snakes on {width}x{height}, {ticks} ticks, "
+          f"{'distance field' if pathfinding else 'greedy'}: {alive} alive, "
+          f"{segments} segments, {ticks/elapsed:.1f} ticks/s ({breakdown} per tick)")
+
 def main(stdscr):
     # Setup curses
     curses.curs_set(0)
@@ -150,14 +253,11 @@ def main(stdscr):
     curses.init_pair(3, curses.COLOR_YELLOW, curses.COLOR_BLACK)
     curses.init_pair(4, curses.COLOR_BLUE, curses.COLOR_BLACK)
 
-    colors = [1, 2, 3]
-
     # Initialize entities
+    grid = OccupancyGrid(WIDTH, HEIGHT)
+    field = DistanceField(grid) if PATHFINDING else None
     foods = [Food(random.randint(0, WIDTH-1), random.randint(0, HEIGHT-1)) for _ in range(FOOD_COUNT)]
-    snakes = []
-    for i in range(NUM_SNAKES):
-        s = Snake(random.randint(5, WIDTH-5), random.randint(5, HEIGHT-5), SNAKE_CHARS[i % 3], colors[i % 3])
-        snakes.append(s)
+    snakes = create_snakes(NUM_SNAKES, grid)
 
     try:
         while True:
@@ -167,36 +267,17 @@ def main(stdscr):
             stdscr.border(0)
 
             # Logic
-            alive_count = 0
-            for snake in snakes:
-                if snake.alive:
-                    alive_count += 1
-                    
-                    # Find nearest food
-                    nearest_food = None
-                    min_dist = float('inf')
-                    for f in foods:
-                        d = math.sqrt((snake.body[-1].x - f.x)**2 + (snake.body[-1].y - f.y)**2)
-                        if d < min_dist:
-                            min_dist = d
-                            nearest_food = f
-                    
-                    if nearest_food:
-                        snake.move(nearest_food, snakes)
-                    
-                    # Draw Snake
-                    for segment in snake.body:
-                        try:
-                            stdscr.addch(segment.y + 1, segment.x + 1, snake.char, curses.color_pair(snake.color + 1))
-                        except curses.error:
-                            pass # Ignore drawing errors at edges
-
-                    # Check collision with walls (simple check)
-                    head = snake.body[-1]
-                    if head.x < 0 or head.x >= WIDTH or head.y < 0 or head.y >= HEIGHT:
-                        snake.alive = False
-
-                    snake.check_eat(foods)
+            timings = {}
+            moved = update_snakes(snakes, foods, field, timings)
+            alive_count = len(moved)
+
+            # Draw Snake
+            for snake in moved:
+                for segment in snake.body:
+                    try:
+                        stdscr.addch(segment.y + 1, segment.x + 1, snake.char, curses.color_pair(snake.color + 1))
+                    except curses.error:
+                        pass # Ignore drawing errors at edges
 
             # Draw Food
             for f in foods:
@@ -206,7 +287,8 @@ def main(stdscr):
                     pass
 
             # Status info
-            status = f"Snakes Alive: {alive_count}/{NUM_SNAKES}"
+            status = f"Snakes Alive: {alive_count}/{NUM_SNAKES} | " + " ".join(
+                f"{phase} {1000*seconds:.1f}ms" for phase, seconds in timings.items())
             stdscr.addstr(0, 2, status, curses.color_pair(4))
 
             # Quit check
@@ -2,6 +2,8 @@ import pygame
 import numpy as np
 import random
 import math
+from force_solvers import make_solver, accuracy_report
+from particle_array import ParticleArray, ParticleView
 
 # Initialize Pygame
 pygame.init()
@@ -13,6 +15,9 @@ FPS = 60
 G = 0.5  # Gravitational constant
 PARTICLE_COUNT = 150
 TRAIL_LENGTH = 20
+SOLVER = None  # None for the pairwise loop, or 'exact' / 'barnes_hut'
+THETA = 0.5  # Barnes-Hut opening angle: larger is faster but less accurate
+USE_PARTICLE_ARRAY = False  # Keep particle state in a ParticleArray and update it as whole arrays
 
 class Particle:
     def __init__(self, x, y):
@@ -35,7 +40,7 @@ class Particle:
         self.vx += ax
         self.vy += ay
         
-    def update(self):
+    def update(self, record_trail=True):
         # Update position
         self.x += self.vx
         self.y += self.vy
@@ -54,28 +59,66 @@ class Particle:
             self.y = max(self.radius, min(HEIGHT - self.radius, self.y))
         
         # Update trail
+        if record_trail:
+            self.record_trail()
+    
+    def record_trail(self):
         self.trail.append((int(self.x), int(self.y)))
         if len(self.trail) > TRAIL_LENGTH:
             self.trail.pop(0)
     
     def draw(self, screen):
-        # Draw trail
-        if len(self.trail) > 1:
-            for i in range(len(self.trail) - 1):
-                alpha = int(255 * (i / len(self.trail)))
-                color = (*self.color, alpha)
-                start_pos = self.trail[i]
-                end_pos = self.trail[i + 1]
-                pygame.draw.line(screen, self.color[:3], start_pos, end_pos, 1)
-        
-        # Draw particle with glow effect
-        for i in range(3):
-            glow_radius = self.radius + (3 - i) * 3
-            glow_alpha = 30 - i * 10
-            glow_color = tuple(min(255, c + glow_alpha) for c in self.color)
-            pygame.draw.circle(screen, glow_color, (int(self.x), int(self.y)), glow_radius)
-        
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+        draw_particle(screen, self.x, self.y, self.radius, self.color, self.trail)
+
+def draw_particle(screen, x, y, radius, color, trail):
+    """Draw one particle with its trail and glow"""
+    # Draw trail
+    if len(trail) > 1:
+        for i in range(len(trail) - 1):
+            start_pos = trail[i]
+            end_pos = trail[i + 1]
+            pygame.draw.line(screen, color[:3], start_pos, end_pos, 1)
+    
+    # Draw particle with glow effect
+    for i in range(3):
+        glow_radius = radius + (3 - i) * 3
+        glow_alpha = 30 - i * 10
+        glow_color = tuple(min(255, c + glow_alpha) for c in color)
+        pygame.draw.circle(screen, glow_color, (int(x), int(y)), glow_radius)
+    
+    pygame.draw.circle(screen, color, (int(x), int(y)), radius)
+
+def draw_particles(screen, particles, store=None):
+    """Draw every particle, reading the store once per frame when there is one"""
+    if store is not None:
+        for (x, y), radius, color, trail in zip(*store.draw_lists()):
+            draw_particle(screen, x, y, radius, color, trail)
+    else:
+        for particle in particles:
+            particle.draw(screen)
+
+class ArrayParticle(ParticleView):
+    """Particle backed by a row of a ParticleArray, drawn like Particle"""
+    __slots__ = ()
+    draw = Particle.draw
+
+def spawn_particle(store, x, y):
+    """Add a particle with the same random attributes as Particle to the store"""
+    # Same random draws, in the same order, as Particle.__init__
+    vx = random.uniform(-2, 2)
+    vy = random.uniform(-2, 2)
+    mass = random.uniform(1, 5)
+    color = (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
+    index = store.add(x, y, vx, vy, mass, int(mass * 2), color)
+    return ArrayParticle(store, index)
+
+def update_particle_array(store, record_trail=True):
+    """Whole-array equivalent of calling Particle.update on every particle"""
+    store.integrate()
+    store.damp(0.999)
+    store.bounce(WIDTH, HEIGHT, 0.8, inclusive=True)
+    if record_trail:
+        store.record_trail(round_to_int=True)
 
 def calculate_gravitational_force(p1, p2):
     dx = p2.x - p1.x
@@ -94,26 +137,88 @@ def calculate_gravitational_force(p1, p2):
     
     return fx, fy
 
-def main():
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Gravitational Particle System")
-    clock = pygame.time.Clock()
-    
-    # Create particles
+def particle_arrays(particles):
+    """Positions, masses and radii of the particles as NumPy arrays"""
+    pos = np.array([(p.x, p.y) for p in particles], dtype=float)
+    mass = np.array([p.mass for p in particles], dtype=float)
+    radius = np.array([p.radius for p in particles], dtype=float)
+    return pos, mass, radius
+
+def create_solver(name=SOLVER, theta=THETA):
+    """Build a force solver matching calculate_gravitational_force, or None"""
+    if name is None:
+        return None
+    options = {'theta': theta} if name == 'barnes_hut' else {}
+    return make_solver(name, G=G, exclude_overlap=True, **options)
+
+def new_particle(x, y, store=None):
+    """Create a Particle, or a particle in the store when one is given"""
+    return Particle(x, y) if store is None else spawn_particle(store, x, y)
+
+def create_particles(count=PARTICLE_COUNT, store=None):
+    """Random particles plus a massive one fixed at the centre"""
     particles = []
-    for _ in range(PARTICLE_COUNT):
+    for _ in range(count):
         x = random.randint(50, WIDTH - 50)
         y = random.randint(50, HEIGHT - 50)
-        particles.append(Particle(x, y))
+        particles.append(new_particle(x, y, store))
     
     # Create a central massive particle
-    center_particle = Particle(WIDTH // 2, HEIGHT // 2)
+    center_particle = new_particle(WIDTH // 2, HEIGHT // 2, store)
     center_particle.mass = 20
     center_particle.radius = 15
     center_particle.color = (255, 200, 100)
     center_particle.vx = 0
     center_particle.vy = 0
     particles.append(center_particle)
+    return particles
+
+def apply_gravity(particles, solver=None, store=None):
+    """Apply gravitational forces between all particles"""
+    if store is not None:
+        store.apply_accelerations(solver.accelerations(store.pos, store.mass, store.radius))
+    elif solver is not None:
+        pos, mass, radius = particle_arrays(particles)
+        accelerations = solver.accelerations(pos, mass, radius)
+        for particle, (ax, ay) in zip(particles, accelerations):
+            particle.apply_force(ax * particle.mass, ay * particle.mass)
+    else:
+        for i, p1 in enumerate(particles):
+            for j, p2 in enumerate(particles):
+                if i != j:
+                    fx, fy = calculate_gravitational_force(p1, p2)
+                    p1.apply_force(fx, fy)
+
+def update_particles(particles, store=None, record_trail=True):
+    """Move, damp and bounce every particle"""
+    if store is not None:
+        update_particle_array(store, record_trail)
+    else:
+        for particle in particles:
+            particle.update(record_trail)
+
+def record_trails(particles, store=None):
+    """Add every particle's current position to its trail"""
+    if store is not None:
+        store.record_trail(round_to_int=True)
+    else:
+        for particle in particles:
+            particle.record_trail()
+
+def main(solver_name=SOLVER, use_arrays=USE_PARTICLE_ARRAY):
+    solver = create_solver(solver_name)
+    store = None
+    if use_arrays:
+        # Array storage needs whole-array gravity, so fall back to the exact solver
+        store = ParticleArray(trail_length=TRAIL_LENGTH)
+        solver = solver or create_solver('exact')
+    
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Gravitational Particle System")
+    clock = pygame.time.Clock()
+    
+    # Create particles
+    particles = create_particles(store=store)
     
     running = True
     mouse_pressed = False
@@ -130,42 +235,47 @@ def main():
                 if event.key == pygame.K_SPACE:
                     # Add new particle at mouse position
                     mouse_x, mouse_y = pygame.mouse.get_pos()
-                    particles.append(Particle(mouse_x, mouse_y))
+                    particles.append(new_particle(mouse_x, mouse_y, store))
                 elif event.key == pygame.K_r:
                     # Reset particles
                     particles.clear()
+                    if store is not None:
+                        store.clear()
                     for _ in range(PARTICLE_COUNT):
                         x = random.randint(50, WIDTH - 50)
                         y = random.randint(50, HEIGHT - 50)
-                        particles.append(Particle(x, y))
+                        particles.append(new_particle(x, y, store))
         
         # Clear screen
         screen.fill(BACKGROUND_COLOR)
         
         # Apply gravitational forces between particles
-        for i, p1 in enumerate(particles):
-            for j, p2 in enumerate(particles):
-                if i != j:
-                    fx, fy = calculate_gravitational_force(p1, p2)
-                    p1.apply_force(fx, fy)
+        apply_gravity(particles, solver, store)
         
         # Update and draw particles
-        for particle in particles:
-            particle.update()
-            particle.draw(screen)
+        update_particles(particles, store)
+        draw_particles(screen, particles, store)
         
         # Draw mouse attraction when pressed
         if mouse_pressed:
             mouse_x, mouse_y = pygame.mouse.get_pos()
-            for particle in particles:
-                dx = mouse_x - particle.x
-                dy = mouse_y - particle.y
-                distance = math.sqrt(dx**2 + dy**2)
-                if distance > 0:
-                    force = 50 / distance
-                    fx = force * (dx / distance)
-                    fy = force * (dy / distance)
-                    particle.apply_force(fx, fy)
+            if store is not None:
+                delta = np.array((mouse_x, mouse_y), dtype=float) - store.pos
+                distance = np.hypot(delta[:, 0], delta[:, 1])
+                near = distance > 0
+                force = np.zeros_like(delta)
+                force[near] = (50 / distance[near] ** 2)[:, None] * delta[near]
+                store.apply_forces(force)
+            else:
+                for particle in particles:
+                    dx = mouse_x - particle.x
+                    dy = mouse_y - particle.y
+                    distance = math.sqrt(dx**2 + dy**2)
+                    if distance > 0:
+                        force = 50 / distance
+                        fx = force * (dx / distance)
+                        fy = force * (dy / distance)
+                        particle.apply_force(fx, fy)
             
             pygame.draw.circle(screen, (255, 255, 255), (mouse_x, mouse_y), 20, 2)
         
@@ -185,5 +295,15 @@ def main():
     
     pygame.quit()
 
+def report_solver_accuracy(count=2000, theta=THETA):
+    """Print Barnes-Hut error against the exact solver for a random particle cloud"""
+    particles = [Particle(random.randint(50, WIDTH - 50), random.randint(50, HEIGHT - 50))
+                 for _ in range(count)]
+    pos, mass, radius = particle_arrays(particles)
+    report = accuracy_report(create_solver('barnes_hut', theta), pos, mass, radius)
+    print(f"Barnes-Hut theta={theta} on {count} particles:")
+    for key, value in report.items():
+        print(f"  {key:22} {value}")
+
 if __name__ == "__main__":
     main()
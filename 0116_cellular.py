@@ -3,13 +3,32 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.widgets import Button, Slider, RadioButtons
 import random
+import time
+from life_backends import TILE, PackedTileWorld, HashLifeWorld
 
 class CellularAutomaton:
-    def __init__(self, width=100, height=100, pattern='game_of_life'):
+    # Stepping engines: 'numpy' steps the whole grid at once, 'loop' is the
+    # original per-cell implementation kept for verification
+    ENGINES = ('numpy', 'loop')
+    
+    # Storage backends: 'dense' keeps a full int grid, 'packed' stores bit-packed
+    # 64x64 tiles only where cells are alive, 'hashlife' uses a memoized quadtree
+    BACKENDS = ('dense', 'packed', 'hashlife')
+    
+    def __init__(self, width=100, height=100, pattern='game_of_life', engine='numpy',
+                 backend='dense', step_log2=0):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+        if backend == 'packed' and (width % TILE or height % TILE):
+            raise ValueError(f"The packed backend needs a width and height that are multiples of {TILE}, "
+                             f"got {width}x{height}")
         self.width = width
         self.height = height
-        self.grid = np.zeros((height, width), dtype=int)
         self.pattern = pattern
+        self.engine = engine
+        self.backend = backend
         self.generation = 0
         self.history = []
         self.max_history = 50
@@ -26,13 +45,30 @@ class CellularAutomaton:
             'coagulations': (3, 3, 2, 2)
         }
         
-        # Initialize with random cells
-        self.randomize()
+        # Sparse backends keep no dense grid and start empty, since they are
+        # meant for worlds too large to fill at random
+        if backend == 'packed':
+            self.world = PackedTileWorld(width, height, self.rules[pattern])
+        elif backend == 'hashlife':
+            self.world = HashLifeWorld(width, height, self.rules[pattern], step_log2)
+        else:
+            self.world = None
+        
+        if self.world is None:
+            self.grid = np.zeros((height, width), dtype=int)
+            # Initialize with random cells
+            self.randomize()
+        else:
+            self.grid = None
     
     def randomize(self, density=0.3):
         """Randomly initialize the grid with a given density of live cells"""
-        self.grid = np.random.choice([0, 1], size=(self.height, self.width), 
-                                    p=[1-density, density])
+        grid = np.random.choice([0, 1], size=(self.height, self.width), 
+                                p=[1-density, density])
+        if self.world is None:
+            self.grid = grid
+        else:
+            self.world.load(grid)
         self.generation = 0
         self.history = []
     
@@ -80,7 +116,10 @@ class CellularAutomaton:
             for i in range(ph):
                 for j in range(pw):
                     if 0 <= y+i < self.height and 0 <= x+j < self.width:
-                        self.grid[y+i, x+j] = pattern[i, j]
+                        if self.world is None:
+                            self.grid[y+i, x+j] = pattern[i, j]
+                        else:
+                            self.world.set_cell(y+i, x+j, int(pattern[i, j]))
     
     def count_neighbors(self, y, x):
         """Count the number of live neighbors for a cell"""
@@ -96,8 +135,19 @@ class CellularAutomaton:
         
         return count
     
-    def update(self):
-        """Update the grid according to the rules of the cellular automaton"""
+    def count_all_neighbors(self):
+        """Count live neighbors for every cell at once using shifted copies of the grid"""
+        counts = np.zeros_like(self.grid)
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dy == 0 and dx == 0:
+                    continue
+                # np.roll wraps around the edges, matching the modulo in count_neighbors
+                counts += np.roll(self.grid, (dy, dx), axis=(0, 1))
+        return counts
+    
+    def _next_grid_loop(self):
+        """Compute the next generation cell by cell"""
         new_grid = np.zeros_like(self.grid)
         birth_min, birth_max, survive_min, survive_max = self.rules[self.pattern]
         
@@ -112,40 +162,106 @@ class CellularAutomaton:
                     if birth_min <= neighbors <= birth_max:
                         new_grid[y, x] = 1  # Cell is born
         
-        self.grid = new_grid
-        self.generation += 1
+        return new_grid
+    
+    def _next_grid_numpy(self):
+        """Compute the next generation for the whole grid with boolean masks"""
+        birth_min, birth_max, survive_min, survive_max = self.rules[self.pattern]
+        neighbors = self.count_all_neighbors()
+        alive = self.grid == 1
+        
+        survives = alive & (neighbors >= survive_min) & (neighbors <= survive_max)
+        born = ~alive & (neighbors >= birth_min) & (neighbors <= birth_max)
+        return (survives | born).astype(self.grid.dtype)
+    
+    def update(self):
+        """Update the grid according to the rules of the cellular automaton"""
+        self.advance()
+        return self.dense_grid()
+    
+    def steps(self, n):
+        """Advance the simulation by n generations and return the final grid"""
+        self.advance(n)
+        return self.dense_grid()
+    
+    def advance(self, n=1):
+        """Advance n steps without building a grid, which sparse backends would have to materialize"""
+        for _ in range(n):
+            self._advance_once()
+    
+    def _advance_once(self):
+        if self.world is not None:
+            if self.world.rule != self.rules[self.pattern]:
+                self.world.set_rule(self.rules[self.pattern])
+            self.world.step()
+            self.generation += self.world.generations_per_step
+        elif self.engine == 'loop':
+            self.grid = self._next_grid_loop()
+            self.generation += 1
+        else:
+            self.grid = self._next_grid_numpy()
+            self.generation += 1
         
         # Store history for density plot
-        self.history.append(np.sum(self.grid))
+        self.history.append(self.get_population())
         if len(self.history) > self.max_history:
             self.history.pop(0)
-        
-        return self.grid
+    
+    def get_population(self):
+        """Count the live cells"""
+        if self.world is not None:
+            return self.world.population
+        return np.sum(self.grid)
     
     def get_density(self):
         """Calculate the density of live cells"""
-        return np.sum(self.grid) / (self.width * self.height)
+        return self.get_population() / (self.width * self.height)
     
     def toggle_cell(self, y, x):
         """Toggle a cell between alive and dead"""
         if 0 <= y < self.height and 0 <= x < self.width:
-            self.grid[y, x] = 1 - self.grid[y, x]
+            if self.world is None:
+                self.grid[y, x] = 1 - self.grid[y, x]
+            else:
+                self.world.set_cell(y, x, 1 - self.world.get_cell(y, x))
+    
+    def dense_grid(self):
+        """The whole world as a dense array: the grid itself, or a copy built from a sparse backend"""
+        if self.world is None:
+            return self.grid
+        return self.world.window(0, 0, self.height, self.width)
+    
+    def window(self, y, x, h, w):
+        """Return a dense copy of part of the world, for display or comparison"""
+        if self.world is None:
+            return self.grid[y:y+h, x:x+w].copy()
+        return self.world.window(y, x, h, w)
+    
+    def get_stats(self):
+        """Memory and generations/sec report for sparse backends"""
+        if self.world is None:
+            return {'total_bytes': self.grid.nbytes, 'generations': self.generation}
+        return self.world.stats()
     
     def clear(self):
         """Clear the grid"""
-        self.grid = np.zeros((self.height, self.width), dtype=int)
+        if self.world is None:
+            self.grid = np.zeros((self.height, self.width), dtype=int)
+        else:
+            self.world.clear()
         self.generation = 0
         self.history = []
 
 class CellularAutomatonGUI:
-    def __init__(self, width=100, height=100):
-        self.ca = CellularAutomaton(width, height)
+    def __init__(self, width=100, height=100, backend='dense'):
+        self.ca = CellularAutomaton(width, height, backend=backend)
         self.fig = plt.figure(figsize=(14, 8))
         self.fig.suptitle('Cellular Automaton Simulator', fontsize=16)
         
         # Create grid for main display
         self.ax_grid = plt.subplot2grid((3, 3), (0, 0), colspan=2, rowspan=3)
-        self.im = self.ax_grid.imshow(self.ca.grid, cmap='binary', interpolation='nearest')
+        self.im = self.ax_grid.imshow(self.ca.dense_grid(), cmap='binary', interpolation='nearest',
+                                     vmin=0, vmax=1)
         self.ax_grid.set_title(f'Generation: {self.ca.generation}')
         
         # Create density plot
@@ -198,6 +314,10 @@ class CellularAutomatonGUI:
         ax_speed = plt.axes([0.7, 0.05, 0.2, 0.03])
         self.speed_slider = Slider(ax_speed, 'Speed', 1, 60, valinit=10, valstep=1)
         
+        # Generations advanced per redraw
+        ax_gens = plt.axes([0.7, 0.42, 0.2, 0.03])
+        self.gens_slider = Slider(ax_gens, 'Gens/frame', 1, 50, valinit=1, valstep=1)
+        
         # Pattern selector
         ax_pattern = plt.axes([0.85, 0.05, 0.12, 0.2])
         self.pattern_selector = RadioButtons(ax_pattern, list(self.ca.rules.keys()))
@@ -223,8 +343,7 @@ class CellularAutomatonGUI:
     def update_plot(self, frame=None):
         """Update the plot for animation"""
         if self.is_running:
-            self.ca.update()
-            self.im.set_data(self.ca.grid)
+            self.im.set_data(self.ca.steps(int(self.gens_slider.val)))
             self.ax_grid.set_title(f'Generation: {self.ca.generation}')
             
             # Update density plot
@@ -256,9 +375,8 @@ class CellularAutomatonGUI:
         plt.draw()
     
     def step_simulation(self, event=None):
-        """Step the simulation forward by one generation"""
-        self.ca.update()
-        self.im.set_data(self.ca.grid)
+        """Step the simulation forward by the selected number of generations"""
+        self.im.set_data(self.ca.steps(int(self.gens_slider.val)))
         self.ax_grid.set_title(f'Generation: {self.ca.generation}')
         
         # Update density plot
@@ -271,7 +389,7 @@ class CellularAutomatonGUI:
     def clear_grid(self, event=None):
         """Clear the grid"""
         self.ca.clear()
-        self.im.set_data(self.ca.grid)
+        self.im.set_data(self.ca.dense_grid())
         self.ax_grid.set_title(f'Generation: {self.ca.generation}')
         self.density_line.set_data([], [])
         plt.draw()
@@ -279,7 +397,7 @@ class CellularAutomatonGUI:
     def randomize_grid(self, event=None):
         """Randomize the grid"""
         self.ca.randomize()
-        self.im.set_data(self.ca.grid)
+        self.im.set_data(self.ca.dense_grid())
         self.ax_grid.set_title(f'Generation: {self.ca.generation}')
         self.density_line.set_data([], [])
         plt.draw()
@@ -295,7 +413,7 @@ class CellularAutomatonGUI:
         x = random.randint(10, self.ca.width - 20)
         y = random.randint(10, self.ca.height - 20)
         self.ca.add_pattern(pattern_name, x, y)
-        self.im.set_data(self.ca.grid)
+        self.im.set_data(self.ca.dense_grid())
         plt.draw()
     
     def on_click(self, event):
@@ -304,7 +422,7 @@ class CellularAutomatonGUI:
             self.dragging = True
             x, y = int(event.xdata), int(event.ydata)
             self.ca.toggle_cell(y, x)
-            self.im.set_data(self.ca.grid)
+            self.im.set_data(self.ca.dense_grid())
             plt.draw()
     
     def on_release(self, event):
@@ -316,13 +434,34 @@ class CellularAutomatonGUI:
         if self.dragging and event.inaxes == self.ax_grid:
             x, y = int(event.xdata), int(event.ydata)
             self.ca.toggle_cell(y, x)
-            self.im.set_data(self.ca.grid)
+            self.im.set_data(self.ca.dense_grid())
             plt.draw()
     
     def show(self):
         """Display the GUI"""
         plt.show()
 
+def benchmark_backends(size=4096, generations=64):
+    """Run the same soup on each backend and report memory and generations/sec"""
+    print(f"{size}x{size} world, {generations} generations of game_of_life")
+    print("-" * 60)
+    soup = np.random.RandomState(0).choice([0, 1], size=(256, 256), p=[0.7, 0.3])
+    
+    for backend in CellularAutomaton.BACKENDS:
+        ca = CellularAutomaton(size, size, backend=backend)
+        ca.clear()
+        if ca.world is None:
+            ca.grid[:256, :256] = soup
+        else:
+            ca.world.load(soup)
+        
+        start = time.perf_counter()
+        ca.advance(generations)
+        elapsed = time.perf_counter() - start
+        stats = ca.get_stats()
+        print(f"{backend:10} | {ca.get_population():8,} live | "
+              f"{stats['total_bytes']/1024:11.1f} KB | {generations/elapsed:8.1f} gen/s")
+
 if __name__ == "__main__":
     # Create and run the cellular automaton GUI
     gui = CellularAutomatonGUI(width=100, height=100)
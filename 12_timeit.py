@@ -1,8 +1,7 @@
-from timeit import default_timer as timer
+from bench import measure
 
-start = timer()
+# Warmed-up, repeated timing instead of a single start/stop pair
+stats = measure(lambda: lambda: 23*2.3, warmup=1, repeat=5, memory=False)
 
-print(23*2.3)
-
-end = timer()
-print(end - start)
+print(stats['result'])
+print(f"min {stats['min']:.9f}s, median {stats['median']:.9f}s, IQR {stats['iqr']:.9f}s")
@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from escape_time import escape_time
 
 def mandelbrot(c, max_iter):
     z = 0
@@ -9,20 +10,20 @@ def mandelbrot(c, max_iter):
         n += 1
     return n
 
-def mandelbrot_set(xmin, xmax, ymin, ymax, width, height, max_iter):
+def mandelbrot_set(xmin, xmax, ymin, ymax, width, height, max_iter, smooth=False):
     r1 = np.linspace(xmin, xmax, width)
     r2 = np.linspace(ymin, ymax, height)
-    n3 = np.empty((width, height))
 
-    for i in range(width):
-        for j in range(height):
-            n3[i, j] = mandelbrot(r1[i] + 1j*r2[j], max_iter)
+    # Whole grid at once; n3[i, j] is the count for r1[i] + 1j*r2[j], as mandelbrot() gives
+    counts = escape_time(0, r1[:, None] + 1j*r2[None, :], max_iter, smooth=smooth)
+    n3 = (counts[1] if smooth else counts).astype(float)
 
     return (r1, r2, n3)
 
 xmin, xmax, ymin, ymax = -2.0, 1.0, -1.5, 1.5
 width, height = 800, 800
 max_iter = 256
+smooth = False  # Continuous colouring instead of integer iteration bands
 
 dpi = 80
 figsize = width / float(dpi), height / float(dpi)
@@ -30,7 +31,7 @@ figsize = width / float(dpi), height / float(dpi)
 fig = plt.figure(figsize=figsize, dpi=dpi)
 ax = fig.add_axes([0.0, 0.0, 1.0, 1.0], frameon=False, aspect=1)
 
-r1, r2, n3 = mandelbrot_set(xmin, xmax, ymin, ymax, width, height, max_iter)
+r1, r2, n3 = mandelbrot_set(xmin, xmax, ymin, ymax, width, height, max_iter, smooth)
 
 plt.imshow(n3.T, extent=[xmin, xmax, ymin, ymax], cmap='hot')
 plt.colorbar()
@@ -3,10 +3,20 @@ import math
 import os
 import sys
 
+import numpy as np
+
+from raster3d import PointRaster
+from terminal_frame import TerminalRenderer
+
 class DNAHelix:
-    def __init__(self, width=80, height=24, speed=0.1):
+    def __init__(self, width=80, height=24, speed=0.1, diff_render=False, vectorized=False):
         self.width = width
         self.height = height
+        # vectorized draws both strands and the pairs as arrays through a PointRaster,
+        # with calculate_position's perspective; rows are not foreshortened
+        self.raster = PointRaster(width, height, camera_distance=20, scale=20, flat_y=True) if vectorized else None
+        # With diff_render, frames go through a TerminalRenderer that only rewrites changed cells
+        self.screen = TerminalRenderer(width, height) if diff_render else None
         self.speed = speed
         self.time = 0
         self.pairs = ['A-T', 'T-A', 'G-C', 'C-G']
@@ -43,10 +53,35 @@ class DNAHelix:
         depth_index = int((z + 10) / 5) % len(depth_chars)
         return depth_chars[depth_index]
     
-    def render(self):
-        self.clear_screen()
+    def draw_helix_batch(self):
+        """draw_helix() with all rows at once, nearer strand in front, pairs on top"""
+        raster = self.raster
+        raster.clear()
+        y = np.arange(self.height, dtype=np.float64)
+        radius = 8
+        strands = []
+        for offset in (0, math.pi):
+            angle = (y * 0.5 + self.time + offset) % (2 * math.pi)
+            strands.append(np.column_stack([radius * np.cos(angle), y, radius * np.sin(angle)]))
+        points = np.concatenate(strands)
+        depth_chars = np.array([ord(c) for c in '░▒▓█'], dtype=np.uint32)
+        raster.draw(points, depth_chars[((points[:, 2] + 10) / 5).astype(np.int64) % 4])
         
-        # Create buffer for the frame
+        # Pair letters sit halfway between the projected strands, whichever is in front
+        (x1, _, z1), (x2, _, z2) = (s.T for s in strands)
+        column1 = np.trunc(self.width / 2 + x1 * 20 / (20 + z1)).astype(np.int64)
+        column2 = np.trunc(self.width / 2 + x2 * 20 / (20 + z2)).astype(np.int64)
+        both = (column1 >= 0) & (column1 < self.width) & (column2 >= 0) & (column2 < self.width)
+        letters = np.array([[ord(p[0]), ord(p[2])] for p in self.pairs], dtype=np.uint32)
+        letter = letters[y.astype(np.int64) % len(self.pairs), np.where(z1 > z2, 0, 1)]
+        # A point at depth 0 lands on column trunc(width / 2 + x)
+        middle = (column1 + column2) // 2 + 0.5 - self.width / 2
+        labels = np.column_stack([middle, y, np.zeros(self.height)])[both]
+        raster.draw(labels, letter[both], depth=np.inf)
+        return [list(row) for row in raster.rows()]
+    
+    def draw_helix(self):
+        """Both strands and the base pairs, one row at a time"""
         buffer = [[' ' for _ in range(self.width)] for _ in range(self.height)]
         depth_buffer = [[float('-inf') for _ in range(self.width)] for _ in range(self.height)]
         
@@ -73,6 +108,14 @@ class DNAHelix:
                 if 0 <= mid_x < self.width:
                     buffer[y][mid_x] = pair[0] if z1 > z2 else pair[2]
         
+        return buffer
+    
+    def render(self):
+        if self.screen is None:
+            self.clear_screen()
+        
+        buffer = self.draw_helix_batch() if self.raster is not None else self.draw_helix()
+        
         # Add title
         title = "DNA DOUBLE HELIX ANIMATION"
         title_x = (self.width - len(title)) // 2
@@ -90,19 +133,24 @@ class DNAHelix:
                     buffer[self.height-1][info_x + i] = char
         
         # Print buffer
-        for row in buffer:
-            print(''.join(row))
+        if self.screen is not None:
+            self.screen.blit(buffer)
+            self.screen.present()
+        else:
+            for row in buffer:
+                print(''.join(row))
         
         self.time += self.speed
 
 def main():
-    helix = DNAHelix()
+    helix = DNAHelix(diff_render=True, vectorized=True)
     
     try:
         while True:
             helix.render()
             time.sleep(0.05)
     except KeyboardInterrupt:
+        helix.screen.close()
         print("\nAnimation stopped. Goodbye!")
         sys.exit(0)
 
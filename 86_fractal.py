@@ -5,10 +5,23 @@ import os
 import sys
 from datetime import datetime
 
+from branch_geometry import BranchGeometry
+from terminal_frame import TerminalRenderer
+
 class FractalTree:
-    def __init__(self, width=80, height=40):
+    def __init__(self, width=80, height=40, diff_render=False, max_depth=8, cached=False, seed=None):
         self.width = width
         self.height = height
+        self.max_depth = max_depth
+        # cached grows the tree once per season from seed (random if None) and only
+        # re-bends it in the wind each frame, instead of regrowing it every frame
+        self.cached = cached
+        self.seed = seed
+        self._geometry = None
+        self._geometry_key = None
+        # With diff_render, frames go through a TerminalRenderer that only rewrites changed
+        # cells; the three rows below the tree hold the info text
+        self.screen = TerminalRenderer(width, height + 3) if diff_render else None
         self.frame = [[' ' for _ in range(width)] for _ in range(height)]
         self.wind_force = 0
         self.wind_phase = 0
@@ -113,7 +126,8 @@ class FractalTree:
     
     def render(self):
         # Clear screen
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if self.screen is None:
+            os.system('cls' if os.name == 'nt' else 'clear')
         
         # Draw ground
         ground_chars = ['▒', '░', '▓']
@@ -136,32 +150,67 @@ class FractalTree:
                     if random.random() > 0.3:
                         self.draw_char(cloud_x + dx, cloud_y + dy, '☁')
         
+        season_names = ['Spring', 'Summer', 'Autumn', 'Winter']
+        info = f"Season: {season_names[self.season]} | Wind: {abs(self.wind_force):.2f}"
+        controls = "Press SPACE to change season, ESC to exit"
+        if self.screen is not None:
+            self.screen.clear()
+            self.screen.blit(self.frame)
+            self.screen.text(0, self.height + 1, info)
+            self.screen.text(0, self.height + 2, controls)
+            self.screen.present()
+            return
+        
         # Print frame
         for row in self.frame:
             print(''.join(row))
         
         # Print info
-        season_names = ['Spring', 'Summer', 'Autumn', 'Winter']
-        print(f"\nSeason: {season_names[self.season]} | Wind: {abs(self.wind_force):.2f}")
-        print("Press SPACE to change season, ESC to exit")
+        print(f"\n{info}")
+        print(controls)
+    
+    def branch_geometry(self):
+        """The tree grown for the current season, rebuilt only when the season or size changes"""
+        key = (self.season, self.max_depth, self.width, self.height)
+        if self._geometry is None or self._geometry_key != key:
+            if self.seed is None:
+                self.seed = random.randrange(1 << 32)
+            self._geometry = BranchGeometry(
+                self.width // 2,
+                self.height - 3,
+                self.height // 3,
+                -math.pi / 2,
+                self.max_depth,
+                random.Random(self.seed * 4 + self.season),
+                self.season_colors[self.season]
+            )
+            self._geometry_key = key
+        return self._geometry
+    
+    def draw_frame(self):
+        """Draw the tree in the current wind, advance the wind and show the frame"""
+        self.clear_frame()
+        
+        # Draw main tree
+        if self.cached:
+            self.branch_geometry().draw(self.frame, self.wind_phase, self.wind_force)
+        else:
+            self.draw_branch(
+                self.width // 2,
+                self.height - 3,
+                self.height // 3,
+                -math.pi / 2,
+                0,
+                self.max_depth
+            )
+        
+        self.update_wind()
+        self.render()
     
     def animate(self):
         try:
             while True:
-                self.clear_frame()
-                
-                # Draw main tree
-                self.draw_branch(
-                    self.width // 2,
-                    self.height - 3,
-                    self.height // 3,
-                    -math.pi / 2,
-                    0,
-                    8
-                )
-                
-                self.update_wind()
-                self.render()
+                self.draw_frame()
                 time.sleep(0.1)
                 
                 # Check for keypress
@@ -174,6 +223,29 @@ class FractalTree:
                         
         except KeyboardInterrupt:
             pass
+        finally:
+            if self.screen is not None:
+                self.screen.close()
+
+def benchmark_tree(width=160, height=90, max_depth=12, frames=50):
+    """Compare per-frame tree drawing times of the recursion and the cached geometry"""
+    print(f"{width}x{height}, max_depth {max_depth}, {frames} frames")
+    print("-" * 60)
+    for cached in (False, True):
+        random.seed(0)
+        tree = FractalTree(width, height, max_depth=max_depth, cached=cached, seed=0)
+        if cached:
+            tree.branch_geometry()  # Grown once per season, not part of a frame
+        start = time.perf_counter()
+        for _ in range(frames):
+            tree.clear_frame()
+            if cached:
+                tree.branch_geometry().draw(tree.frame, tree.wind_phase, tree.wind_force)
+            else:
+                tree.draw_branch(width // 2, height - 3, height // 3, -math.pi / 2, 0, max_depth)
+            tree.update_wind()
+        elapsed = (time.perf_counter() - start) / frames
+        print(f"{'cached' if cached else 'recursive':10} | {1000*elapsed:7.2f} ms/frame | {1/elapsed:7.1f} fps")
 
 # Main execution
 if __name__ == "__main__":
@@ -184,7 +256,7 @@ if __name__ == "__main__":
     print("Starting animation...")
     time.sleep(2)
     
-    tree = FractalTree()
+    tree = FractalTree(diff_render=True, cached=True)
     tree.animate()
     
     print("\nThanks for watching! 🌲")
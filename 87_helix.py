@@ -4,15 +4,22 @@ import os
 import sys
 from typing import List, Tuple
 
+import numpy as np
+
+from raster3d import PointRaster, rotation_matrix, shade
+
 class DNAHelix3D:
-    def __init__(self, width: int = 80, height: int = 24):
+    def __init__(self, width: int = 80, height: int = 24, base_pairs: int = 20, vectorized: bool = False):
         self.width = width
         self.height = height
         self.time = 0
         self.rotation_speed = 0.05
         self.helix_radius = 8
         self.helix_height = 15
-        self.base_pairs = 20
+        self.base_pairs = base_pairs
+        # vectorized draws every point of a frame at once through a PointRaster
+        self.raster = PointRaster(width, height) if vectorized else None
+        self._strand_points = None
         self.z_buffer = [[-float('inf')] * width for _ in range(height)]
         self.screen = [[' '] * width for _ in range(height)]
         
@@ -122,8 +129,49 @@ class DNAHelix3D:
                             self.z_buffer[screen_y][screen_x] = depth
                             self.screen[screen_y][screen_x] = '-'
     
+    def strand_points(self) -> np.ndarray:
+        """Both strands as one (N, 3) array, in drawing order; they do not change between frames"""
+        if self._strand_points is None or len(self._strand_points) != self.base_pairs * 8:
+            t = np.arange(self.base_pairs * 4) / 4.0
+            y = (t - self.base_pairs / 2) * (self.helix_height / self.base_pairs)
+            strands = []
+            for offset in (0, math.pi):
+                angle = t * 2 * math.pi / 4 + offset
+                strands.append(np.column_stack([self.helix_radius * np.cos(angle), y,
+                                                self.helix_radius * np.sin(angle)]))
+            self._strand_points = np.concatenate(strands)
+        return self._strand_points
+    
+    def base_pair_points(self) -> np.ndarray:
+        """Five points along every base pair at the current time, as an (N, 3) array"""
+        t = np.arange(self.base_pairs)
+        y = (t - self.base_pairs / 2) * (self.helix_height / self.base_pairs)
+        angle = t * 2 * math.pi / 4 + self.time
+        first = np.column_stack([self.helix_radius * np.cos(angle), y, self.helix_radius * np.sin(angle)])
+        second = np.column_stack([self.helix_radius * np.cos(angle + math.pi), y,
+                                  self.helix_radius * np.sin(angle + math.pi)])
+        steps = np.arange(5)[None, :, None] / 4.0
+        return (first[:, None, :] + (second - first)[:, None, :] * steps).reshape(-1, 3)
+    
+    def render_batch(self) -> str:
+        """render() with every point rotated, projected and depth-tested as arrays"""
+        raster = self.raster
+        raster.clear()
+        strands = self.strand_points()
+        points = np.concatenate([strands, self.base_pair_points()])
+        points = points @ rotation_matrix(math.sin(self.time) * 0.3, self.time).T
+        # Strands are shaded by depth, base pairs drawn as '-'
+        chars = shade(points[:, 2], self.depth_chars)
+        chars[len(strands):] = ord('-')
+        raster.draw(points, chars)
+        self.z_buffer, self.screen = raster.depth, raster.chars
+        return raster.frame()
+    
     def render(self):
         """Render the complete DNA helix"""
+        if self.raster is not None:
+            return self.render_batch()
+        
         # Clear buffers
         self.z_buffer = [[-float('inf')] * self.width for _ in range(self.height)]
         self.screen = [[' '] * self.width for _ in range(self.height)]
@@ -161,6 +209,24 @@ class DNAHelix3D:
         except KeyboardInterrupt:
             print("\nAnimation stopped. Goodbye!")
 
+def benchmark_render(width=160, height=48, base_pairs=200, frames=100):
+    """Compare per-frame render times of the point loop and the batch pipeline"""
+    print(f"{width}x{height}, {base_pairs} base pairs, {frames} frames")
+    print("-" * 60)
+    for vectorized in (False, True):
+        helix = DNAHelix3D(width, height, base_pairs, vectorized=vectorized)
+        times = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            helix.render()
+            times.append(time.perf_counter() - start)
+            helix.time += helix.rotation_speed
+        times.sort()
+        mean = sum(times) / frames
+        print(f"{'vectorized' if vectorized else 'loop':10} | mean {1000*mean:7.2f} ms | "
+              f"p95 {1000*times[int(0.95 * (frames - 1))]:7.2f} ms | max {1000*times[-1]:7.2f} ms | "
+              f"{1/mean:7.1f} fps")
+
 def main():
     """Main function to run the DNA helix animation"""
     print("Initializing 3D DNA Helix Animation...")
@@ -173,7 +239,7 @@ def main():
     time.sleep(2)
     
     # Create and run animation
-    helix = DNAHelix3D()
+    helix = DNAHelix3D(vectorized=True)
     helix.animate()
 
 if __name__ == "__main__":
@@ -6,8 +6,12 @@ from collections import defaultdict
 import math
 import time
 
+from food_index import FoodIndex
+from spatial_hash import SpatialHash
+
 class Creature:
-    def __init__(self, x, y, dna=None):
+    def __init__(self, x, y, dna=None, rng=random):
+        self.rng = rng
         self.x = x
         self.y = y
         self.age = 0
@@ -17,16 +21,16 @@ class Creature:
         if dna is None:
             # Random DNA traits (0-255 values)
             self.dna = {
-                'speed': random.randint(1, 10),
-                'vision': random.randint(2, 8),
-                'efficiency': random.randint(1, 10),
-                'reproduction_threshold': random.randint(70, 120),
-                'metabolism': random.randint(1, 5),
-                'aggression': random.randint(0, 10),
-                'cooperation': random.randint(0, 10),
-                'color_r': random.randint(50, 255),
-                'color_g': random.randint(50, 255),
-                'color_b': random.randint(50, 255)
+                'speed': self.rng.randint(1, 10),
+                'vision': self.rng.randint(2, 8),
+                'efficiency': self.rng.randint(1, 10),
+                'reproduction_threshold': self.rng.randint(70, 120),
+                'metabolism': self.rng.randint(1, 5),
+                'aggression': self.rng.randint(0, 10),
+                'cooperation': self.rng.randint(0, 10),
+                'color_r': self.rng.randint(50, 255),
+                'color_g': self.rng.randint(50, 255),
+                'color_b': self.rng.randint(50, 255)
             }
         else:
             self.dna = self.mutate_dna(dna)
@@ -36,8 +40,8 @@ class Creature:
         mutated = parent_dna.copy()
         for key in mutated:
             if key != 'generation':
-                if random.random() < 0.1:  # 10% mutation chance
-                    mutation = random.randint(-5, 5)
+                if self.rng.random() < 0.1:  # 10% mutation chance
+                    mutation = self.rng.randint(-5, 5)
                     mutated[key] = max(0, min(255, mutated[key] + mutation))
         return mutated
     
@@ -70,8 +74,8 @@ class Creature:
             dx = np.sign(nearest_target[0] - self.x) if hasattr(nearest_target, '__len__') else np.sign(nearest_target.x - self.x)
             dy = np.sign(nearest_target[1] - self.y) if hasattr(nearest_target, '__len__') else np.sign(nearest_target.y - self.y)
         else:
-            dx = random.randint(-1, 1)
-            dy = random.randint(-1, 1)
+            dx = self.rng.randint(-1, 1)
+            dy = self.rng.randint(-1, 1)
         
         # Apply speed
         self.x = max(0, min(world_width - 1, self.x + dx * speed))
@@ -91,29 +95,43 @@ class Creature:
         return self.energy > self.dna['reproduction_threshold']
 
 class World:
-    def __init__(self, width, height):
+    def __init__(self, width, height, initial_creatures=20, initial_food=50, max_creatures=100,
+                 rng=None):
+        # The global generator unless an explicit one (see run_control.make_rngs)
+        # is given, which makes runs reproducible
+        self.rng = rng if rng is not None else random
         self.width = width
         self.height = height
         self.creatures = []
-        self.food = []
+        self.food = FoodIndex(cell_size=8)  # (x, y) tuples, indexed by position
+        self.creature_grid = SpatialHash(cell_size=8)
+        self.max_creatures = max_creatures
         self.generation = 0
         self.stats = defaultdict(int)
         self.time_step = 0
         
         # Initialize creatures
-        for _ in range(20):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            self.creatures.append(Creature(x, y))
+        for _ in range(initial_creatures):
+            x = self.rng.randint(0, width - 1)
+            y = self.rng.randint(0, height - 1)
+            self.creatures.append(Creature(x, y, rng=self.rng))
         
         # Initialize food
-        self.spawn_food(50)
+        self.spawn_food(initial_food)
     
     def spawn_food(self, count):
         for _ in range(count):
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            self.food.append((x, y))
+            x = self.rng.randint(0, self.width - 1)
+            y = self.rng.randint(0, self.height - 1)
+            self.food.add(x, y)
+    
+    def nearby(self, creature, order):
+        """Creatures and food within the creature's vision, in the order a full scan would visit them"""
+        x, y = creature.x, creature.y
+        vision = creature.dna['vision']
+        food = [self.food.values[handle] for handle in self.food.within(x, y, vision)]
+        others = sorted(self.creature_grid.neighbors(creature, vision), key=order.__getitem__)
+        return others, food
     
     def update(self):
         self.time_step += 1
@@ -125,32 +143,37 @@ class World:
         # Update creatures
         new_creatures = []
         dead_creatures = []
+        self.creature_grid.sync(self.creatures)
+        order = {creature: i for i, creature in enumerate(self.creatures)}
         
         for creature in self.creatures:
-            creature.move(self.width, self.height, self.creatures, self.food)
+            others, food = self.nearby(creature, order)
+            creature.move(self.width, self.height, others, food)
+            self.creature_grid.move(creature, creature.x, creature.y)
             
             # Eat food
-            for i, (fx, fy) in enumerate(self.food):
-                if creature.x == fx and creature.y == fy:
-                    creature.energy += 20
-                    self.food.pop(i)
-                    break
+            eaten = self.food.at(creature.x, creature.y)
+            if eaten is not None:
+                creature.energy += 20
+                self.food.remove(eaten)
             
             # Update creature
             if not creature.update():
                 dead_creatures.append(creature)
             
             # Reproduction
-            elif creature.can_reproduce() and len(self.creatures) < 100:
+            elif creature.can_reproduce() and len(self.creatures) < self.max_creatures:
                 creature.energy /= 2
-                offspring = Creature(creature.x, creature.y, creature.dna)
+                offspring = Creature(creature.x, creature.y, creature.dna, self.rng)
                 new_creatures.append(offspring)
         
         # Remove dead creatures
+        if dead_creatures:
+            dead_set = set(dead_creatures)
+            self.creatures = [c for c in self.creatures if c not in dead_set]
         for dead in dead_creatures:
-            self.creatures.remove(dead)
             # Dead creature becomes food
-            self.food.append((dead.x, dead.y))
+            self.food.add(dead.x, dead.y)
         
         # Add new creatures
         self.creatures.extend(new_creatures)
@@ -2,16 +2,26 @@ import numpy as np
 import random
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import List, Tuple
 
+import neuro_batch
+
 # Neural Network for AI agent
 class NeuralNetwork:
-    def __init__(self, input_size=8, hidden_size=16, output_size=4):
-        self.weights1 = np.random.randn(input_size, hidden_size) * 0.5
-        self.weights2 = np.random.randn(hidden_size, output_size) * 0.5
-        self.bias1 = np.random.randn(hidden_size) * 0.5
-        self.bias2 = np.random.randn(output_size) * 0.5
+    def __init__(self, input_size=8, hidden_size=16, output_size=4, np_rng=np.random):
+        self.weights1 = np_rng.randn(input_size, hidden_size) * 0.5
+        self.weights2 = np_rng.randn(hidden_size, output_size) * 0.5
+        self.bias1 = np_rng.randn(hidden_size) * 0.5
+        self.bias2 = np_rng.randn(output_size) * 0.5
+    
+    @classmethod
+    def from_genome(cls, genome, shapes=None):
+        """Network whose weights are views into one row of a genome matrix"""
+        network = cls.__new__(cls)
+        layers = neuro_batch.split_genomes(genome[None, :], shapes or neuro_batch.layer_shapes())
+        network.weights1, network.bias1, network.weights2, network.bias2 = (l[0] for l in layers)
+        return network
     
     def forward(self, x):
         self.z1 = np.dot(x, self.weights1) + self.bias1
@@ -19,22 +29,22 @@ class NeuralNetwork:
         self.z2 = np.dot(self.a1, self.weights2) + self.bias2
         return np.tanh(self.z2)
     
-    def mutate(self, rate=0.1):
-        if random.random() < rate:
-            self.weights1 += np.random.randn(*self.weights1.shape) * 0.2
-            self.weights2 += np.random.randn(*self.weights2.shape) * 0.2
-            self.bias1 += np.random.randn(*self.bias1.shape) * 0.2
-            self.bias2 += np.random.randn(*self.bias2.shape) * 0.2
+    def mutate(self, rate=0.1, rng=random, np_rng=np.random):
+        if rng.random() < rate:
+            self.weights1 += np_rng.randn(*self.weights1.shape) * 0.2
+            self.weights2 += np_rng.randn(*self.weights2.shape) * 0.2
+            self.bias1 += np_rng.randn(*self.bias1.shape) * 0.2
+            self.bias2 += np_rng.randn(*self.bias2.shape) * 0.2
     
-    def crossover(self, other):
-        child = NeuralNetwork()
-        mask1 = np.random.random(self.weights1.shape) > 0.5
-        mask2 = np.random.random(self.weights2.shape) > 0.5
+    def crossover(self, other, rng=random, np_rng=np.random):
+        child = NeuralNetwork(np_rng=np_rng)
+        mask1 = np_rng.random(self.weights1.shape) > 0.5
+        mask2 = np_rng.random(self.weights2.shape) > 0.5
         
         child.weights1 = np.where(mask1, self.weights1, other.weights1)
         child.weights2 = np.where(mask2, self.weights2, other.weights2)
-        child.bias1 = np.where(random.random() > 0.5, self.bias1, other.bias1)
-        child.bias2 = np.where(random.random() > 0.5, self.bias2, other.bias2)
+        child.bias1 = np.where(rng.random() > 0.5, self.bias1, other.bias1)
+        child.bias2 = np.where(rng.random() > 0.5, self.bias2, other.bias2)
         
         return child
 
@@ -46,7 +56,7 @@ class Agent:
     score: int = 0
     alive: bool = True
     
-    def get_inputs(self, food_pos, world_size):
+    def get_inputs(self, food_pos, world_size, rng=random):
         # Distance and angle to nearest food
         to_food = food_pos - self.position
         distance = np.linalg.norm(to_food)
@@ -61,7 +71,7 @@ class Agent:
             np.sin(angle),
             self.energy / 100,
             self.score / 10,
-            random.random()  # Random exploration factor
+            rng.random()  # Random exploration factor
         ]
         
         return np.array(inputs)
@@ -79,7 +89,20 @@ class Agent:
             self.alive = False
 
 class Simulation:
-    def __init__(self, population_size=50, world_size=(100, 100), num_food=10):
+    def __init__(self, population_size=50, world_size=(100, 100), num_food=10,
+                 rng=None, np_rng=None, batched=False, evaluator=None, flat_genomes=False):
+        # The global generators unless explicit ones (see run_control.make_rngs)
+        # are given, which makes runs reproducible
+        self.rng = rng if rng is not None else random
+        self.np_rng = np_rng if np_rng is not None else np.random
+        # Evaluate the whole population with stacked weights (see neuro_batch);
+        # agents then all sense the food as it was at the start of each tick
+        # A neuro_parallel.ParallelEvaluator shards the batched evaluation over processes
+        self.evaluator = evaluator
+        self.batched = batched or evaluator is not None
+        # Keep every brain as a row of one float32 matrix and breed with whole-matrix operations
+        self.flat_genomes = flat_genomes
+        self.genomes = None
         self.population_size = population_size
         self.world_size = world_size
         self.num_food = num_food
@@ -90,21 +113,64 @@ class Simulation:
         self.history = []
         
     def initialize_population(self):
+        if self.flat_genomes:
+            size = sum(int(np.prod(shape)) for shape in neuro_batch.layer_shapes())
+            self.set_genomes(self.np_rng.randn(self.population_size, size) * 0.5)
+            return
         self.agents = []
         for _ in range(self.population_size):
             pos = np.array([
-                random.uniform(10, self.world_size[0] - 10),
-                random.uniform(10, self.world_size[1] - 10)
+                self.rng.uniform(10, self.world_size[0] - 10),
+                self.rng.uniform(10, self.world_size[1] - 10)
             ])
-            brain = NeuralNetwork()
+            brain = NeuralNetwork(np_rng=self.np_rng)
             self.agents.append(Agent(pos, brain))
     
+    def set_genomes(self, genomes):
+        """Switch to a flat population, one agent per genome row, at fresh random positions"""
+        self.genomes = np.array(genomes, dtype=np.float32)
+        self._spare_genomes = np.empty_like(self.genomes)
+        self.population_size = len(self.genomes)
+        self.flat_genomes = True
+        self.agents = [Agent(self.random_position(), NeuralNetwork.from_genome(genome))
+                       for genome in self.genomes]
+    
+    def __getstate__(self):
+        # Flat brains are views into self.genomes, a link pickling would
+        # break, so they are left out and rebuilt over the restored matrix
+        state = self.__dict__.copy()
+        if self.genomes is not None:
+            state['agents'] = [replace(agent, brain=None) for agent in self.agents]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.genomes is not None:
+            for agent, genome in zip(self.agents, self.genomes):
+                agent.brain = NeuralNetwork.from_genome(genome)
+    
+    def save_genomes(self, path):
+        """Write the population's genomes to one .npy file"""
+        if self.genomes is None:
+            np.save(path, neuro_batch.flatten_brains([a.brain for a in self.agents], np.float32))
+        else:
+            np.save(path, self.genomes)
+    
+    def load_genomes(self, path):
+        """Replace the population with genomes saved by save_genomes"""
+        self.set_genomes(np.load(path))
+    
+    def random_position(self):
+        """A spawn point away from the walls"""
+        return np.array([self.rng.uniform(10, self.world_size[0] - 10),
+                         self.rng.uniform(10, self.world_size[1] - 10)])
+    
     def place_food(self):
         self.food_positions = []
         for _ in range(self.num_food):
             pos = np.array([
-                random.uniform(5, self.world_size[0] - 5),
-                random.uniform(5, self.world_size[1] - 5)
+                self.rng.uniform(5, self.world_size[0] - 5),
+                self.rng.uniform(5, self.world_size[1] - 5)
             ])
             self.food_positions.append(pos)
     
@@ -120,38 +186,64 @@ class Simulation:
         for i, food in enumerate(self.food_positions):
             if np.linalg.norm(agent.position - food) < 3:
                 self.food_positions[i] = np.array([
-                    random.uniform(5, self.world_size[0] - 5),
-                    random.uniform(5, self.world_size[1] - 5)
+                    self.rng.uniform(5, self.world_size[0] - 5),
+                    self.rng.uniform(5, self.world_size[1] - 5)
                 ])
                 agent.score += 1
                 agent.energy = min(100, agent.energy + 20)
                 return True
         return False
     
+    def evolve_flat_population(self):
+        """evolve_population as whole-matrix operations on the genome matrix"""
+        fitness = np.array([a.score + a.energy/10 for a in self.agents])
+        ranked = np.argsort(-fitness, kind='stable')
+        elite_size = self.population_size // 5
+        parents = ranked[:self.population_size//2]
+        children = self.population_size - elite_size
+        
+        new = self._spare_genomes
+        new[:elite_size] = self.genomes[ranked[:elite_size]]
+        neuro_batch.crossover_genomes(
+            self.genomes, parents[self.np_rng.randint(len(parents), size=children)],
+            parents[self.np_rng.randint(len(parents), size=children)],
+            neuro_batch.layer_shapes(), self.np_rng, new[elite_size:])
+        neuro_batch.mutate_genomes(new[elite_size:], 0.1, self.np_rng)
+        # Copy back rather than swap so the agents' brains stay views of self.genomes
+        self.genomes[:] = new
+        
+        for agent in self.agents:
+            agent.position = self.random_position()
+            agent.energy, agent.score, agent.alive = 100, 0, True
+        self.generation += 1
+    
     def evolve_population(self):
+        if self.flat_genomes:
+            self.evolve_flat_population()
+            return
         # Sort agents by fitness (score + energy)
         sorted_agents = sorted(self.agents, key=lambda a: a.score + a.energy/10, reverse=True)
         
         # Keep top performers
         elite_size = self.population_size // 5
         new_agents = [Agent(
-            np.array([random.uniform(10, self.world_size[0] - 10),
-                     random.uniform(10, self.world_size[1] - 10)]),
+            np.array([self.rng.uniform(10, self.world_size[0] - 10),
+                     self.rng.uniform(10, self.world_size[1] - 10)]),
             sorted_agents[i].brain,
             100, 0, True
         ) for i in range(elite_size)]
         
         # Create offspring through crossover and mutation
         while len(new_agents) < self.population_size:
-            parent1 = random.choice(sorted_agents[:self.population_size//2])
-            parent2 = random.choice(sorted_agents[:self.population_size//2])
+            parent1 = self.rng.choice(sorted_agents[:self.population_size//2])
+            parent2 = self.rng.choice(sorted_agents[:self.population_size//2])
             
-            child_brain = parent1.brain.crossover(parent2.brain)
-            child_brain.mutate(0.1)
+            child_brain = parent1.brain.crossover(parent2.brain, self.rng, self.np_rng)
+            child_brain.mutate(0.1, self.rng, self.np_rng)
             
             new_agents.append(Agent(
-                np.array([random.uniform(10, self.world_size[0] - 10),
-                         random.uniform(10, self.world_size[1] - 10)]),
+                np.array([self.rng.uniform(10, self.world_size[0] - 10),
+                         self.rng.uniform(10, self.world_size[1] - 10)]),
                 child_brain,
                 100, 0, True
             ))
@@ -159,20 +251,47 @@ class Simulation:
         self.agents = new_agents
         self.generation += 1
     
+    def run_generation_batched(self, max_steps=500):
+        """run_generation's agent loop with every agent stepped at once"""
+        food = np.array(self.food_positions, dtype=float).reshape(-1, 2)
+        brains = [a.brain for a in self.agents]
+        start = np.array([a.position for a in self.agents])
+        if self.evaluator is not None:
+            genomes = self.genomes if self.flat_genomes else neuro_batch.flatten_brains(brains)
+            positions, energy, score, alive = self.evaluator.run_generation(
+                genomes, neuro_batch.layer_shapes(), start, food, self.world_size,
+                self.np_rng, max_steps)
+        else:
+            if self.flat_genomes:
+                layers = neuro_batch.split_genomes(self.genomes, neuro_batch.layer_shapes())
+            else:
+                layers = neuro_batch.stack_brains(brains)
+            positions, energy, score, alive = neuro_batch.run_generation(
+                layers, start, food, self.world_size, self.np_rng, max_steps)
+        for i, agent in enumerate(self.agents):
+            agent.position = positions[i]
+            agent.energy = int(energy[i])
+            agent.score = int(score[i])
+            agent.alive = bool(alive[i])
+        self.food_positions = list(food)
+    
     def run_generation(self, max_steps=500):
         self.place_food()
         
-        for step in range(max_steps):
-            alive_agents = [a for a in self.agents if a.alive]
-            if not alive_agents:
-                break
-            
-            for agent in alive_agents:
-                nearest_food = self.find_nearest_food(agent)
-                inputs = agent.get_inputs(nearest_food, self.world_size)
-                actions = agent.brain.forward(inputs)
-                agent.move(actions[:2], self.world_size)
-                self.check_food_collision(agent)
+        if self.batched:
+            self.run_generation_batched(max_steps)
+        else:
+            for step in range(max_steps):
+                alive_agents = [a for a in self.agents if a.alive]
+                if not alive_agents:
+                    break
+                
+                for agent in alive_agents:
+                    nearest_food = self.find_nearest_food(agent)
+                    inputs = agent.get_inputs(nearest_food, self.world_size, self.rng)
+                    actions = agent.brain.forward(inputs)
+                    agent.move(actions[:2], self.world_size)
+                    self.check_food_collision(agent)
         
         # Record statistics
         avg_score = np.mean([a.score for a in self.agents])
@@ -188,12 +307,16 @@ class Simulation:
         
         print(f"Generation {self.generation}: Avg Score: {avg_score:.2f}, Best Score: {max_score}")
     
+    def step(self):
+        """Run one generation and breed the next"""
+        self.run_generation()
+        self.evolve_population()
+    
     def run_simulation(self, generations=100):
         self.initialize_population()
         
         for gen in range(generations):
-            self.run_generation()
-            self.evolve_population()
+            self.step()
         
         return self.history
 
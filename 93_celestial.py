@@ -1,6 +1,8 @@
 import pygame
 import math
 import random
+from nbody import NBodyEngine
+from trails import TrailBuffer
 
 # Initialize Pygame
 pygame.init()
@@ -11,6 +13,12 @@ FPS = 60
 G = 6.67430e-11  # Gravitational constant
 SCALE = 250 / 1e9  # Scale: 250 pixels = 1 billion km
 TIMESTEP = 3600 * 24  # One day in seconds
+ASTEROID_COUNT = 50
+INTEGRATOR = None  # None for the per-body update, or 'euler' / 'verlet' / 'yoshida4'
+RING_TRAILS = False  # Keep orbits in a shared TrailBuffer instead of per-body lists
+ORBIT_LENGTH = 500  # Points kept per orbit
+ORBIT_MIN_SPACING = 1.0  # Pixels a body must move before a new orbit point is kept...
+ORBIT_MAX_TURN = math.radians(5)  # ...unless its heading has turned by more than this
 
 # Colors
 BLACK = (0, 0, 0)
@@ -30,16 +38,17 @@ class CelestialBody:
         
         self.orbit = []
         self.sun = False
+        self.test_particle = False  # Feels gravity but exerts none in the N-body engine
         self.distance_to_sun = 0
         
         self.x_vel = 0
         self.y_vel = 0
         
-    def draw(self, win, offset_x, offset_y):
+    def draw(self, win, offset_x, offset_y, draw_orbit=True):
         x = self.x * SCALE + WIDTH // 2 + offset_x
         y = self.y * SCALE + HEIGHT // 2 + offset_y
         
-        if len(self.orbit) > 2:
+        if draw_orbit and len(self.orbit) > 2:
             points = []
             for point in self.orbit:
                 x, y = point[0] * SCALE + WIDTH // 2 + offset_x, point[1] * SCALE + HEIGHT // 2 + offset_y
@@ -70,7 +79,7 @@ class CelestialBody:
         
         return force_x, force_y
     
-    def update_position(self, bodies):
+    def update_position(self, bodies, record_orbit=True, timestep=TIMESTEP):
         total_fx = total_fy = 0
         for body in bodies:
             if self == body:
@@ -80,18 +89,22 @@ class CelestialBody:
             total_fx += fx
             total_fy += fy
         
-        self.x_vel += total_fx / self.mass * TIMESTEP
-        self.y_vel += total_fy / self.mass * TIMESTEP
+        self.x_vel += total_fx / self.mass * timestep
+        self.y_vel += total_fy / self.mass * timestep
         
-        self.x += self.x_vel * TIMESTEP
-        self.y += self.y_vel * TIMESTEP
+        self.x += self.x_vel * timestep
+        self.y += self.y_vel * timestep
         
+        if record_orbit:
+            self.record_orbit()
+    
+    def record_orbit(self):
         self.orbit.append((self.x, self.y))
         
-        if len(self.orbit) > 500:
+        if len(self.orbit) > ORBIT_LENGTH:
             self.orbit.pop(0)
 
-def create_solar_system():
+def create_solar_system(asteroid_count=ASTEROID_COUNT):
     sun = CelestialBody(0, 0, 30, YELLOW, 1.98892e30)
     sun.sun = True
     
@@ -109,13 +122,14 @@ def create_solar_system():
     
     # Add some asteroids
     asteroids = []
-    for _ in range(50):
+    for _ in range(asteroid_count):
         distance = random.uniform(2.2e11, 3.2e11)  # Asteroid belt region
         angle = random.uniform(0, 2 * math.pi)
         x = distance * math.cos(angle)
         y = distance * math.sin(angle)
         
         asteroid = CelestialBody(x, y, 2, DARK_GREY, random.uniform(1e15, 1e17))
+        asteroid.test_particle = True
         
         # Calculate orbital velocity
         orbital_speed = math.sqrt(G * sun.mass / distance)
@@ -126,7 +140,54 @@ def create_solar_system():
     
     return [sun, earth, mars, mercury, venus] + asteroids
 
-def main():
+def create_engine(bodies, integrator='verlet'):
+    """N-body engine for the bodies, with asteroids as massless test particles"""
+    massive = [body for body in bodies if not body.test_particle]
+    tests = [body for body in bodies if body.test_particle]
+    engine = NBodyEngine(
+        [(b.x, b.y) for b in massive], [(b.x_vel, b.y_vel) for b in massive],
+        [b.mass for b in massive],
+        [(b.x, b.y) for b in tests], [(b.x_vel, b.y_vel) for b in tests],
+        G=G, integrator=integrator)
+    return engine, massive
+
+def sync_bodies(engine, massive, record_orbit=True):
+    """Copy engine state back onto the massive CelestialBody objects for drawing"""
+    sun = next((i for i, body in enumerate(massive) if body.sun), None)
+    for i, body in enumerate(massive):
+        body.x, body.y = engine.pos[i]
+        body.x_vel, body.y_vel = engine.vel[i]
+        if sun is not None and i != sun:
+            body.distance_to_sun = math.hypot(*(engine.pos[sun] - engine.pos[i]))
+        if record_orbit:
+            body.record_orbit()
+
+def create_trails(bodies):
+    """Ring-buffer orbit trails for the bodies, decimated in screen space"""
+    return TrailBuffer(len(bodies), ORBIT_LENGTH,
+                       min_distance=ORBIT_MIN_SPACING / SCALE, max_turn=ORBIT_MAX_TURN)
+
+def draw_orbits(win, trails, bodies, offset_x, offset_y):
+    """Draw every trail after transforming all of them to the screen at once"""
+    screen = trails.screen_points(SCALE, WIDTH // 2 + offset_x, HEIGHT // 2 + offset_y)
+    for i, body in enumerate(bodies):
+        n = trails.count[i]
+        if n > 2:
+            pygame.draw.lines(win, body.color, False, screen[i, :n].tolist(), 1)
+
+def draw_test_particles(win, engine, offset_x, offset_y, color=DARK_GREY):
+    """Plot every test particle as a 2x2 dot in one array write"""
+    xs = (engine.test_pos[:, 0] * SCALE + WIDTH // 2 + offset_x).astype(int)
+    ys = (engine.test_pos[:, 1] * SCALE + HEIGHT // 2 + offset_y).astype(int)
+    visible = (xs >= 0) & (xs < WIDTH - 1) & (ys >= 0) & (ys < HEIGHT - 1)
+    xs, ys = xs[visible], ys[visible]
+    pixels = pygame.surfarray.pixels3d(win)
+    for dx in (0, 1):
+        for dy in (0, 1):
+            pixels[xs + dx, ys + dy] = color
+    del pixels  # Unlock the surface
+
+def main(integrator=INTEGRATOR, asteroid_count=ASTEROID_COUNT, ring_trails=RING_TRAILS):
     global FONT
     FONT = pygame.font.SysFont("comicsans", 16)
     
@@ -134,7 +195,15 @@ def main():
     pygame.display.set_caption("Space Simulation")
     clock = pygame.time.Clock()
     
-    bodies = create_solar_system()
+    def reset():
+        bodies = create_solar_system(asteroid_count)
+        engine, drawn = None, bodies
+        if integrator is not None:
+            engine, drawn = create_engine(bodies, integrator)
+        trails = create_trails(drawn) if ring_trails else None
+        return bodies, engine, drawn, trails
+    
+    bodies, engine, drawn, trails = reset()
     
     offset_x = 0
     offset_y = 0
@@ -156,7 +225,7 @@ def main():
                 if event.key == pygame.K_SPACE:
                     paused = not paused
                 elif event.key == pygame.K_r:
-                    bodies = create_solar_system()
+                    bodies, engine, drawn, trails = reset()
                     offset_x = 0
                     offset_y = 0
                     zoom = 1.0
@@ -177,11 +246,24 @@ def main():
             zoom /= 1.05
         
         if not paused:
-            for body in bodies:
-                body.update_position(bodies)
+            if engine is not None:
+                engine.step(TIMESTEP)
+                sync_bodies(engine, drawn, record_orbit=trails is None)
+            else:
+                for body in bodies:
+                    body.update_position(bodies, record_orbit=trails is None)
+            if trails is not None:
+                if engine is not None:
+                    trails.record(engine.pos)
+                else:
+                    trails.record([(body.x, body.y) for body in drawn])
         
-        for body in bodies:
-            body.draw(win, offset_x, offset_y)
+        if engine is not None:
+            draw_test_particles(win, engine, offset_x, offset_y)
+        if trails is not None:
+            draw_orbits(win, trails, drawn, offset_x, offset_y)
+        for body in drawn:
+            body.draw(win, offset_x, offset_y, draw_orbit=trails is None)
         
         # Display controls
         controls = [
@@ -205,6 +287,10 @@ def main():
         body_count = FONT.render(f"Bodies: {len(bodies)}", 1, WHITE)
         win.blit(body_count, (WIDTH - 100, 30))
         
+        if engine is not None:
+            drift_text = FONT.render(f"Energy drift: {engine.energy_drift():.2e}", 1, WHITE)
+            win.blit(drift_text, (WIDTH - 180, 50))
+        
         if paused:
             pause_text = FONT.render("PAUSED", 1, WHITE)
             win.blit(pause_text, (WIDTH // 2 - pause_text.get_width() // 2, 50))
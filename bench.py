@@ -0,0 +1,299 @@
+"""Benchmark harness: warmed-up, repeated timings with peak memory, saved as JSON.
+
+Each case is a setup function returning the callable to time, so setup
+never counts and every repetition starts from the same state. Cases are
+run warmup times untimed, then repeat times timed, then once more under
+tracemalloc for the peak memory (NumPy reports its buffers to
+tracemalloc). A suite whose script cannot be imported here, for example
+because matplotlib is missing, is reported as skipped.
+
+Results carry the git commit, so two runs can be compared and the
+command fails when a case's median slows by more than the threshold:
+
+    python bench.py primes fractals --repeat 7 --output after.json --baseline before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from script_loader import HERE, load_script
+
+SUITES = {}
+
+
+def suite(name):
+    """Register a function returning [(case name, setup), ...] as a benchmark suite"""
+    def register(build):
+        SUITES[name] = build
+        return build
+    return register
+
+
+def measure(setup, warmup=1, repeat=5, memory=True):
+    """Timing statistics, in seconds, and peak traced bytes for one case"""
+    times = []
+    result = None
+    for i in range(warmup + repeat):
+        run = setup()
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+
+    q1, _, q3 = statistics.quantiles(times, n=4) if len(times) > 1 else times * 3
+    stats = {
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'iqr': q3 - q1,
+        'mean': statistics.fmean(times),
+        'times': times,
+        'peak_bytes': None,
+        # Plain results (counts, populations) let runs be checked for agreement too
+        'result': result if isinstance(result, (bool, int, float, str)) else None,
+    }
+    if memory:
+        run = setup()
+        tracemalloc.start()
+        try:
+            run()
+            stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return stats
+
+
+def git_commit():
+    """Current commit of this checkout, or None outside git"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suites(names=None, warmup=1, repeat=5, memory=True, match=None, log=None):
+    """Run suites (all by default) and return a JSON-ready report"""
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'warmup': warmup,
+            'repeat': repeat,
+        },
+        'results': {},
+    }
+    for name in names or sorted(SUITES):
+        try:
+            cases = SUITES[name]()
+        except (ImportError, SyntaxError) as exc:
+            cases = [('*', exc)]
+        for case, setup in cases:
+            key = f'{name}.{case}'
+            if match and match not in key:
+                continue
+            if isinstance(setup, Exception):
+                entry = {'skipped': f'{type(setup).__name__}: {setup}'}
+            else:
+                try:
+                    entry = measure(setup, warmup, repeat, memory)
+                except (ImportError, SyntaxError) as exc:
+                    entry = {'skipped': f'{type(exc).__name__}: {exc}'}
+            report['results'][key] = entry
+            if log:
+                log(key, entry)
+    return report
+
+
+def compare(baseline, current, threshold=0.10):
+    """Cases whose median grew by more than threshold (a fraction) since baseline"""
+    regressions = []
+    for key, now in current['results'].items():
+        before = baseline['results'].get(key)
+        if not before or 'median' not in before or 'median' not in now:
+            continue
+        ratio = now['median'] / before['median'] if before['median'] else float('inf')
+        if ratio > 1 + threshold:
+            regressions.append({'case': key, 'baseline': before['median'],
+                                'current': now['median'], 'ratio': ratio})
+    return regressions
+
+
+def format_entry(key, entry):
+    """One table row for a case"""
+    if 'skipped' in entry:
+        return f"{key:45} | skipped ({entry['skipped']})"
+    peak = '-' if entry['peak_bytes'] is None else f"{entry['peak_bytes'] / 2**20:8.1f} MB"
+    return (f"{key:45} | min {entry['min']:8.4f}s | median {entry['median']:8.4f}s | "
+            f"IQR {entry['iqr']:7.4f}s | peak {peak}")
+
+
+# Suites ---------------------------------------------------------------------
+
+@suite('primes')
+def prime_suite():
+    from primality import PrimalityService
+    from prime_engine import WheelSieve
+    from prime_parallel import ParallelSieve
+
+    def wheel(lo, hi):
+        def setup():
+            engine = WheelSieve()
+            engine.ensure_base_primes(hi)
+            return lambda: engine.count_range(lo, hi)
+        return setup
+
+    def parallel():
+        def run():
+            with ParallelSieve() as sieve:
+                return sieve.count_range(0, 10 ** 8)
+        return run
+
+    def batch():
+        service = PrimalityService()
+        values = np.arange(2 ** 31, 2 ** 31 + 200_000)
+        return lambda: int(service.is_prime_many(values).sum())
+
+    def miller_rabin():
+        service = PrimalityService()
+        return lambda: sum(service.is_prime(10 ** 18 + i) for i in range(10_000))
+
+    def prime_finder(method):
+        def setup():
+            finder = load_script('0106_prime.py').PrimeFinder(10 ** 6)
+            return getattr(finder, method)
+        return setup
+
+    return [
+        ('wheel_pi_1e8', wheel(0, 10 ** 8 + 1)),
+        ('wheel_window_1e12_1e8', wheel(10 ** 12, 10 ** 12 + 10 ** 8)),
+        ('parallel_pi_1e8', parallel),
+        ('batch_primality_2e5_near_2e31', batch),
+        ('miller_rabin_1e4_near_1e18', miller_rabin),
+        ('prime_finder_sieve_1e6', prime_finder('_test_sieve')),
+        ('prime_finder_segmented_1e6', prime_finder('_test_segmented')),
+    ]
+
+
+@suite('fractals')
+def fractal_suite():
+    from escape_time import julia, mandelbrot
+    from tile_renderer import TiledRenderer
+
+    elephant_valley = (-0.7533 - 0.01, -0.7533 + 0.01, 0.1138 - 0.01, 0.1138 + 0.01)
+
+    def mandelbrot_case(**options):
+        return lambda: lambda: int(mandelbrot(-2.0, 1.0, -1.5, 1.5, 400, 400, 256, **options).sum())
+
+    def tiled():
+        renderer = TiledRenderer(workers=1, tile_size=64)
+        return lambda: int(renderer.render(*elephant_valley, 256, 256, 1024).sum())
+
+    def script_mandel():
+        module = load_script('39_mandel.py')
+        return lambda: int(module.mandelbrot_set(-2.0, 1.0, -1.5, 1.5, 400, 400, 256)[2].sum())
+
+    return [
+        ('mandelbrot_400_256', mandelbrot_case()),
+        ('mandelbrot_400_256_interior', mandelbrot_case(skip_interior=True, periodicity=True)),
+        ('julia_400_256', lambda: lambda: int(julia(-0.8 + 0.156j, -1.6, 1.6, -1.0, 1.0,
+                                                    400, 250, 256).sum())),
+        ('tiled_elephant_valley_256_1024', tiled),
+        ('39_mandel_400_256', script_mandel),
+    ]
+
+
+@suite('cellular')
+def cellular_suite():
+    from life_backends import HashLifeWorld, PackedTileWorld
+
+    life = (3, 3, 2, 3)
+    soup = np.random.RandomState(0).choice([0, 1], size=(256, 256), p=[0.7, 0.3])
+
+    def sparse(world_class, generations, **options):
+        def setup():
+            world = world_class(1024, 1024, life, **options)
+            world.load(soup)
+            def run():
+                for _ in range(generations):
+                    world.step()
+                return world.population
+            return run
+        return setup
+
+    def dense(engine):
+        def setup():
+            ca = load_script('0116_cellular.py').CellularAutomaton(256, 256, engine=engine)
+            ca.clear()
+            ca.grid[:] = soup
+            return lambda: int(ca.steps(16 if engine == 'loop' else 256).sum())
+        return setup
+
+    return [
+        ('packed_1024_256gen', sparse(PackedTileWorld, 256)),
+        ('hashlife_1024_16gen', sparse(HashLifeWorld, 1, step_log2=4)),
+        ('dense_numpy_256_256gen', dense('numpy')),
+        ('dense_loop_256_16gen', dense('loop')),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suites with warmups, repeats and memory')
+    parser.add_argument('suites', nargs='*', help=f'Suites to run (default: all of {sorted(SUITES)})')
+    parser.add_argument('--list', action='store_true', help='List suites and cases, then exit')
+    parser.add_argument('-k', dest='match', help='Only cases whose name contains this')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per case (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (default: 5)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a report written earlier')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Median slowdown that counts as a regression (default: 0.10)')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s) {unknown}, expected some of {sorted(SUITES)}")
+    if args.list:
+        for name in args.suites or sorted(SUITES):
+            try:
+                cases = [case for case, _ in SUITES[name]()]
+            except (ImportError, SyntaxError) as exc:
+                cases = [f'(unavailable: {exc})']
+            print(f"{name}: {', '.join(cases)}")
+        return
+
+    report = run_suites(args.suites, args.warmup, args.repeat, not args.no_memory, args.match,
+                        log=lambda key, entry: print(format_entry(key, entry), flush=True))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        print(f"\nCompared with {baseline['meta'].get('commit')}: "
+              f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        for r in regressions:
+            print(f"  {r['case']:45} {r['baseline']:.4f}s -> {r['current']:.4f}s ({r['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Fractal tree geometry grown once and animated as arrays.
+
+FractalTree.draw_branch rolls new random angles for every branch of every
+frame and rasterizes each branch with a Python Bresenham loop, although
+only the wind changes between frames. BranchGeometry grows the tree once,
+with the same random draws in the same order as the recursion, into flat
+arrays in drawing order: parent, depth, length and angle per branch, plus
+the leaves. The wind bends every branch at a given depth by the same
+amount, which is also inherited by everything above it, so each frame
+only needs one cumulative offset per depth. Branch ends are then found
+level by level with array arithmetic, and every branch is rasterized in
+one batch by line_cells.
+"""
+import math
+
+import numpy as np
+
+BRANCH_CHARS = ('█', '▓')  # Trunk and first two forks, then the finer branches
+
+
+def line_cells(x1, y1, x2, y2):
+    """(line index, x, y) of every cell on many Bresenham lines, each from its start to its end.
+
+    Matches FractalTree.draw_line cell for cell: along the major axis
+    every cell is visited, and the minor coordinate after k steps is
+    (2 * k * minor + major - 1) // (2 * major).
+    """
+    x1, y1, x2, y2 = (np.asarray(a, dtype=np.int64) for a in (x1, y1, x2, y2))
+    dx, dy = np.abs(x2 - x1), np.abs(y2 - y1)
+    steps = np.maximum(dx, dy)
+    line = np.repeat(np.arange(len(steps)), steps + 1)
+    starts = np.cumsum(steps + 1) - (steps + 1)
+    k = np.arange(len(line)) - starts[line]
+    x_major = (dx >= dy)[line]
+    major, minor = np.where(x_major, dx[line], dy[line]), np.where(x_major, dy[line], dx[line])
+    shift = (2 * k * minor + major - 1) // np.maximum(2 * major, 1)
+    along_x = np.where(x_major, k, shift)
+    along_y = np.where(x_major, shift, k)
+    return (line, x1[line] + np.sign(x2 - x1)[line] * along_x,
+            y1[line] + np.sign(y2 - y1)[line] * along_y)
+
+
+class BranchGeometry:
+    """One tree's branches and leaves, grown from rng like FractalTree.draw_branch.
+
+    Branch angles are stored without wind (the wind offsets of all depths
+    are added per frame), and every branch and leaf carries its position
+    in the original drawing order, so later strokes still cover earlier
+    ones.
+    """
+
+    def __init__(self, x, y, length, angle, max_depth, rng, leaf_chars):
+        self.x = x
+        self.y = y
+        self.max_depth = max_depth
+        self.leaf_chars = list(leaf_chars)
+        parent, depth, lengths, angles, order = [], [], [], [], []
+        leaf_parent, leaf_char, leaf_order = [], [], []
+
+        # Explicit stack in place of the recursion; each entry is a call of
+        # draw_branch, or the middle-branch roll that follows both forks
+        stack = [('branch', -1, length, angle, 0)]
+        sequence = 0
+        while stack:
+            kind, owner, length, angle, level = stack.pop()
+            if kind == 'middle':
+                if rng.random() > 0.7:
+                    stack.append(('branch', owner, length * 0.8, angles[owner] + rng.uniform(-0.3, 0.3), level))
+                continue
+            if level > max_depth or length < 1:
+                if level == max_depth and rng.random() > 0.3:
+                    leaf_parent.append(owner)
+                    leaf_char.append(self.leaf_chars.index(rng.choice(self.leaf_chars)))
+                    leaf_order.append(sequence)
+                    sequence += 1
+                continue
+
+            index = len(parent)
+            parent.append(owner)
+            depth.append(level)
+            lengths.append(length)
+            angles.append(angle)
+            order.append(sequence)
+            sequence += 1
+            if length > 2:
+                branch_angle = math.pi / 6 + rng.uniform(-0.2, 0.2)
+                length_reduction = 0.7 + rng.uniform(-0.1, 0.1)
+                child = length * length_reduction
+                # Pushed in reverse: left, then right, then the middle roll
+                stack.append(('middle', index, child, 0.0, level + 1))
+                stack.append(('branch', index, child, angle + branch_angle, level + 1))
+                stack.append(('branch', index, child, angle - branch_angle, level + 1))
+
+        self.parent = np.array(parent, dtype=np.int64)
+        self.depth = np.array(depth, dtype=np.int64)
+        self.length = np.array(lengths, dtype=np.float64)
+        self.angle = np.array(angles, dtype=np.float64)
+        self.order = np.array(order, dtype=np.int64)
+        self.leaf_parent = np.array(leaf_parent, dtype=np.int64)
+        self.leaf_char = np.array(leaf_char, dtype=np.int64)
+        self.leaf_order = np.array(leaf_order, dtype=np.int64)
+        # Parents always come before their children, so levels can be filled in depth order
+        self.levels = [np.flatnonzero(self.depth == level) for level in range(max_depth + 1)]
+
+    def __len__(self):
+        return len(self.parent)
+
+    def ends(self, wind_phase, wind_force):
+        """Integer start and end points of every branch in this wind"""
+        levels = np.arange(self.max_depth + 1)
+        wind = np.sin(wind_phase + levels * 0.5) * wind_force * (levels / self.max_depth)
+        angle = self.angle + np.cumsum(wind)[self.depth]
+        start_x = np.full(len(self), self.x, dtype=np.int64)
+        start_y = np.full(len(self), self.y, dtype=np.int64)
+        end_x = np.empty(len(self), dtype=np.int64)
+        end_y = np.empty(len(self), dtype=np.int64)
+        for level in self.levels:
+            owners = self.parent[level]
+            inner = owners >= 0
+            start_x[level[inner]] = end_x[owners[inner]]
+            start_y[level[inner]] = end_y[owners[inner]]
+            # Truncation toward zero, as int() does
+            end_x[level] = np.trunc(start_x[level] + self.length[level] * np.cos(angle[level]))
+            end_y[level] = np.trunc(start_y[level] + self.length[level] * np.sin(angle[level]))
+        return start_x, start_y, end_x, end_y
+
+    def cells(self, wind_phase, wind_force, width, height):
+        """(x, y, char) of every visible cell the tree covers, the last stroke on each"""
+        start_x, start_y, end_x, end_y = self.ends(wind_phase, wind_force)
+        line, xs, ys = line_cells(start_x, start_y, end_x, end_y)
+        codes = np.where(self.depth[line] < 3, 0, 1)
+        order = self.order[line]
+
+        leaf_x = np.where(self.leaf_parent >= 0, end_x[self.leaf_parent], self.x)
+        leaf_y = np.where(self.leaf_parent >= 0, end_y[self.leaf_parent], self.y)
+        xs, ys = np.concatenate([xs, leaf_x]), np.concatenate([ys, leaf_y])
+        codes = np.concatenate([codes, len(BRANCH_CHARS) + self.leaf_char])
+        order = np.concatenate([order, self.leaf_order])
+
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xs, ys, codes, order = xs[inside], ys[inside], codes[inside], order[inside]
+        # Keep the last stroke per cell in drawing order: sorted by cell, latest first
+        cell = ys * width + xs
+        ranked = np.lexsort((-order, cell))
+        first = np.ones(len(ranked), dtype=bool)
+        first[1:] = cell[ranked[1:]] != cell[ranked[:-1]]
+        keep = ranked[first]
+        palette = list(BRANCH_CHARS) + self.leaf_chars
+        return xs[keep].tolist(), ys[keep].tolist(), [palette[code] for code in codes[keep].tolist()]
+
+    def draw(self, frame, wind_phase, wind_force):
+        """Draw the tree into frame, a list of rows of characters"""
+        height, width = len(frame), len(frame[0]) if frame else 0
+        for x, y, char in zip(*self.cells(wind_phase, wind_force, width, height)):
+            frame[y][x] = char
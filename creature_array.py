@@ -0,0 +1,294 @@
+import math
+
+import numpy as np
+
+
+def rgb_to_hsv(rgb):
+    """colorsys.rgb_to_hsv for an (N, 3) array of colors in [0, 1]"""
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    span = maxc - minc
+    safe = np.where(span == 0, 1.0, span)
+    rc = (maxc - r) / safe
+    gc = (maxc - g) / safe
+    bc = (maxc - b) / safe
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(span == 0, 0.0, (h / 6.0) % 1.0)
+    s = np.where(maxc == 0, 0.0, span / np.where(maxc == 0, 1.0, maxc))
+    return np.stack([h, s, maxc], axis=1)
+
+
+def hsv_to_rgb(hsv):
+    """colorsys.hsv_to_rgb for an (N, 3) array of colors in [0, 1]"""
+    h, s, v = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(np.int64) % 6
+    choices = [
+        np.stack([v, t, p], axis=1), np.stack([q, v, p], axis=1), np.stack([p, v, t], axis=1),
+        np.stack([p, q, v], axis=1), np.stack([t, p, v], axis=1), np.stack([v, p, q], axis=1),
+    ]
+    rgb = np.empty_like(hsv)
+    for k, choice in enumerate(choices):
+        rgb[i == k] = choice[i == k]
+    rgb[s == 0] = v[s == 0, None]
+    return rgb
+
+
+def pairs_within(px, py, radius, qx, qy, cell_size):
+    """Every pair (i, j) with point j of q strictly within radius[i] of point i of p.
+
+    Points of q are bucketed into a uniform grid and each p looks only at the
+    cells its radius can reach, all with array operations. Returns index
+    arrays i and j and the distances, grouped by grid offset rather than sorted.
+    """
+    radius = np.broadcast_to(np.asarray(radius, dtype=float), np.shape(px))
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    if len(px) == 0 or len(qx) == 0:
+        return empty
+
+    span = math.ceil(radius.max() / cell_size)
+    pcx = np.floor(px / cell_size).astype(np.int64)
+    pcy = np.floor(py / cell_size).astype(np.int64)
+    qcx = np.floor(qx / cell_size).astype(np.int64)
+    qcy = np.floor(qy / cell_size).astype(np.int64)
+
+    # Flatten (cell_x, cell_y) to one key, padded so neighbouring offsets never wrap
+    min_x = min(pcx.min(), qcx.min()) - span
+    min_y = min(pcy.min(), qcy.min()) - span
+    rows = max(pcy.max(), qcy.max()) + span - min_y + 1
+    cols = max(pcx.max(), qcx.max()) + span - min_x + 1
+    q_keys = (qcx - min_x) * rows + (qcy - min_y)
+    order = np.argsort(q_keys, kind='stable')
+    sorted_keys = q_keys[order]
+    p_keys = (pcx - min_x) * rows + (pcy - min_y)
+
+    if cols * rows <= max(4 * (len(px) + len(qx)), 1 << 20):
+        # Dense table of where each cell's run starts in the sorted order
+        cell_counts = np.bincount(q_keys, minlength=cols * rows)
+        cell_starts = np.cumsum(cell_counts) - cell_counts
+
+        def lookup(keys):
+            return cell_starts[keys], cell_counts[keys]
+    else:
+        def lookup(keys):
+            lo = np.searchsorted(sorted_keys, keys, 'left')
+            return lo, np.searchsorted(sorted_keys, keys, 'right') - lo
+
+    found_i, found_j, found_d = [], [], []
+    for dx in range(-span, span + 1):
+        for dy in range(-span, span + 1):
+            lo, counts = lookup(p_keys + dx * rows + dy)
+            total = counts.sum()
+            if not total:
+                continue
+            i = np.repeat(np.arange(len(px)), counts)
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            j = order[starts + np.arange(total)]
+            dist = np.sqrt((px[i] - qx[j]) ** 2 + (py[i] - qy[j]) ** 2)
+            close = dist < radius[i]
+            found_i.append(i[close])
+            found_j.append(j[close])
+            found_d.append(dist[close])
+    if not found_i:
+        return empty
+    return np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_d)
+
+
+def nearest_within(px, py, radius, qx, qy, cell_size):
+    """Index of the closest q strictly within radius[i] of each p, or -1.
+
+    Ties go to the lowest q index, as an argmin over a list would pick.
+    """
+    i, j, dist = pairs_within(px, py, radius, qx, qy, cell_size)
+    nearest = np.full(len(px), -1, dtype=np.int64)
+    if len(i):
+        ranked = np.lexsort((j, dist, i))
+        first = np.ones(len(ranked), dtype=bool)
+        first[1:] = i[ranked][1:] != i[ranked][:-1]
+        nearest[i[ranked][first]] = j[ranked][first]
+    return nearest
+
+
+class CreatureArray:
+    """Structure-of-arrays creature population.
+
+    Each trait is a column array, so movement, energy, death and reproduction
+    can be applied to everyone at once. Sums of the fixed traits and a
+    histogram of generations are kept up to date as creatures are added and
+    removed, so stats() never has to rescan the population's traits.
+    """
+    TRAITS = ('speed', 'size', 'vision_range')
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.trait_sums = dict.fromkeys(self.TRAITS, 0.0)
+        self.generation_counts = np.zeros(1, dtype=np.int64)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.count
+        fields = {
+            'x': ((capacity,), np.float64),
+            'y': ((capacity,), np.float64),
+            'energy': ((capacity,), np.float64),
+            'speed': ((capacity,), np.float64),
+            'size': ((capacity,), np.float64),
+            'vision_range': ((capacity,), np.float64),
+            'color': ((capacity, 3), np.float64),
+            'age': ((capacity,), np.int64),
+            'generation': ((capacity,), np.int64),
+            'food_eaten': ((capacity,), np.int64),
+        }
+        for name, (shape, dtype) in fields.items():
+            array = np.zeros(shape, dtype=dtype)
+            if hasattr(self, '_' + name):
+                array[:old] = getattr(self, '_' + name)[:old]
+            setattr(self, '_' + name, array)
+        self.capacity = capacity
+
+    # Live views of the first `count` creatures
+    def _column(name):
+        return property(lambda self: getattr(self, '_' + name)[:self.count])
+
+    x = _column('x')
+    y = _column('y')
+    energy = _column('energy')
+    speed = _column('speed')
+    size = _column('size')
+    vision_range = _column('vision_range')
+    color = _column('color')
+    age = _column('age')
+    generation = _column('generation')
+    food_eaten = _column('food_eaten')
+    del _column
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (CreatureView(self, i) for i in range(self.count))
+
+    def __getitem__(self, i):
+        if not -self.count <= i < self.count:
+            raise IndexError('creature index out of range')
+        return CreatureView(self, i % self.count)
+
+    def add_many(self, x, y, energy, speed, size, vision_range, color, generation=0):
+        """Append a batch of creatures and return their indices"""
+        n = len(x)
+        if self.count + n > self.capacity:
+            self._allocate(max(self.count + n, self.capacity * 2))
+        lo, hi = self.count, self.count + n
+        self._x[lo:hi] = x
+        self._y[lo:hi] = y
+        self._energy[lo:hi] = energy
+        self._speed[lo:hi] = speed
+        self._size[lo:hi] = size
+        self._vision_range[lo:hi] = vision_range
+        self._color[lo:hi] = color
+        self._age[lo:hi] = 0
+        self._generation[lo:hi] = generation
+        self._food_eaten[lo:hi] = 0
+        self.count = hi
+        self._count_in(slice(lo, hi), 1)
+        return range(lo, hi)
+
+    def _count_in(self, rows, sign):
+        for trait in self.TRAITS:
+            self.trait_sums[trait] += sign * getattr(self, '_' + trait)[rows].sum()
+        generations = self._generation[rows]
+        if len(generations):
+            top = generations.max() + 1
+            if top > len(self.generation_counts):
+                grown = np.zeros(max(top, 2 * len(self.generation_counts)), dtype=np.int64)
+                grown[:len(self.generation_counts)] = self.generation_counts
+                self.generation_counts = grown
+            self.generation_counts += sign * np.bincount(generations, minlength=len(self.generation_counts))
+
+    def keep(self, mask):
+        """Drop every creature where mask is False, preserving the order of the rest"""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.all():
+            return
+        self._count_in(np.flatnonzero(~mask), -1)
+        n = int(mask.sum())
+        for name in ('x', 'y', 'energy', 'speed', 'size', 'vision_range',
+                     'color', 'age', 'generation', 'food_eaten'):
+            column = getattr(self, '_' + name)
+            column[:n] = column[:self.count][mask]
+        self.count = n
+
+    def clear(self):
+        """Remove every creature, keeping the allocated capacity"""
+        self.count = 0
+        self.trait_sums = dict.fromkeys(self.TRAITS, 0.0)
+        self.generation_counts[:] = 0
+
+    def max_generation(self):
+        """Highest generation among living creatures"""
+        alive = np.flatnonzero(self.generation_counts)
+        return int(alive[-1]) if len(alive) else 0
+
+    def stats(self):
+        """Population averages in the same form as Ecosystem.get_stats"""
+        if not self.count:
+            return {}
+        return {
+            'population': self.count,
+            'avg_speed': self.trait_sums['speed'] / self.count,
+            'avg_size': self.trait_sums['size'] / self.count,
+            'avg_vision': self.trait_sums['vision_range'] / self.count,
+            'generation': self.max_generation(),
+            'avg_energy': float(self.energy.mean()),
+        }
+
+    def nbytes(self):
+        """Bytes allocated for creature data"""
+        return sum(getattr(self, '_' + name).nbytes
+                   for name in ('x', 'y', 'energy', 'speed', 'size', 'vision_range',
+                                'color', 'age', 'generation', 'food_eaten'))
+
+    def view(self, i):
+        """Creature-style object backed by row i of this store"""
+        return CreatureView(self, i)
+
+
+class CreatureView:
+    """Per-creature facade over a CreatureArray row, for code written against Creature.
+
+    Indices shift when creatures die, so a view is only valid until the next keep().
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def _field(name, cast):
+        def get(self):
+            return cast(getattr(self.store, '_' + name)[self.index])
+
+        def set(self, value):
+            getattr(self.store, '_' + name)[self.index] = value
+        return property(get, set)
+
+    x = _field('x', float)
+    y = _field('y', float)
+    energy = _field('energy', float)
+    age = _field('age', int)
+    food_eaten = _field('food_eaten', int)
+    # Fixed traits are read-only so the running sums stay correct
+    speed = property(lambda self: float(self.store._speed[self.index]))
+    size = property(lambda self: float(self.store._size[self.index]))
+    vision_range = property(lambda self: float(self.store._vision_range[self.index]))
+    generation = property(lambda self: int(self.store._generation[self.index]))
+    del _field
+
+    @property
+    def color(self):
+        return tuple(float(c) for c in self.store._color[self.index])
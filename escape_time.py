@@ -0,0 +1,155 @@
+import numpy as np
+
+
+def complex_grid(xmin, xmax, ymin, ymax, width, height, endpoint=True):
+    """(height, width) array of complex points covering the viewport.
+
+    With endpoint, the last column/row lands exactly on xmax/ymax (like
+    np.linspace); without, pixels step by (xmax - xmin) / width from xmin.
+    """
+    if endpoint:
+        real = np.linspace(xmin, xmax, width)
+        imag = np.linspace(ymin, ymax, height)
+    else:
+        real = xmin + (np.arange(width) / width) * (xmax - xmin)
+        imag = ymin + (np.arange(height) / height) * (ymax - ymin)
+    return real[None, :] + 1j * imag[:, None]
+
+
+def escape_time(z0, c, max_iter, bailout=2.0, smooth=False, check_every=8,
+                periodicity=False, tolerance=1e-12):
+    """Iterate z -> z*z + c over whole arrays and return escape counts.
+
+    The count for a point is the first n >= 1 with |z_n| > bailout, or max_iter
+    if it never escapes. Escaped points are dropped from the working set, so
+    each pass only touches points that are still bounded.
+
+    The bailout test is the expensive part, so it runs once per check_every
+    iterations; points found outside are replayed from the last check one
+    step at a time to recover their exact count. That is only sound when an
+    escaped orbit can never come back, which holds for bailout >= max(2, |c|)
+    or for Mandelbrot orbits starting at 0; otherwise every iteration is
+    checked.
+
+    With periodicity, each orbit is compared against a snapshot taken at
+    doubling intervals (Brent's method); one that comes back within tolerance
+    of it has settled into a cycle, so it is given max_iter right away instead
+    of being iterated to the end. This is where deep zooms spend most of their
+    time.
+
+    With smooth, also returns the continuous count
+    n + 1 - log2(log|z_n|), which removes the banding of integer counts;
+    points that never escape get max_iter.
+    """
+    z0, c = np.broadcast_arrays(np.asarray(z0, dtype=complex), np.asarray(c, dtype=complex))
+    shape = z0.shape
+    z = z0.ravel().copy()
+    c = c.ravel().copy()
+    idx = np.arange(z.size)
+    counts = np.full(z.size, max_iter, dtype=np.int64)
+    final = np.zeros(z.size, dtype=complex) if smooth else None
+
+    escapes_for_good = bailout >= 2 and (not z.any() or np.abs(c).max(initial=0) <= bailout)
+    if not escapes_for_good:
+        check_every = 1
+
+    saved, next_save = None, check_every
+    done = 0
+    with np.errstate(over='ignore', invalid='ignore'):
+        while done < max_iter and idx.size:
+            block = min(check_every, max_iter - done)
+            start = z.copy() if block > 1 else z
+            for _ in range(block):
+                z *= z
+                z += c
+            # NaN from overflow counts as escaped
+            escaped = ~(np.abs(z) <= bailout)
+            if escaped.any():
+                if block == 1:
+                    counts[idx[escaped]] = done + 1
+                    if smooth:
+                        final[idx[escaped]] = z[escaped]
+                else:
+                    _replay(start[escaped], c[escaped], idx[escaped], done, block,
+                            bailout, counts, final)
+                bounded = ~escaped
+                idx, z, c = idx[bounded], z[bounded], c[bounded]
+                if saved is not None:
+                    saved = saved[bounded]
+            done += block
+
+            if periodicity and idx.size:
+                if saved is not None:
+                    cycling = np.abs(z - saved) < tolerance
+                    if cycling.any():
+                        moving = ~cycling
+                        idx, z, c, saved = idx[moving], z[moving], c[moving], saved[moving]
+                if done >= next_save:
+                    saved = z.copy()
+                    next_save *= 2
+
+    counts = counts.reshape(shape)
+    if not smooth:
+        return counts
+    values = counts.astype(float)
+    outside = counts < max_iter
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_abs = np.log(np.abs(final.reshape(shape)[outside]))
+        values[outside] = counts[outside] + 1 - np.log2(np.maximum(log_abs, 1e-300))
+    return counts, values
+
+
+def _replay(z, c, idx, done, block, bailout, counts, final):
+    """Step escaped points one iteration at a time from the last check to find their counts"""
+    for k in range(1, block + 1):
+        z *= z
+        z += c
+        escaped = np.abs(z) > bailout
+        if escaped.any():
+            counts[idx[escaped]] = done + k
+            if final is not None:
+                final[idx[escaped]] = z[escaped]
+            bounded = ~escaped
+            z, c, idx = z[bounded], c[bounded], idx[bounded]
+
+
+def in_cardioid_or_bulb(c):
+    """Mask of points inside the main cardioid or the period-2 bulb, which never escape"""
+    x, y = c.real, c.imag
+    q = (x - 0.25) ** 2 + y * y
+    cardioid = q * (q + (x - 0.25)) <= 0.25 * y * y
+    bulb = (x + 1) ** 2 + y * y <= 0.0625
+    return cardioid | bulb
+
+
+def mandelbrot_counts(c, max_iter, bailout=2.0, smooth=False, skip_interior=False,
+                      periodicity=False):
+    """escape_time for Mandelbrot points c, optionally skipping the known interior"""
+    c = np.asarray(c, dtype=complex)
+    if not skip_interior:
+        return escape_time(0, c, max_iter, bailout, smooth, periodicity=periodicity)
+
+    outside = ~in_cardioid_or_bulb(c)
+    counts = np.full(c.shape, max_iter, dtype=np.int64)
+    result = escape_time(0, c[outside], max_iter, bailout, smooth, periodicity=periodicity)
+    if not smooth:
+        counts[outside] = result
+        return counts
+    values = np.full(c.shape, float(max_iter))
+    counts[outside], values[outside] = result
+    return counts, values
+
+
+def mandelbrot(xmin, xmax, ymin, ymax, width, height, max_iter,
+               bailout=2.0, smooth=False, endpoint=True, skip_interior=False,
+               periodicity=False):
+    """Escape counts for the Mandelbrot set over a viewport, shape (height, width)"""
+    c = complex_grid(xmin, xmax, ymin, ymax, width, height, endpoint)
+    return mandelbrot_counts(c, max_iter, bailout, smooth, skip_interior, periodicity)
+
+
+def julia(c, xmin, xmax, ymin, ymax, width, height, max_iter,
+          bailout=2.0, smooth=False, endpoint=True, periodicity=False):
+    """Escape counts for the Julia set of the constant c, shape (height, width)"""
+    z0 = complex_grid(xmin, xmax, ymin, ymax, width, height, endpoint)
+    return escape_time(z0, c, max_iter, bailout, smooth, periodicity=periodicity)
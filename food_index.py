@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+
+from spatial_hash import SpatialHash
+
+
+class FoodIndex:
+    """Food kept in a SpatialHash for nearest-in-range lookups and O(1) removal.
+
+    Each piece of food gets an integer handle, so several pieces can share a
+    position. Iterating yields the stored values in the order they were added,
+    like the list it replaces, and ties in nearest() go to the oldest piece,
+    which is the one a front-to-back list scan would have found.
+    """
+
+    def __init__(self, cell_size):
+        self.grid = SpatialHash(cell_size)
+        self.values = {}  # handle -> value, in the order food was added
+        self._next_handle = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(list(self.values.values()))
+
+    def add(self, x, y, value=None):
+        """Add food at (x, y) and return its handle; value defaults to the position"""
+        handle = self._next_handle
+        self._next_handle += 1
+        self.grid.insert(handle, x, y)
+        self.values[handle] = (x, y) if value is None else value
+        return handle
+
+    def remove(self, handle):
+        """Consume a piece of food"""
+        self.grid.remove(handle)
+        del self.values[handle]
+
+    def clear(self):
+        """Remove all food"""
+        self.grid.clear()
+        self.values.clear()
+
+    def position(self, handle):
+        return self.grid.positions[handle]
+
+    def within(self, x, y, radius):
+        """Handles of all food strictly within radius of (x, y), oldest first"""
+        return sorted(self.grid.query_point(x, y, radius))
+
+    def nearest(self, x, y, radius, manhattan=False):
+        """(handle, distance) of the closest food strictly within radius, or None"""
+        best = None
+        for handle in self.grid.query_point(x, y, radius):
+            fx, fy = self.grid.positions[handle]
+            if manhattan:
+                dist = abs(x - fx) + abs(y - fy)
+                if dist >= radius:
+                    continue
+            else:
+                dist = math.sqrt((x - fx) ** 2 + (y - fy) ** 2)
+            if best is None or (dist, handle) < best:
+                best = (dist, handle)
+        return None if best is None else (best[1], best[0])
+
+    def at(self, x, y):
+        """Handle of the oldest food exactly at (x, y), or None"""
+        found = [handle for handle in self.grid.bucket_at(x, y) if self.grid.positions[handle] == (x, y)]
+        return min(found, default=None)
+
+
+class FoodArray:
+    """Food positions as a pair of arrays, for lookups from a whole population at once.
+
+    Iterating yields (x, y) tuples, so drawing code written for a list of
+    positions works unchanged.
+    """
+
+    def __init__(self):
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        return zip(self.x.tolist(), self.y.tolist())
+
+    def add_many(self, x, y):
+        """Append a batch of food positions"""
+        self.x = np.concatenate([self.x, x])
+        self.y = np.concatenate([self.y, y])
+
+    def keep(self, mask):
+        """Drop the food where mask is False"""
+        self.x = self.x[mask]
+        self.y = self.y[mask]
+
+    def clear(self):
+        """Remove all food"""
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
@@ -0,0 +1,257 @@
+import numpy as np
+
+
+def _pair_accelerations(dx, dy, mass_j, G, cutoff, min_distance):
+    """Acceleration on body i from body j for arrays of separation vectors"""
+    dist_sq = dx * dx + dy * dy
+    valid = dist_sq > 0
+    if cutoff is not None:
+        valid &= dist_sq < cutoff * cutoff
+    if min_distance is not None:
+        valid &= dist_sq >= min_distance * min_distance
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = G * mass_j / (dist_sq * np.sqrt(dist_sq))
+    scale = np.where(valid, scale, 0.0)
+    return scale * dx, scale * dy
+
+
+class ExactSolver:
+    """Vectorized all-pairs gravity, processed in row chunks to bound memory.
+
+    cutoff ignores pairs at or beyond that distance; with exclude_overlap, pairs
+    closer than the sum of their radii exert no force.
+    """
+
+    def __init__(self, G=1.0, cutoff=None, exclude_overlap=False, chunk_size=512):
+        self.G = G
+        self.cutoff = cutoff
+        self.exclude_overlap = exclude_overlap
+        self.chunk_size = chunk_size
+
+    def accelerations(self, pos, mass, radius=None):
+        """Return an (N, 2) array of accelerations for bodies at pos with masses mass"""
+        pos = np.asarray(pos, dtype=float)
+        mass = np.asarray(mass, dtype=float)
+        acc = np.zeros_like(pos)
+        for lo in range(0, len(pos), self.chunk_size):
+            hi = min(lo + self.chunk_size, len(pos))
+            dx = pos[None, :, 0] - pos[lo:hi, None, 0]
+            dy = pos[None, :, 1] - pos[lo:hi, None, 1]
+            min_distance = None
+            if self.exclude_overlap and radius is not None:
+                radius = np.asarray(radius, dtype=float)
+                min_distance = radius[lo:hi, None] + radius[None, :]
+            ax, ay = _pair_accelerations(dx, dy, mass[None, :], self.G, self.cutoff, min_distance)
+            acc[lo:hi, 0] = ax.sum(axis=1)
+            acc[lo:hi, 1] = ay.sum(axis=1)
+        return acc
+
+
+def _morton_codes(ix, iy, bits):
+    """Interleave the bits of two integer coordinate arrays"""
+    code = np.zeros(ix.shape, dtype=np.int64)
+    for b in range(bits):
+        code |= ((ix >> b) & 1) << (2 * b)
+        code |= ((iy >> b) & 1) << (2 * b + 1)
+    return code
+
+
+def _expand_ranges(starts, counts):
+    """For ranges [start, start + count), return (range index, value) for every element"""
+    owner = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, starts[owner] + offsets
+
+
+class _QuadTree:
+    """Flat quadtree over Morton-sorted bodies; every node owns a contiguous body range"""
+
+    def __init__(self, pos, mass, leaf_size, max_depth):
+        lo = pos.min(axis=0)
+        extent = max(float((pos.max(axis=0) - lo).max()), 1e-9) * (1 + 1e-9)
+        cells = 1 << max_depth
+        grid = np.minimum(((pos - lo) / extent * cells).astype(np.int64), cells - 1)
+        codes = _morton_codes(grid[:, 0], grid[:, 1], max_depth)
+
+        self.order = np.argsort(codes, kind='stable')
+        codes = codes[self.order]
+        sorted_pos = pos[self.order]
+        sorted_mass = mass[self.order]
+        self.rank = np.empty(len(pos), dtype=np.int64)
+        self.rank[self.order] = np.arange(len(pos))
+
+        # Prefix sums give mass and centre of mass of any body range in O(1)
+        cum_m = np.concatenate(([0.0], np.cumsum(sorted_mass)))
+        cum_mx = np.concatenate(([0.0], np.cumsum(sorted_mass * sorted_pos[:, 0])))
+        cum_my = np.concatenate(([0.0], np.cumsum(sorted_mass * sorted_pos[:, 1])))
+
+        open_starts = np.array([0])
+        open_ends = np.array([len(pos)])
+        levels = []
+        for level in range(max_depth + 1):
+            if level == 0:
+                starts, ends = open_starts, open_ends
+            else:
+                # Split every open parent range wherever the level key changes
+                keys = codes >> (2 * (max_depth - level))
+                owner, idx = _expand_ranges(open_starts, open_ends - open_starts)
+                boundary = np.ones(len(idx), dtype=bool)
+                boundary[1:] = (keys[idx[1:]] != keys[idx[:-1]]) | (owner[1:] != owner[:-1])
+                starts = idx[boundary]
+                ends = np.append(starts[1:], 0)
+                last_in_parent = np.append(owner[boundary][1:] != owner[boundary][:-1], True)
+                ends[last_in_parent] = open_ends[owner[boundary][last_in_parent]]
+            keys = codes[starts] >> (2 * (max_depth - level))
+            leaf = (ends - starts <= leaf_size) | (level == max_depth)
+            levels.append((level, starts, ends, keys, leaf))
+            open_starts, open_ends = starts[~leaf], ends[~leaf]
+            if len(open_starts) == 0:
+                break
+
+        # Flatten levels into node arrays; children of a node are a contiguous run
+        self.start = np.concatenate([lv[1] for lv in levels])
+        self.end = np.concatenate([lv[2] for lv in levels])
+        self.leaf = np.concatenate([lv[4] for lv in levels])
+        level_of = np.concatenate([np.full(len(lv[1]), lv[0]) for lv in levels])
+        keys = np.concatenate([lv[3] for lv in levels])
+        offsets = np.cumsum([0] + [len(lv[1]) for lv in levels])
+
+        self.first_child = np.zeros(len(self.start), dtype=np.int64)
+        self.child_count = np.zeros(len(self.start), dtype=np.int64)
+        for (level, starts, ends, _, leaf), base in zip(levels[:-1], offsets[:-1]):
+            child_starts = levels[level + 1][1]
+            first = np.searchsorted(child_starts, starts)
+            last = np.searchsorted(child_starts, ends)
+            inner = ~leaf
+            self.first_child[base:base + len(starts)][inner] = offsets[level + 1] + first[inner]
+            self.child_count[base:base + len(starts)][inner] = (last - first)[inner]
+
+        self.mass = cum_m[self.end] - cum_m[self.start]
+        weight = np.where(self.mass > 0, self.mass, 1.0)
+        self.com = np.stack(((cum_mx[self.end] - cum_mx[self.start]) / weight,
+                             (cum_my[self.end] - cum_my[self.start]) / weight), axis=1)
+
+        # Cell bounds, recovered by de-interleaving the level keys
+        self.size = extent / (1 << level_of)
+        ix = np.zeros(len(keys), dtype=np.int64)
+        iy = np.zeros(len(keys), dtype=np.int64)
+        for b in range(max_depth):
+            ix |= ((keys >> (2 * b)) & 1) << b
+            iy |= ((keys >> (2 * b + 1)) & 1) << b
+        self.cell_lo = lo + np.stack((ix, iy), axis=1) * self.size[:, None]
+
+        self.sorted_pos = sorted_pos
+        self.sorted_mass = sorted_mass
+
+
+class BarnesHutSolver:
+    """Quadtree Barnes-Hut gravity, traversed for all bodies at once.
+
+    Nodes whose size / distance falls below theta are treated as a single mass at
+    their centre of mass; larger theta is faster and less accurate. cutoff and
+    exclude_overlap behave as in ExactSolver for body-body interactions.
+    """
+
+    def __init__(self, G=1.0, theta=0.5, cutoff=None, exclude_overlap=False,
+                 leaf_size=8, max_depth=16):
+        self.G = G
+        self.theta = theta
+        self.cutoff = cutoff
+        self.exclude_overlap = exclude_overlap
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+
+    def accelerations(self, pos, mass, radius=None):
+        """Return an (N, 2) array of accelerations for bodies at pos with masses mass"""
+        pos = np.asarray(pos, dtype=float)
+        mass = np.asarray(mass, dtype=float)
+        n = len(pos)
+        acc = np.zeros_like(pos)
+        if n < 2:
+            return acc
+        if radius is not None:
+            radius = np.asarray(radius, dtype=float)
+        tree = _QuadTree(pos, mass, self.leaf_size, self.max_depth)
+
+        # Frontier of (body, node) pairs still to be resolved
+        bodies = np.arange(n)
+        nodes = np.zeros(n, dtype=np.int64)
+        while len(bodies):
+            p = pos[bodies]
+            if self.cutoff is not None:
+                # Drop nodes whose cell lies entirely beyond the cutoff
+                lo = tree.cell_lo[nodes]
+                nearest = np.clip(p, lo, lo + tree.size[nodes, None])
+                gap = np.hypot(*(nearest - p).T)
+                keep = gap < self.cutoff
+                bodies, nodes, p = bodies[keep], nodes[keep], p[keep]
+
+            d = tree.com[nodes] - p
+            distance = np.hypot(d[:, 0], d[:, 1])
+            rank = tree.rank[bodies]
+            inside = (rank >= tree.start[nodes]) & (rank < tree.end[nodes])
+            far = ~inside & (tree.size[nodes] < self.theta * distance)
+
+            if far.any():
+                ax, ay = _pair_accelerations(d[far, 0], d[far, 1], tree.mass[nodes[far]],
+                                             self.G, self.cutoff, None)
+                acc[:, 0] += np.bincount(bodies[far], weights=ax, minlength=n)
+                acc[:, 1] += np.bincount(bodies[far], weights=ay, minlength=n)
+
+            near_leaf = ~far & tree.leaf[nodes]
+            if near_leaf.any():
+                leaf_nodes = nodes[near_leaf]
+                owner, j = _expand_ranges(tree.start[leaf_nodes],
+                                          tree.end[leaf_nodes] - tree.start[leaf_nodes])
+                body = bodies[near_leaf][owner]
+                other = tree.order[j]
+                min_distance = None
+                if self.exclude_overlap and radius is not None:
+                    min_distance = radius[body] + radius[other]
+                ax, ay = _pair_accelerations(tree.sorted_pos[j, 0] - pos[body, 0],
+                                             tree.sorted_pos[j, 1] - pos[body, 1],
+                                             tree.sorted_mass[j], self.G, self.cutoff,
+                                             min_distance)
+                ax[other == body] = 0.0
+                ay[other == body] = 0.0
+                acc[:, 0] += np.bincount(body, weights=ax, minlength=n)
+                acc[:, 1] += np.bincount(body, weights=ay, minlength=n)
+
+            opened = ~far & ~tree.leaf[nodes]
+            parents = nodes[opened]
+            owner, children = _expand_ranges(tree.first_child[parents], tree.child_count[parents])
+            bodies = bodies[opened][owner]
+            nodes = children
+        return acc
+
+
+SOLVERS = {
+    'exact': ExactSolver,
+    'barnes_hut': BarnesHutSolver,
+}
+
+
+def make_solver(name, **kwargs):
+    """Create a solver by name ('exact' or 'barnes_hut')"""
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{name}', expected one of {tuple(SOLVERS)}")
+    return SOLVERS[name](**kwargs)
+
+
+def accuracy_report(solver, pos, mass, radius=None, reference=None):
+    """Compare a solver against the exact all-pairs result for the same bodies"""
+    if reference is None:
+        reference = ExactSolver(G=solver.G, cutoff=solver.cutoff,
+                                exclude_overlap=solver.exclude_overlap)
+    approx = solver.accelerations(pos, mass, radius)
+    exact = reference.accelerations(pos, mass, radius)
+    error = np.hypot(*(approx - exact).T)
+    magnitude = np.hypot(*exact.T)
+    relative = error / np.maximum(magnitude, 1e-12)
+    return {
+        'bodies': len(pos),
+        'rms_relative_error': float(np.sqrt(np.mean(relative ** 2))),
+        'median_relative_error': float(np.median(relative)),
+        'max_relative_error': float(relative.max()),
+        'rms_force_error': float(np.linalg.norm(error) / max(np.linalg.norm(magnitude), 1e-12)),
+    }
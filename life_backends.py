@@ -0,0 +1,495 @@
+import sys
+import time
+import numpy as np
+
+TILE = 64  # Tiles are 64x64 cells, one uint64 word per row
+
+_ONE = np.uint64(1)
+_SHIFT_EDGE = np.uint64(TILE - 1)
+
+
+def _check_rule(rule):
+    """Sparse storage relies on empty regions staying empty"""
+    birth_min, birth_max, survive_min, survive_max = rule
+    if birth_min <= 0:
+        raise ValueError("Rules with birth on 0 neighbors cannot use a sparse backend")
+    return rule
+
+
+def _count_masks(planes):
+    """Sum eight one-bit planes into a list of 'exactly n neighbors' masks for n = 0..8"""
+    s0 = np.zeros_like(planes[0])
+    s1 = np.zeros_like(planes[0])
+    s2 = np.zeros_like(planes[0])
+    s3 = np.zeros_like(planes[0])
+    for p in planes:
+        # Ripple-carry add of a single bit into the 4-bit counter
+        c0 = s0 & p
+        s0 ^= p
+        c1 = s1 & c0
+        s1 ^= c0
+        c2 = s2 & c1
+        s2 ^= c1
+        s3 |= c2
+
+    bits = (s0, s1, s2, s3)
+    inverted = tuple(~b for b in bits)
+    masks = []
+    for n in range(9):
+        mask = None
+        for b in range(4):
+            term = bits[b] if (n >> b) & 1 else inverted[b]
+            mask = term if mask is None else mask & term
+        masks.append(mask)
+    return masks
+
+
+def _apply_rule(alive, planes, rule):
+    """Apply a (birth_min, birth_max, survive_min, survive_max) rule to packed words"""
+    birth_min, birth_max, survive_min, survive_max = rule
+    masks = _count_masks(planes)
+    born = np.zeros_like(alive)
+    survives = np.zeros_like(alive)
+    for n in range(birth_min, birth_max + 1):
+        born |= masks[n]
+    for n in range(survive_min, survive_max + 1):
+        survives |= masks[n]
+    return (alive & survives) | (~alive & born)
+
+
+class PackedTileWorld:
+    """Bit-packed world stored as a sparse map of 64x64 tiles, wrapping at the edges"""
+
+    def __init__(self, width, height, rule):
+        if width % TILE or height % TILE:
+            raise ValueError(f"Width and height must be multiples of {TILE}")
+        self.width = width
+        self.height = height
+        self.tiles_x = width // TILE
+        self.tiles_y = height // TILE
+        self.rule = _check_rule(rule)
+        self.tiles = {}  # (tile_y, tile_x) -> uint64 array of 64 rows
+        self.generations_per_step = 1
+        self.generations = 0
+        self.elapsed = 0.0
+
+    def set_rule(self, rule):
+        """Switch to a different (birth, survive) rule"""
+        self.rule = _check_rule(rule)
+
+    @property
+    def population(self):
+        """Number of live cells"""
+        return sum(int(np.unpackbits(t.view(np.uint8)).sum()) for t in self.tiles.values())
+
+    def clear(self):
+        """Remove all live cells"""
+        self.tiles = {}
+
+    def get_cell(self, y, x):
+        """Return the state of a single cell"""
+        tile = self.tiles.get((y // TILE, x // TILE))
+        if tile is None:
+            return 0
+        return int((tile[y % TILE] >> np.uint64(x % TILE)) & _ONE)
+
+    def set_cell(self, y, x, value):
+        """Set a single cell to 0 or 1"""
+        key = (y // TILE, x // TILE)
+        tile = self.tiles.get(key)
+        if tile is None:
+            if not value:
+                return
+            tile = self.tiles[key] = np.zeros(TILE, dtype='<u8')
+        bit = _ONE << np.uint64(x % TILE)
+        if value:
+            tile[y % TILE] |= bit
+        else:
+            tile[y % TILE] &= ~bit
+            if not tile.any():
+                del self.tiles[key]
+
+    def load(self, grid):
+        """Replace the world with a dense array anchored at the top-left corner"""
+        self.tiles = {}
+        cells = np.asarray(grid) == 1
+        rows, cols = cells.shape
+        for ty in range(min(self.tiles_y, -(-rows // TILE))):
+            for tx in range(min(self.tiles_x, -(-cols // TILE))):
+                block = np.zeros((TILE, TILE), dtype=bool)
+                part = cells[ty*TILE:(ty+1)*TILE, tx*TILE:(tx+1)*TILE]
+                block[:part.shape[0], :part.shape[1]] = part
+                if block.any():
+                    packed = np.packbits(block, axis=1, bitorder='little')
+                    self.tiles[(ty, tx)] = packed.view('<u8').reshape(TILE).copy()
+
+    def window(self, y, x, h, w):
+        """Return a dense copy of the region starting at (y, x)"""
+        out = np.zeros((h, w), dtype=int)
+        for ty in range(y // TILE, (y + h - 1) // TILE + 1):
+            for tx in range(x // TILE, (x + w - 1) // TILE + 1):
+                tile = self.tiles.get((ty, tx))
+                if tile is None:
+                    continue
+                bits = np.unpackbits(tile.view(np.uint8).reshape(TILE, 8), axis=1, bitorder='little')
+                y0, x0 = max(y, ty*TILE), max(x, tx*TILE)
+                y1, x1 = min(y + h, (ty+1)*TILE), min(x + w, (tx+1)*TILE)
+                out[y0-y:y1-y, x0-x:x1-x] = bits[y0-ty*TILE:y1-ty*TILE, x0-tx*TILE:x1-tx*TILE]
+        return out
+
+    def step(self):
+        """Advance every live tile and its neighbors by one generation"""
+        start = time.perf_counter()
+        if self.tiles:
+            self.tiles = self._step_tiles()
+        self.generations += 1
+        self.elapsed += time.perf_counter() - start
+
+    def _neighbor(self, key, dy, dx):
+        return ((key[0] + dy) % self.tiles_y, (key[1] + dx) % self.tiles_x)
+
+    def _step_tiles(self):
+        # Only live tiles and their immediate neighbors can hold live cells next generation
+        active = set(self.tiles)
+        for key in self.tiles:
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    active.add(self._neighbor(key, dy, dx))
+        order = list(active)
+        index = {key: i for i, key in enumerate(order)}
+
+        # Stack all active tiles, with a trailing all-zero tile for empty neighbors
+        empty = len(order)
+        stack = np.zeros((empty + 1, TILE), dtype='<u8')
+        for key, tile in self.tiles.items():
+            stack[index[key]] = tile
+
+        offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+        lookup = np.empty((len(offsets), empty), dtype=np.intp)
+        for i, key in enumerate(order):
+            for j, (dy, dx) in enumerate(offsets):
+                lookup[j, i] = index.get(self._neighbor(key, dy, dx), empty)
+        nw, n, ne, w, e, sw, s, se = (stack[idx] for idx in lookup)
+        centre = stack[:empty]
+
+        # Rows above and below each row, borrowing edge rows from adjacent tiles
+        up = np.concatenate((n[:, -1:], centre[:, :-1]), axis=1)
+        up_w = np.concatenate((nw[:, -1:], w[:, :-1]), axis=1)
+        up_e = np.concatenate((ne[:, -1:], e[:, :-1]), axis=1)
+        down = np.concatenate((centre[:, 1:], s[:, :1]), axis=1)
+        down_w = np.concatenate((w[:, 1:], sw[:, :1]), axis=1)
+        down_e = np.concatenate((e[:, 1:], se[:, :1]), axis=1)
+
+        # Bit i of a word is column i, so west neighbors come from shifting left
+        def west(row, row_w):
+            return (row << _ONE) | (row_w >> _SHIFT_EDGE)
+
+        def east(row, row_e):
+            return (row >> _ONE) | (row_e << _SHIFT_EDGE)
+
+        planes = [west(up, up_w), up, east(up, up_e),
+                  west(centre, w), east(centre, e),
+                  west(down, down_w), down, east(down, down_e)]
+        new = _apply_rule(centre, planes, self.rule)
+
+        live = np.flatnonzero(new.any(axis=1))
+        kept = new[live]
+        return {order[i]: kept[k] for k, i in enumerate(live)}
+
+    def memory_report(self):
+        """Storage used by the live regions of the world"""
+        tiles = len(self.tiles)
+        payload = tiles * TILE * 8
+        overhead = sys.getsizeof(self.tiles) + sum(sys.getsizeof(t) - t.nbytes for t in self.tiles.values())
+        return {
+            'live_tiles': tiles,
+            'payload_bytes': payload,
+            'total_bytes': payload + overhead,
+            'bytes_per_live_tile': (payload + overhead) / tiles if tiles else 0.0,
+            'dense_int_bytes': self.width * self.height * np.dtype(int).itemsize,
+        }
+
+    def stats(self):
+        """Throughput and memory summary"""
+        report = self.memory_report()
+        report['generations'] = self.generations
+        report['generations_per_sec'] = self.generations / self.elapsed if self.elapsed else 0.0
+        return report
+
+
+class _Node:
+    """Interned quadtree node; level 0 nodes are single cells"""
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+_DEAD = _Node(0, None, None, None, None, 0)
+_ALIVE = _Node(0, None, None, None, None, 1)
+
+
+class HashLifeWorld:
+    """Memoized quadtree (HashLife) world that advances 2**step_log2 generations per step.
+
+    The quadtree covers an unbounded plane, so edges do not wrap; width and height
+    only bound toggles and pastes and set the area used for density.
+    """
+
+    def __init__(self, width, height, rule, step_log2=0, max_nodes=2_000_000):
+        self.width = width
+        self.height = height
+        self.rule = _check_rule(rule)
+        self.step_log2 = step_log2
+        self.max_nodes = max_nodes
+        self._nodes = {}
+        self._empty = [_DEAD]
+        self._results = {}
+        self.generations = 0
+        self.elapsed = 0.0
+        self.clear()
+
+    @property
+    def generations_per_step(self):
+        return 2 ** self.step_log2
+
+    def set_rule(self, rule):
+        """Switch to a different (birth, survive) rule, discarding memoized results"""
+        self.rule = _check_rule(rule)
+        self._results = {}
+
+    @property
+    def population(self):
+        """Number of live cells"""
+        return self.root.population
+
+    def _join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = self._nodes[key] = _Node(nw.level + 1, nw, ne, sw, se, population)
+        return node
+
+    def _empty_node(self, level):
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self._join(e, e, e, e))
+        return self._empty[level]
+
+    def clear(self):
+        """Remove all live cells"""
+        self.root = self._empty_node(3)
+        self.origin_y = 0
+        self.origin_x = 0
+
+    def _expand(self):
+        """Double the root around its centre"""
+        root = self.root
+        e = self._empty_node(root.level - 1)
+        self.root = self._join(
+            self._join(e, e, e, root.nw), self._join(e, e, root.ne, e),
+            self._join(e, root.sw, e, e), self._join(root.se, e, e, e))
+        half = 1 << (root.level - 1)
+        self.origin_y -= half
+        self.origin_x -= half
+
+    def _centre(self, node):
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _contains(self, y, x):
+        size = 1 << self.root.level
+        return (self.origin_y <= y < self.origin_y + size and
+                self.origin_x <= x < self.origin_x + size)
+
+    def get_cell(self, y, x):
+        """Return the state of a single cell"""
+        if not self._contains(y, x):
+            return 0
+        node = self.root
+        y -= self.origin_y
+        x -= self.origin_x
+        while node.level > 0:
+            if node.population == 0:
+                return 0
+            half = 1 << (node.level - 1)
+            if y < half:
+                node = node.nw if x < half else node.ne
+            else:
+                node = node.sw if x < half else node.se
+            y %= half
+            x %= half
+        return node.population
+
+    def set_cell(self, y, x, value):
+        """Set a single cell to 0 or 1"""
+        while not self._contains(y, x):
+            self._expand()
+        self.root = self._set(self.root, y - self.origin_y, x - self.origin_x, value)
+
+    def _set(self, node, y, x, value):
+        if node.level == 0:
+            return _ALIVE if value else _DEAD
+        half = 1 << (node.level - 1)
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        if y < half:
+            if x < half:
+                nw = self._set(nw, y, x, value)
+            else:
+                ne = self._set(ne, y, x - half, value)
+        else:
+            if x < half:
+                sw = self._set(sw, y - half, x, value)
+            else:
+                se = self._set(se, y - half, x - half, value)
+        return self._join(nw, ne, sw, se)
+
+    def load(self, grid):
+        """Replace the world with a dense array anchored at the top-left corner"""
+        self.clear()
+        for y, x in zip(*np.nonzero(np.asarray(grid) == 1)):
+            self.set_cell(int(y), int(x), 1)
+
+    def _live_cells(self, node, y, x, out):
+        if node.population == 0:
+            return
+        if node.level == 0:
+            out.append((y, x))
+            return
+        half = 1 << (node.level - 1)
+        self._live_cells(node.nw, y, x, out)
+        self._live_cells(node.ne, y, x + half, out)
+        self._live_cells(node.sw, y + half, x, out)
+        self._live_cells(node.se, y + half, x + half, out)
+
+    def window(self, y, x, h, w):
+        """Return a dense copy of the region starting at (y, x)"""
+        out = np.zeros((h, w), dtype=int)
+        cells = []
+        self._live_cells(self.root, self.origin_y, self.origin_x, cells)
+        for cy, cx in cells:
+            if y <= cy < y + h and x <= cx < x + w:
+                out[cy - y, cx - x] = 1
+        return out
+
+    def _life_4x4(self, node):
+        """Next generation of the centre 2x2 of a 4x4 node"""
+        birth_min, birth_max, survive_min, survive_max = self.rule
+        rows = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        cells = [[c.population for c in row] for row in rows]
+        result = []
+        for y in (1, 2):
+            for x in (1, 2):
+                neighbors = sum(cells[y + dy][x + dx]
+                                for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx)
+                if cells[y][x]:
+                    alive = survive_min <= neighbors <= survive_max
+                else:
+                    alive = birth_min <= neighbors <= birth_max
+                result.append(_ALIVE if alive else _DEAD)
+        return self._join(*result)
+
+    def _successor(self, node, j):
+        """Centre half of node advanced by 2**j generations (j <= level - 2)"""
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if node.population == 0:
+            result = node.nw
+        elif node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            j = min(j, node.level - 2)
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # Nine overlapping sub-squares one level down
+            parts = [
+                nw, self._join(nw.ne, ne.nw, nw.se, ne.sw), ne,
+                self._join(nw.sw, nw.se, sw.nw, sw.ne), self._centre(node),
+                self._join(ne.sw, ne.se, se.nw, se.ne),
+                sw, self._join(sw.ne, se.nw, sw.se, se.sw), se,
+            ]
+            if j == node.level - 2:
+                # Full speed: each half of the jump happens in its own recursion level
+                c = [self._successor(p, j) for p in parts]
+            else:
+                c = [self._centre(p) for p in parts]
+            result = self._join(
+                self._successor(self._join(c[0], c[1], c[3], c[4]), j),
+                self._successor(self._join(c[1], c[2], c[4], c[5]), j),
+                self._successor(self._join(c[3], c[4], c[6], c[7]), j),
+                self._successor(self._join(c[4], c[5], c[7], c[8]), j))
+
+        self._results[key] = result
+        return result
+
+    def step(self):
+        """Advance the world by 2**step_log2 generations"""
+        start = time.perf_counter()
+        j = self.step_log2
+
+        # Crop empty border, then pad so growth during the jump stays inside the root
+        while self.root.level > 3 and self._centre(self.root).population == self.root.population:
+            quarter = 1 << (self.root.level - 2)
+            self.root = self._centre(self.root)
+            self.origin_y += quarter
+            self.origin_x += quarter
+        while self.root.level < j + 2:
+            self._expand()
+        self._expand()
+        self._expand()
+
+        quarter = 1 << (self.root.level - 2)
+        self.root = self._successor(self.root, j)
+        self.origin_y += quarter
+        self.origin_x += quarter
+
+        self.generations += self.generations_per_step
+        if len(self._nodes) > self.max_nodes:
+            self._collect()
+        self.elapsed += time.perf_counter() - start
+
+    def _collect(self):
+        """Drop memoized results and every node not reachable from the root"""
+        self._nodes = {}
+        self._results = {}
+        self._empty = [_DEAD]
+        stack = [self.root]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or id(node) in seen:
+                continue
+            seen.add(id(node))
+            self._nodes[(node.nw, node.ne, node.sw, node.se)] = node
+            stack.extend((node.nw, node.ne, node.sw, node.se))
+
+    def memory_report(self):
+        """Storage used by the interned quadtree and memo table"""
+        node_bytes = sys.getsizeof(self.root) * len(self._nodes)
+        table_bytes = sys.getsizeof(self._nodes) + sys.getsizeof(self._results)
+        return {
+            'nodes': len(self._nodes),
+            'memoized_results': len(self._results),
+            'total_bytes': node_bytes + table_bytes,
+            'bytes_per_live_cell': (node_bytes + table_bytes) / self.population if self.population else 0.0,
+            'dense_int_bytes': self.width * self.height * np.dtype(int).itemsize,
+        }
+
+    def stats(self):
+        """Throughput and memory summary"""
+        report = self.memory_report()
+        report['generations'] = self.generations
+        report['generations_per_sec'] = self.generations / self.elapsed if self.elapsed else 0.0
+        return report
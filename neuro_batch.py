@@ -0,0 +1,178 @@
+"""Whole-population evaluation for the neuroevolution simulation in 91_neural.py.
+
+Every agent's weights are stacked into 3-D tensors, so one batched matmul
+per layer runs all the networks at once. Nearest-food lookups are done for
+all agents against all food in a single distance matrix.
+"""
+import numpy as np
+
+SPEED = 2.0
+EAT_RADIUS = 3.0
+
+
+def stack_brains(brains):
+    """(weights1, bias1, weights2, bias2) stacked along a leading population axis"""
+    return (np.stack([b.weights1 for b in brains]), np.stack([b.bias1 for b in brains]),
+            np.stack([b.weights2 for b in brains]), np.stack([b.bias2 for b in brains]))
+
+
+def layer_shapes(input_size=8, hidden_size=16, output_size=4):
+    """Shapes of weights1, bias1, weights2 and bias2 for one network"""
+    return ((input_size, hidden_size), (hidden_size,), (hidden_size, output_size), (output_size,))
+
+
+def flatten_brains(brains, dtype=np.float64):
+    """One genome row per network: weights1, bias1, weights2 and bias2 raveled end to end"""
+    return np.array([np.concatenate([b.weights1.ravel(), b.bias1, b.weights2.ravel(), b.bias2])
+                     for b in brains], dtype=dtype).reshape(len(brains), -1)
+
+
+def split_genomes(genomes, shapes):
+    """(P, ...) views of each layer inside a (P, genome_size) matrix, in stack_brains order"""
+    layers, offset = [], 0
+    for shape in shapes:
+        size = int(np.prod(shape))
+        layers.append(genomes[:, offset:offset + size].reshape((len(genomes),) + shape))
+        offset += size
+    return tuple(layers)
+
+
+def crossover_genomes(genomes, parents1, parents2, shapes, np_rng, out):
+    """NeuralNetwork.crossover for many children at once, written into out.
+
+    Weights are taken element by element from either parent and each bias
+    vector whole from one of them, as the per-network crossover does.
+    """
+    np.copyto(out, genomes[parents2])
+    take = np.empty(out.shape, dtype=bool)
+    offset = 0
+    for shape in shapes:
+        size = int(np.prod(shape))
+        if len(shape) > 1:
+            take[:, offset:offset + size] = np_rng.random_sample((len(out), size)) > 0.5
+        else:
+            take[:, offset:offset + size] = (np_rng.random_sample(len(out)) > 0.5)[:, None]
+        offset += size
+    np.copyto(out, genomes[parents1], where=take)
+    return out
+
+
+def mutate_genomes(genomes, rate, np_rng, scale=0.2):
+    """NeuralNetwork.mutate in place for every row: with probability rate, add noise to the whole genome"""
+    mutants = np.flatnonzero(np_rng.random_sample(len(genomes)) < rate)
+    if len(mutants):
+        genomes[mutants] += np_rng.standard_normal((len(mutants), genomes.shape[1])) * scale
+    return genomes
+
+
+def batched_forward(x, weights1, bias1, weights2, bias2):
+    """NeuralNetwork.forward for a batch: row i of x goes through network i"""
+    hidden = np.tanh(np.matmul(x[:, None, :], weights1)[:, 0] + bias1)
+    return np.tanh(np.matmul(hidden[:, None, :], weights2)[:, 0] + bias2)
+
+
+def nearest_food(positions, food, default=(50.0, 50.0)):
+    """Position of the closest food to each agent, ties to the lowest index as argmin picks"""
+    if not len(food):
+        return np.broadcast_to(np.asarray(default, dtype=float), positions.shape)
+    delta = positions[:, None, :] - food[None, :, :]
+    return food[np.argmin((delta ** 2).sum(axis=2), axis=1)]
+
+
+def sense(positions, targets, energy, score, world_size, noise):
+    """Agent.get_inputs for every agent, one row each"""
+    to_food = targets - positions
+    distance = np.hypot(to_food[:, 0], to_food[:, 1])
+    angle = np.arctan2(to_food[:, 1], to_food[:, 0])
+    return np.column_stack([
+        positions[:, 0] / world_size[0],
+        positions[:, 1] / world_size[1],
+        distance / (world_size[0] * 1.5),
+        np.cos(angle),
+        np.sin(angle),
+        energy / 100,
+        score / 10,
+        noise,
+    ])
+
+
+def reach(positions, food):
+    """Boolean (agents, food) matrix of which food each agent is close enough to eat"""
+    delta = positions[:, None, :] - food[None, :, :]
+    return np.sqrt((delta ** 2).sum(axis=2)) < EAT_RADIUS
+
+
+def serve(agents, within_reach, food_count):
+    """Agent and food index for each meal this tick, given each agent's reach row.
+
+    Agents are served in the order given and take the first uneaten food
+    within reach, as Simulation.check_food_collision would, but food eaten
+    this tick is not replaced until the tick is over.
+    """
+    eaters, eaten = [], []
+    taken = np.zeros(food_count, dtype=bool)
+    for agent, row in zip(agents, within_reach):
+        choices = np.flatnonzero(row & ~taken)
+        if len(choices):
+            taken[choices[0]] = True
+            eaters.append(agent)
+            eaten.append(choices[0])
+    return np.array(eaters, dtype=np.int64), np.array(eaten, dtype=np.int64)
+
+
+def advance(layers, positions, energy, score, food, world_size, noise):
+    """Sense, think and move once for the given agents; returns their new positions"""
+    targets = nearest_food(positions, food)
+    actions = batched_forward(sense(positions, targets, energy, score, world_size, noise), *layers)
+    moved = np.empty_like(positions)
+    moved[:, 0] = np.clip(positions[:, 0] + actions[:, 0] * SPEED, 0, world_size[0])
+    moved[:, 1] = np.clip(positions[:, 1] + actions[:, 1] * SPEED, 0, world_size[1])
+    return moved
+
+
+def respawn(food, eaten, world_size, np_rng):
+    """Replace eaten food with new food at random positions"""
+    width, height = world_size
+    food[eaten] = np_rng.uniform((5, 5), (width - 5, height - 5), size=(len(eaten), 2))
+
+
+def run_generation(brains, positions, food, world_size, np_rng, max_steps=500):
+    """Simulate one generation for the whole population at once.
+
+    brains is the tuple from stack_brains and food an (F, 2) array, which is
+    updated in place as food is eaten and respawned. Every agent senses the
+    food as it was at the start of the tick, then all move together.
+    Returns the final positions, energy, score and alive arrays.
+    """
+    positions = np.array(positions, dtype=float)
+    count = len(positions)
+    energy = np.full(count, 100)
+    score = np.zeros(count, dtype=np.int64)
+    alive = np.ones(count, dtype=bool)
+    active = np.arange(count)
+    layers = brains
+    for step in range(max_steps):
+        if len(active) != alive.sum():
+            # Someone died: drop their rows once rather than gathering every tick
+            keep = alive[active]
+            active = active[keep]
+            layers = tuple(layer[keep] for layer in layers)
+        if not len(active):
+            break
+
+        here = advance(layers, positions[active], energy[active], score[active], food,
+                       world_size, np_rng.random_sample(len(active)))
+        positions[active] = here
+
+        energy[active] -= 1
+        alive[active] = energy[active] > 0
+
+        if len(food):
+            within_reach = reach(here, food)
+            hungry = np.flatnonzero(within_reach.any(axis=1))
+            eaters, eaten = serve(active[hungry], within_reach[hungry], len(food))
+            if len(eaters):
+                score[eaters] += 1
+                energy[eaters] = np.minimum(100, energy[eaters] + 20)
+                respawn(food, eaten, world_size, np_rng)
+    return positions, energy, score, alive
@@ -0,0 +1,283 @@
+"""Evaluate neuroevolution generations on a pool of worker processes.
+
+Agents only interact through the food, so the population is split into
+contiguous shards, one per worker by default. Genomes (see
+neuro_batch.flatten_brains) and per-agent state live in one shared memory
+block that workers attach to by name, so networks are never pickled.
+
+There are two food modes:
+
+- 'independent': each shard plays the whole generation against its own copy
+  of the food, with its own generator seeded from the caller's. This takes
+  one round trip per generation, but agents only compete within their shard.
+- 'shared': shards advance in lock step, one round trip per tick. The parent
+  serves meals in agent order and respawns the food, so results match
+  Simulation(batched=True) exactly whatever the number of workers.
+
+Run directly to report generations/hour against worker count:
+
+    python neuro_parallel.py --workers 1 2 4 --population 5000 --mode shared
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import neuro_batch
+
+MODES = ('independent', 'shared')
+
+
+class SharedArrays:
+    """Named arrays packed into one shared memory block.
+
+    The process that creates the block owns it and unlinks it on close;
+    workers rebuild the same arrays from spec().
+    """
+
+    def __init__(self, fields, name=None):
+        self.fields = fields
+        self.owner = name is None
+        offsets, size = {}, 0
+        for key, (shape, dtype) in fields.items():
+            offsets[key] = size
+            size += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=max(size, 8))
+        self.arrays = {key: np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offsets[key])
+                       for key, (shape, dtype) in fields.items()}
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def spec(self):
+        return self.shm.name, self.fields
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# Blocks attached in this process, by name; workers keep only the latest
+_attached = {}
+
+
+def _attach(spec):
+    name, fields = spec
+    if name not in _attached:
+        for stale in [key for key, arrays in _attached.items() if not arrays.owner]:
+            _attached.pop(stale).close()
+        _attached[name] = SharedArrays(fields, name)
+    return _attached[name]
+
+
+def _shard_layers(arrays, shapes, rows):
+    return tuple(layer[rows] for layer in neuro_batch.split_genomes(arrays['genomes'], shapes))
+
+
+def run_shard(job):
+    """Play a whole generation for agents lo:hi against a private copy of the food"""
+    spec, shapes, lo, hi, world_size, max_steps, seed = job
+    arrays = _attach(spec)
+    food = arrays['food'].copy()
+    positions, energy, score, alive = neuro_batch.run_generation(
+        _shard_layers(arrays, shapes, slice(lo, hi)), arrays['positions'][lo:hi], food,
+        world_size, np.random.RandomState(seed), max_steps)
+    arrays['positions'][lo:hi] = positions
+    arrays['energy'][lo:hi] = energy
+    arrays['score'][lo:hi] = score
+    arrays['alive'][lo:hi] = alive
+
+
+def tick_shard(job):
+    """Move the living agents in lo:hi once; returns the ones that can reach food and their reach rows"""
+    spec, shapes, lo, hi, world_size = job
+    arrays = _attach(spec)
+    food = arrays['food']
+    rows = lo + np.flatnonzero(arrays['alive'][lo:hi])
+    if not len(rows):
+        return rows, np.zeros((0, len(food)), dtype=bool)
+    energy = arrays['energy']
+    here = neuro_batch.advance(_shard_layers(arrays, shapes, rows), arrays['positions'][rows],
+                               energy[rows], arrays['score'][rows], food, world_size,
+                               arrays['noise'][rows])
+    arrays['positions'][rows] = here
+    energy[rows] -= 1
+    arrays['alive'][rows] = energy[rows] > 0
+    if not len(food):
+        return rows[:0], np.zeros((0, 0), dtype=bool)
+    within_reach = neuro_batch.reach(here, food)
+    hungry = np.flatnonzero(within_reach.any(axis=1))
+    return rows[hungry], within_reach[hungry]
+
+
+class ParallelEvaluator:
+    """Runs generations of the batched simulation with the population sharded over processes.
+
+    With workers <= 1 the shards are run in this process, through the same
+    shared arrays, which is handy for checking results against a pool.
+    """
+
+    def __init__(self, workers=None, mode='shared', shards=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown food mode '{mode}', expected one of {MODES}")
+        self.workers = os.cpu_count() if workers is None else workers
+        self.mode = mode
+        self.shards = shards or max(self.workers, 1)
+        if self.workers > 1:
+            # Workers must share this process's tracker, or each one reports the
+            # blocks it attached to as leaked when it exits
+            resource_tracker.ensure_running()
+            self.pool = multiprocessing.Pool(self.workers)
+        else:
+            self.pool = None
+        self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut the worker pool down and release the shared block"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+        self._release()
+
+    def _release(self):
+        if self.shared is not None:
+            _attached.pop(self.shared.shm.name, None)
+            self.shared.close()
+            self.shared = None
+
+    def _arrays(self, genomes, food_count):
+        """The shared block, reallocated only when the population's shape changes"""
+        count, size = genomes.shape
+        fields = {
+            'genomes': ((count, size), genomes.dtype.str),
+            'positions': ((count, 2), '<f8'),
+            'energy': ((count,), '<i8'),
+            'score': ((count,), '<i8'),
+            'alive': ((count,), '|b1'),
+            'noise': ((count,), '<f8'),
+            'food': ((food_count, 2), '<f8'),
+        }
+        if self.shared is None or self.shared.fields != fields:
+            self._release()
+            self.shared = SharedArrays(fields)
+            if self.pool is None:
+                _attached[self.shared.shm.name] = self.shared
+        return self.shared
+
+    def _map(self, function, jobs):
+        if self.pool is None:
+            return [function(job) for job in jobs]
+        return self.pool.map(function, jobs)
+
+    def bounds(self, count):
+        """(lo, hi) of each shard of a population of count agents"""
+        edges = np.linspace(0, count, min(self.shards, max(count, 1)) + 1).astype(int)
+        return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+    def run_generation(self, genomes, shapes, positions, food, world_size, np_rng, max_steps=500):
+        """neuro_batch.run_generation over the shards, for a (P, genome_size) genome matrix.
+
+        food is updated in place in shared mode and left untouched in
+        independent mode, where every shard eats from its own copy.
+        """
+        arrays = self._arrays(genomes, len(food))
+        arrays['genomes'][:] = genomes
+        arrays['positions'][:] = positions
+        arrays['energy'][:] = 100
+        arrays['score'][:] = 0
+        arrays['alive'][:] = True
+        arrays['food'][:] = food
+        spec = arrays.spec()
+        bounds = self.bounds(len(genomes))
+
+        if self.mode == 'independent':
+            seeds = np_rng.randint(2 ** 31 - 1, size=len(bounds))
+            self._map(run_shard, [(spec, shapes, lo, hi, world_size, max_steps, int(seed))
+                                  for (lo, hi), seed in zip(bounds, seeds)])
+        else:
+            self._run_shared(arrays, spec, shapes, bounds, world_size, np_rng, max_steps)
+            food[:] = arrays['food']
+
+        return (arrays['positions'].copy(), arrays['energy'].copy(),
+                arrays['score'].copy(), arrays['alive'].copy())
+
+    def _run_shared(self, arrays, spec, shapes, bounds, world_size, np_rng, max_steps):
+        jobs = [(spec, shapes, lo, hi, world_size) for lo, hi in bounds]
+        food, energy, score = arrays['food'], arrays['energy'], arrays['score']
+        for step in range(max_steps):
+            active = np.flatnonzero(arrays['alive'])
+            if not len(active):
+                break
+            # Noise is drawn here, for everyone in agent order, as the single-process loop does
+            arrays['noise'][active] = np_rng.random_sample(len(active))
+            results = self._map(tick_shard, jobs)
+            if not len(food):
+                continue
+            hungry = np.concatenate([agents for agents, _ in results])
+            within_reach = np.concatenate([rows for _, rows in results])
+            eaters, eaten = neuro_batch.serve(hungry, within_reach, len(food))
+            if len(eaters):
+                score[eaters] += 1
+                energy[eaters] = np.minimum(100, energy[eaters] + 20)
+                neuro_batch.respawn(food, eaten, world_size, np_rng)
+
+
+def benchmark(workers=(1, 2, 4), population=5000, generations=3, max_steps=500,
+              num_food=10, world_size=(100, 100), mode='shared', seed=0):
+    """Generations/hour of evaluation for every worker count, on random networks"""
+    shapes = neuro_batch.layer_shapes()
+    genome_size = sum(int(np.prod(shape)) for shape in shapes)
+    results = []
+    for count in workers:
+        np_rng = np.random.RandomState(seed)
+        genomes = np_rng.randn(population, genome_size) * 0.5
+        with ParallelEvaluator(count, mode) as evaluator:
+            start = time.perf_counter()
+            for _ in range(generations):
+                positions = np_rng.uniform(10, np.subtract(world_size, 10), size=(population, 2))
+                food = np_rng.uniform(5, np.subtract(world_size, 5), size=(num_food, 2))
+                evaluator.run_generation(genomes, shapes, positions, food, world_size,
+                                         np_rng, max_steps)
+            elapsed = time.perf_counter() - start
+        results.append({
+            'workers': count,
+            'mode': mode,
+            'population': population,
+            'generations': generations,
+            'elapsed_s': elapsed,
+            'generations_per_hour': 3600 * generations / elapsed if elapsed else 0.0,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel neuroevolution evaluation benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='Worker counts to compare (default: 1 2 4)')
+    parser.add_argument('--population', type=int, default=5000, help='Agents per generation (default: 5000)')
+    parser.add_argument('--generations', type=int, default=3, help='Generations per measurement (default: 3)')
+    parser.add_argument('--steps', type=int, default=500, help='Steps per generation (default: 500)')
+    parser.add_argument('--food', type=int, default=10, help='Food in the world (default: 10)')
+    parser.add_argument('--mode', choices=MODES, default='shared', help='Food mode (default: shared)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    results = benchmark(args.workers, args.population, args.generations, args.steps,
+                        args.food, mode=args.mode, seed=args.seed)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
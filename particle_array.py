@@ -0,0 +1,206 @@
+import numpy as np
+
+
+class ParticleArray:
+    """Structure-of-arrays particle store.
+
+    Positions, velocities, masses, radii and colors live in contiguous arrays
+    sized to a growable capacity; only the first `count` rows are live. Trails are
+    kept in a fixed-size ring buffer shared by all particles, so recording a trail
+    point is a single array write instead of a list append and pop(0).
+    """
+
+    def __init__(self, trail_length=20, capacity=64):
+        self.trail_length = trail_length
+        self.count = 0
+        self.trail_head = 0  # Ring slot that the next trail point is written to
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.count
+        fields = {
+            'pos': ((capacity, 2), np.float64),
+            'vel': ((capacity, 2), np.float64),
+            'mass': ((capacity,), np.float64),
+            'radius': ((capacity,), np.float64),
+            'color': ((capacity, 3), np.uint8),
+            'trail': ((capacity, self.trail_length, 2), np.float32),
+            'trail_count': ((capacity,), np.int32),
+        }
+        for name, (shape, dtype) in fields.items():
+            array = np.zeros(shape, dtype=dtype)
+            if hasattr(self, '_' + name):
+                array[:old] = getattr(self, '_' + name)[:old]
+            setattr(self, '_' + name, array)
+        self.capacity = capacity
+
+    # Live views of the first `count` particles
+    @property
+    def pos(self):
+        return self._pos[:self.count]
+
+    @property
+    def vel(self):
+        return self._vel[:self.count]
+
+    @property
+    def mass(self):
+        return self._mass[:self.count]
+
+    @property
+    def radius(self):
+        return self._radius[:self.count]
+
+    @property
+    def color(self):
+        return self._color[:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y, vx, vy, mass, radius, color):
+        """Append one particle and return its index"""
+        return self.add_many([(x, y)], [(vx, vy)], [mass], [radius], [color])[0]
+
+    def add_many(self, pos, vel, mass, radius, color):
+        """Append a batch of particles and return their indices"""
+        n = len(mass)
+        if self.count + n > self.capacity:
+            self._allocate(max(self.count + n, self.capacity * 2))
+        lo, hi = self.count, self.count + n
+        self._pos[lo:hi] = pos
+        self._vel[lo:hi] = vel
+        self._mass[lo:hi] = mass
+        self._radius[lo:hi] = radius
+        self._color[lo:hi] = color
+        self._trail_count[lo:hi] = 0
+        self.count = hi
+        return range(lo, hi)
+
+    def clear(self):
+        """Remove every particle, keeping the allocated capacity"""
+        self.count = 0
+        self.trail_head = 0
+
+    def apply_accelerations(self, acc):
+        """Add an (N, 2) array of accelerations to the velocities"""
+        self.vel[:] += acc
+
+    def apply_forces(self, force):
+        """Add an (N, 2) array of forces to the velocities, divided by mass"""
+        self.vel[:] += force / self.mass[:, None]
+
+    def damp(self, factor):
+        """Scale every velocity by factor"""
+        self.vel[:] *= factor
+
+    def integrate(self, dt=1.0):
+        """Move every particle by its velocity"""
+        self.pos[:] += self.vel * dt
+
+    def bounce(self, width, height, restitution=0.8, inclusive=False):
+        """Reflect and clamp particles that touch the walls of a width x height box.
+
+        With inclusive, a particle resting exactly on the wall also counts as hitting it.
+        """
+        r = self.radius[:, None]
+        lo = r
+        hi = np.array([width, height]) - r
+        if inclusive:
+            hit = (self.pos <= lo) | (self.pos >= hi)
+        else:
+            hit = (self.pos < lo) | (self.pos > hi)
+        self.vel[hit] *= -restitution
+        np.clip(self.pos, lo, hi, out=self.pos)
+
+    def record_trail(self, round_to_int=False, points=None):
+        """Write the current positions, or the given (N, 2) points, into the trail ring buffer"""
+        point = self.pos if points is None else points
+        if round_to_int:
+            point = np.trunc(point)
+        self._trail[:self.count, self.trail_head] = point
+        self.trail_head = (self.trail_head + 1) % self.trail_length
+        np.minimum(self._trail_count[:self.count] + 1, self.trail_length,
+                   out=self._trail_count[:self.count])
+
+    def trail(self, i):
+        """Trail points of particle i, oldest first"""
+        n = self._trail_count[i]
+        slots = (self.trail_head - n + np.arange(n)) % self.trail_length
+        return self._trail[i, slots]
+
+    def trails(self):
+        """(N, trail_length, 2) trail points, oldest first and right-aligned, plus the count per particle"""
+        slots = (self.trail_head + np.arange(self.trail_length)) % self.trail_length
+        return self._trail[:self.count, slots], self._trail_count[:self.count]
+
+    def draw_lists(self):
+        """Integer positions, radii, color tuples and integer trails of every particle as plain lists.
+
+        Everything is read from the arrays once, so a draw loop over the
+        result does no per-particle array access.
+        """
+        points, counts = self.trails()
+        rows = points.astype(np.int64).tolist()
+        trails = [row[self.trail_length - n:] for row, n in zip(rows, counts.tolist())]
+        colors = [tuple(color) for color in self.color.tolist()]
+        return self.pos.astype(np.int64).tolist(), self.radius.tolist(), colors, trails
+
+    def nbytes(self):
+        """Bytes allocated for particle data"""
+        arrays = (self._pos, self._vel, self._mass, self._radius,
+                  self._color, self._trail, self._trail_count)
+        return sum(a.nbytes for a in arrays)
+
+    def bytes_per_particle(self):
+        """Allocated bytes divided by live particles"""
+        return self.nbytes() / self.count if self.count else 0.0
+
+    def view(self, i):
+        """Particle-style object backed by row i of this store"""
+        return ParticleView(self, i)
+
+
+class ParticleView:
+    """Thin per-particle facade over a ParticleArray row, for code written against Particle"""
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def _field(name, column=None):
+        def get(self):
+            value = getattr(self.store, '_' + name)[self.index]
+            return value if column is None else value[column]
+
+        def set(self, value):
+            if column is None:
+                getattr(self.store, '_' + name)[self.index] = value
+            else:
+                getattr(self.store, '_' + name)[self.index, column] = value
+        return property(get, set)
+
+    x = _field('pos', 0)
+    y = _field('pos', 1)
+    vx = _field('vel', 0)
+    vy = _field('vel', 1)
+    mass = _field('mass')
+    radius = _field('radius')
+    del _field
+
+    @property
+    def color(self):
+        return tuple(int(c) for c in self.store._color[self.index])
+
+    @color.setter
+    def color(self, value):
+        self.store._color[self.index] = value
+
+    @property
+    def trail(self):
+        return self.store.trail(self.index).tolist()
+
+    def apply_force(self, fx, fy):
+        self.vx += fx / self.mass
+        self.vy += fy / self.mass
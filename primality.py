@@ -0,0 +1,144 @@
+"""Primality tests for single numbers and whole arrays.
+
+Numbers below a limit are looked up in a packed wheel-30 bitmap from
+prime_engine. Anything larger goes through Miller-Rabin with the first
+thirteen primes as bases, which is deterministic for every n below 3.3e24,
+so for all 64-bit inputs, and costs O(log^3 n) instead of trial division's
+O(sqrt n); larger n are reported as strong probable primes. Arrays below
+2**32 are tested with a vectorized Miller-Rabin on bases 2, 7 and 61,
+which is exact in that range. Results for large numbers can be memoized
+on disk across runs.
+"""
+import os
+import pickle
+
+import numpy as np
+
+from prime_engine import RESIDUES, WHEEL_PRIMES, WheelSieve
+
+SMALL_LIMIT = 1 << 20
+# Deterministic for n < 3317044064679887385961981
+MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# Deterministic for n < 4759123141
+MR_BASES_32 = (2, 7, 61)
+
+_BIT_OF = np.full(30, -1, dtype=np.int64)
+_BIT_OF[list(RESIDUES)] = np.arange(8)
+
+
+def miller_rabin(n, bases=MR_BASES):
+    """True if odd n > max(bases) is a strong probable prime to every base"""
+    d, s = n - 1, 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def miller_rabin_32(n):
+    """miller_rabin over a uint64 array of odd n with 61 < n < 2**32, so products never overflow"""
+    n = np.asarray(n, dtype=np.uint64)
+    low_bit = (n - 1) & (~(n - 1) + 1)
+    s = np.log2(low_bit.astype(np.float64)).astype(np.uint64)
+    d = (n - 1) >> s
+    one = np.uint64(1)
+    prime = np.ones(n.shape, dtype=bool)
+    for a in MR_BASES_32:
+        x, base, e = np.ones_like(n), np.full_like(n, a) % n, d.copy()
+        while e.any():
+            odd = (e & one).astype(bool)
+            x = np.where(odd, x * base % n, x)
+            base = base * base % n
+            e >>= one
+        passed = (x == 1) | (x == n - 1)
+        for i in range(1, int(s.max(initial=0))):
+            x = x * x % n
+            passed |= (x == n - 1) & (i < s)
+        prime &= passed
+    return prime
+
+
+class PrimalityService:
+    """Answers is_prime for single numbers and arrays, with an optional on-disk memo.
+
+    The memo only holds numbers above the bitmap, where a lookup is cheaper
+    than the test. It is written by save(), or on leaving a with block.
+    """
+
+    def __init__(self, cache_path=None, small_limit=SMALL_LIMIT):
+        self.small_limit = max(small_limit, 64)  # The tests below assume n > 61
+        _, self.small_bits = WheelSieve().bitmap(0, self.small_limit)
+        self.cache_path = cache_path
+        self.memo = {}
+        self._dirty = False
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                self.memo = pickle.load(f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def save(self):
+        """Write the memo to cache_path, replacing it atomically"""
+        if not self.cache_path or not self._dirty:
+            return
+        temp = self.cache_path + '.tmp'
+        with open(temp, 'wb') as f:
+            pickle.dump(self.memo, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.cache_path)
+        self._dirty = False
+
+    def _small(self, n):
+        if n in WHEEL_PRIMES:
+            return True
+        bit = _BIT_OF[n % 30]
+        return bit >= 0 and bool(self.small_bits[n // 30] >> bit & 1)
+
+    def is_prime(self, n):
+        """Whether n is prime"""
+        n = int(n)
+        if n < self.small_limit:
+            return n >= 2 and self._small(n)
+        known = self.memo.get(n)
+        if known is None:
+            known = all(n % p for p in MR_BASES) and miller_rabin(n)
+            self.memo[n] = known
+            self._dirty = True
+        return known
+
+    def is_prime_many(self, values):
+        """Boolean array, whether each of values is prime"""
+        values = np.asarray(values)
+        flat = values.ravel()
+        result = np.zeros(flat.shape, dtype=bool)
+
+        small = (flat >= 0) & (flat < self.small_limit)
+        n = flat[small].astype(np.int64)
+        bits = _BIT_OF[n % 30]
+        found = (bits >= 0) & ((self.small_bits[n // 30] >> np.maximum(bits, 0)) & 1).astype(bool)
+        result[small] = found | np.isin(n, WHEEL_PRIMES)
+
+        medium = ~small & (flat >= self.small_limit) & (flat < 1 << 32)
+        if medium.any():
+            n = flat[medium].astype(np.uint64)
+            candidates = (n % 2 != 0) & (n % 3 != 0) & (n % 5 != 0)
+            found = np.zeros(n.shape, dtype=bool)
+            found[candidates] = miller_rabin_32(n[candidates])
+            result[medium] = found
+
+        for i in np.flatnonzero(~small & ~medium):
+            result[i] = self.is_prime(int(flat[i]))
+        return result.reshape(values.shape)
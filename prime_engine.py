@@ -0,0 +1,215 @@
+"""Segmented wheel-30 prime sieve on packed bit arrays.
+
+Every byte covers 30 integers: bit b of byte k stands for 30*k + RESIDUES[b],
+the eight residues coprime to 30, so multiples of 2, 3 and 5 take no space
+at all. Segments are sieved in place with NumPy: multiples of 7..19 come from
+a precomputed pattern, each small prime clears one bit per byte with a
+strided slice, and large primes, which only hit a segment a few times, are
+cleared together with one fancy-indexed operation per residue.
+
+    >>> engine = WheelSieve()
+    >>> engine.count(10 ** 9), engine.nth(10 ** 6)
+    (50847534, 15485863)
+"""
+import math
+
+import numpy as np
+
+RESIDUES = (1, 7, 11, 13, 17, 19, 23, 29)
+WHEEL_PRIMES = (2, 3, 5)
+PRESIEVE_PRIMES = (7, 11, 13, 17, 19)
+
+_RESIDUE_ARRAY = np.array(RESIDUES, dtype=np.int64)
+# Bit index of each residue mod 30, or -1 for numbers sharing a factor with 30
+_BIT_OF = np.full(30, -1, dtype=np.int64)
+_BIT_OF[_RESIDUE_ARRAY] = np.arange(8)
+
+
+def small_primes(limit):
+    """All primes <= limit, from a plain odd-only sieve"""
+    if limit < 2:
+        return np.zeros(0, dtype=np.int64)
+    sieve = np.ones(limit // 2 + 1, dtype=bool)  # index i stands for 2*i + 1
+    sieve[0] = False
+    for i in range(1, (math.isqrt(limit) - 1) // 2 + 1):
+        if sieve[i]:
+            p = 2 * i + 1
+            sieve[p * p // 2::p] = False
+    primes = 2 * np.flatnonzero(sieve) + 1
+    return np.concatenate([[2], primes[primes <= limit]]).astype(np.int64)
+
+
+def _presieve_pattern():
+    """Bytes with the multiples of 7..19 cleared; it repeats every 7*11*13*17*19 bytes"""
+    period = int(np.prod(PRESIEVE_PRIMES))
+    pattern = np.full(period, 0xFF, dtype=np.uint8)
+    for p in PRESIEVE_PRIMES:
+        inverse = pow(30, -1, p)
+        for bit, residue in enumerate(RESIDUES):
+            pattern[(-residue * inverse) % p::p] &= np.uint8(~(1 << bit) & 0xFF)
+    return pattern
+
+
+class WheelSieve:
+    """Prime counting, listing and nth-prime over a segmented wheel-30 bit sieve.
+
+    Ranges are half-open [lo, hi) except count(n), which is pi(n). Memory use
+    is one segment plus the base primes up to sqrt(hi), so counting to 1e10
+    needs a few megabytes. segment_bytes trades cache locality against the
+    Python overhead paid per prime per segment.
+    """
+
+    def __init__(self, segment_bytes=1 << 20, strided_hits=128):
+        self.segment_bytes = segment_bytes
+        # Primes that hit a segment at least this often get their own strided slice
+        self.strided_hits = strided_hits
+        self._pattern = _presieve_pattern()
+        self._period = len(self._pattern)
+        self._tiled = np.tile(self._pattern, segment_bytes // self._period + 2)
+        self.base_limit = 0
+        self._set_base_primes(1 << 16)
+
+    def _set_base_primes(self, limit):
+        primes = small_primes(limit)
+        primes = primes[primes > PRESIEVE_PRIMES[-1]]
+        self.base_limit = limit
+        self.base_primes = primes
+        inverses = np.array([pow(30, -1, p) for p in primes.tolist()], dtype=np.int64)
+        # offsets[i, b]: k of the multiples of primes[i] that land on bit b, mod primes[i]
+        self._offsets = (-_RESIDUE_ARRAY[None, :] * inverses[:, None]) % primes[:, None]
+        # First k on each bit that is at least p*p, so the prime itself is never cleared
+        self._first = (primes[:, None] ** 2 - _RESIDUE_ARRAY[None, :] + 29) // 30
+
+    def ensure_base_primes(self, hi):
+        """Extend the base prime table to sieve up to hi"""
+        root = math.isqrt(max(hi, 0)) + 1
+        if root > self.base_limit:
+            self._set_base_primes(max(root, 2 * self.base_limit))
+
+    def sieve_segment(self, k_lo, k_hi):
+        """Packed bits for 30*k_lo <= n < 30*k_hi, a set bit meaning prime"""
+        size = k_hi - k_lo
+        self.ensure_base_primes(30 * k_hi)
+        offset = k_lo % self._period
+        if size + offset <= len(self._tiled):
+            segment = self._tiled[offset:offset + size].copy()
+        else:
+            segment = self._pattern[(np.arange(k_lo, k_hi) % self._period)]
+        if k_lo == 0:
+            segment[0] &= 0xFE  # 1 is not prime
+            for p in PRESIEVE_PRIMES:
+                segment[0] |= 1 << _BIT_OF[p]
+
+        count = np.searchsorted(self.base_primes, math.isqrt(30 * k_hi - 1), 'right')
+        if not count:
+            return segment
+        primes = self.base_primes[:count]
+        first = np.maximum(self._first[:count], k_lo)
+        starts = first + (self._offsets[:count] - first) % primes[:, None] - k_lo
+
+        strided = np.searchsorted(primes, size // self.strided_hits, 'right')
+        for bit in range(8):
+            mask = np.uint8(~(1 << bit) & 0xFF)
+            column = starts[:, bit]
+            for start, p in zip(column[:strided].tolist(), primes[:strided].tolist()):
+                segment[start::p] &= mask
+            # The rest hit a few times each: gather every index and clear them at once
+            rest, steps = column[strided:], primes[strided:]
+            inside = rest < size
+            rest, steps = rest[inside], steps[inside]
+            if len(rest):
+                hits = (size - 1 - rest) // steps + 1
+                # Indices as a running sum: step p within a run, then a jump to the next run's start
+                jumps = np.repeat(steps, hits)
+                last = rest + (hits - 1) * steps
+                jumps[np.cumsum(hits) - hits] = rest - np.concatenate([[0], last[:-1]])
+                segment[np.cumsum(jumps)] &= mask
+        return segment
+
+    def segments(self, lo, hi):
+        """Yield (k_lo, packed bits) covering [lo, hi), with bits outside the range cleared"""
+        lo = max(lo, 0)
+        if hi <= lo:
+            return
+        k_first, k_last = lo // 30, -(-hi // 30)
+        for k_lo in range(k_first, k_last, self.segment_bytes):
+            k_hi = min(k_lo + self.segment_bytes, k_last)
+            segment = self.sieve_segment(k_lo, k_hi)
+            if k_lo == k_first:
+                segment[0] &= self._edge_mask(lo - 30 * k_lo, keep_above=True)
+            if k_hi == k_last:
+                segment[-1] &= self._edge_mask(hi - 30 * (k_hi - 1), keep_above=False)
+            yield k_lo, segment
+
+    @staticmethod
+    def _edge_mask(cut, keep_above):
+        """Bits of one byte whose residue is >= cut (keep_above) or < cut"""
+        keep = [(r >= cut) == keep_above for r in RESIDUES]
+        return np.uint8(sum(1 << bit for bit, k in enumerate(keep) if k))
+
+    def _small(self, lo, hi):
+        return [p for p in WHEEL_PRIMES if lo <= p < hi]
+
+    def count_range(self, lo, hi):
+        """Number of primes in [lo, hi)"""
+        total = len(self._small(lo, hi))
+        for _, segment in self.segments(lo, hi):
+            total += int(np.bitwise_count(segment).sum())
+        return total
+
+    def count(self, n):
+        """pi(n), the number of primes <= n"""
+        return self.count_range(0, n + 1)
+
+    def count_twins(self, lo, hi):
+        """Number of twin prime pairs (p, p + 2) with lo <= p < hi"""
+        total = sum(1 for p in (3, 5) if lo <= p < hi)
+        carry = 0
+        for _, segment in self.segments(lo, hi + 2):
+            # 11/13 and 17/19 share a byte; 29 and 31 straddle two
+            total += int(np.bitwise_count(segment & (segment >> 1) & 0b00010100).sum())
+            total += int(np.count_nonzero((segment[:-1] >> 7) & segment[1:] & 1))
+            total += int(carry & segment[0] & 1)
+            carry = int(segment[-1] >> 7)
+        return total
+
+    def bitmap(self, lo, hi):
+        """(k_lo, packed bits) for the whole of [lo, hi); 2, 3 and 5 are not represented"""
+        parts = list(self.segments(lo, hi))
+        if not parts:
+            return max(lo, 0) // 30, np.zeros(0, dtype=np.uint8)
+        return parts[0][0], np.concatenate([segment for _, segment in parts])
+
+    @staticmethod
+    def decode(k_lo, segment):
+        """Primes marked in a packed segment starting at byte k_lo, ascending"""
+        bits = np.flatnonzero(np.unpackbits(segment, bitorder='little'))
+        return 30 * (k_lo + bits // 8) + _RESIDUE_ARRAY[bits % 8]
+
+    def primes_array(self, lo, hi):
+        """All primes in [lo, hi) as an int64 array"""
+        parts = [np.array(self._small(lo, hi), dtype=np.int64)]
+        parts += [self.decode(k_lo, segment) for k_lo, segment in self.segments(lo, hi)]
+        return np.concatenate(parts)
+
+    def iterate(self, lo, hi):
+        """Yield the primes in [lo, hi) in order, one segment in memory at a time"""
+        yield from self._small(lo, hi)
+        for k_lo, segment in self.segments(lo, hi):
+            yield from self.decode(k_lo, segment).tolist()
+
+    def nth(self, n):
+        """The nth prime, counting 2 as the first"""
+        if n < 1:
+            raise ValueError('n must be at least 1')
+        if n <= len(WHEEL_PRIMES):
+            return WHEEL_PRIMES[n - 1]
+        # Rosser's bound p_n < n (ln n + ln ln n) for n >= 6 caps the search
+        bound = 30 if n < 6 else int(n * (math.log(n) + math.log(math.log(n)))) + 1
+        remaining = n - len(WHEEL_PRIMES)
+        for k_lo, segment in self.segments(0, bound + 1):
+            found = int(np.bitwise_count(segment).sum())
+            if found >= remaining:
+                return int(self.decode(k_lo, segment)[remaining - 1])
+            remaining -= found
+        raise AssertionError('nth prime bound was too small')
@@ -0,0 +1,164 @@
+"""Prime counting and range queries split over a pool of worker processes.
+
+A range [lo, hi) is cut into disjoint chunks whole segments long, and each
+worker sieves its chunks with a WheelSieve forked from the parent. The base
+prime table up to sqrt(hi) is built once in the parent and inherited by
+every worker, so no worker ever sieves from zero. Workers send back counts
+or packed wheel-30 bitmaps, never lists of primes. Run directly to compare
+worker counts:
+
+    python prime_parallel.py --workers 1 2 4 --lo 1000000000000 --length 1000000000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from prime_engine import WheelSieve
+
+_engine = None
+
+
+def _init_worker(engine):
+    global _engine
+    _engine = engine
+
+
+def sieve_chunk(engine, job):
+    """Run one chunk: ('count' | 'twins' | 'bitmap', lo, hi)"""
+    kind, lo, hi = job
+    if kind == 'count':
+        return engine.count_range(lo, hi)
+    if kind == 'twins':
+        return engine.count_twins(lo, hi)
+    return engine.bitmap(lo, hi)
+
+
+def _run_chunk(job):
+    return sieve_chunk(_engine, job)
+
+
+class ParallelSieve:
+    """Counts and lists primes in arbitrary ranges with chunks sieved on a process pool.
+
+    With workers <= 1 chunks are sieved in this process. The pool is
+    restarted whenever a query needs more base primes than the workers
+    were forked with.
+    """
+
+    def __init__(self, workers=None, segment_bytes=1 << 20, chunks_per_worker=4):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunks_per_worker = chunks_per_worker
+        self.engine = WheelSieve(segment_bytes)
+        self.pool = None
+        self._pool_limit = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def _ready(self, hi):
+        """Make sure this process, and the workers if any, hold base primes up to sqrt(hi)"""
+        self.engine.ensure_base_primes(hi)
+        if self.workers > 1 and (self.pool is None or self.engine.base_limit > self._pool_limit):
+            self.close()
+            self.pool = multiprocessing.Pool(self.workers, _init_worker, (self.engine,))
+            self._pool_limit = self.engine.base_limit
+
+    def chunks(self, lo, hi):
+        """Disjoint [lo, hi) pieces, whole segments long, enough to keep every worker busy"""
+        lo = max(lo, 0)
+        if hi <= lo:
+            return []
+        span = 30 * self.engine.segment_bytes
+        pieces = max(1, self.workers * self.chunks_per_worker)
+        size = max(span, -(-(hi - lo) // pieces // span) * span)
+        # Inner edges on multiples of 30 keep every chunk's bytes disjoint
+        edges = [lo] + list(range(lo // 30 * 30 + size, hi, size)) + [hi]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def _map(self, kind, lo, hi, ordered=True):
+        self._ready(hi + 2)
+        jobs = [(kind, a, b) for a, b in self.chunks(lo, hi)]
+        if self.pool is None:
+            return (sieve_chunk(self.engine, job) for job in jobs)
+        if ordered:
+            return self.pool.imap(_run_chunk, jobs)
+        return self.pool.imap_unordered(_run_chunk, jobs)
+
+    def count_range(self, lo, hi):
+        """Number of primes in [lo, hi)"""
+        return sum(self._map('count', lo, hi, ordered=False))
+
+    def pi(self, x):
+        """Number of primes <= x"""
+        return self.count_range(0, x + 1)
+
+    def count_twins(self, lo, hi):
+        """Number of twin prime pairs (p, p + 2) with lo <= p < hi"""
+        return sum(self._map('twins', lo, hi, ordered=False))
+
+    def bitmaps(self, lo, hi):
+        """Yield (k_lo, packed bits) for consecutive chunks of [lo, hi), in order"""
+        yield from self._map('bitmap', lo, hi)
+
+    def iterate(self, lo, hi):
+        """Yield the primes in [lo, hi) in order"""
+        yield from (p for p in (2, 3, 5) if lo <= p < hi)
+        for k_lo, bits in self.bitmaps(lo, hi):
+            yield from WheelSieve.decode(k_lo, bits).tolist()
+
+    def primes_array(self, lo, hi):
+        """All primes in [lo, hi) as an int64 array"""
+        parts = [np.array([p for p in (2, 3, 5) if lo <= p < hi], dtype=np.int64)]
+        parts += [WheelSieve.decode(k_lo, bits) for k_lo, bits in self.bitmaps(lo, hi)]
+        return np.concatenate(parts)
+
+
+def benchmark(workers=(1, 2, 4), ranges=((0, 10 ** 9), (10 ** 12, 10 ** 12 + 10 ** 9)), twins=False):
+    """Seconds and numbers/sec for counting primes in each range with each worker count"""
+    results = []
+    for count in workers:
+        with ParallelSieve(count) as sieve:
+            for lo, hi in ranges:
+                sieve._ready(hi + 2)  # Base primes and pool start are not part of the timing
+                start = time.perf_counter()
+                found = sieve.count_twins(lo, hi) if twins else sieve.count_range(lo, hi)
+                elapsed = time.perf_counter() - start
+                results.append({
+                    'workers': count,
+                    'lo': lo,
+                    'hi': hi,
+                    'count': found,
+                    'elapsed_s': elapsed,
+                    'numbers_per_sec': (hi - lo) / elapsed if elapsed else 0.0,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel segmented prime counting benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='Worker counts to compare (default: 1 2 4)')
+    parser.add_argument('--lo', type=int, default=0, help='Start of the range (default: 0)')
+    parser.add_argument('--length', type=int, default=10 ** 9, help='Length of the range (default: 1e9)')
+    parser.add_argument('--twins', action='store_true', help='Count twin primes instead of primes')
+    args = parser.parse_args()
+
+    results = benchmark(args.workers, [(args.lo, args.lo + args.length)], args.twins)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
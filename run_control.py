@@ -0,0 +1,184 @@
+"""Seeded, checkpointable runs of the ecosystem and evolution simulations.
+
+Every simulation gets its own random generators instead of the global ones,
+and the whole simulation, generators included, can be written to a
+compressed checkpoint. A resumed run continues exactly as if it had never
+stopped, so long runs can be split into chunks and optimizations compared
+on identical trajectories.
+
+    python run_control.py ecosystem --seed 7 --steps 5000 --checkpoint eco.ckpt --checkpoint-every 500
+    python run_control.py --resume eco.ckpt --steps 5000
+"""
+import argparse
+import io
+import json
+import os
+import pickle
+import random
+import zlib
+
+import numpy as np
+
+from script_loader import load_script
+
+MAGIC = b'RUNCKPT1'
+
+
+def make_rngs(seed):
+    """A random.Random and a numpy RandomState seeded from the same value"""
+    return random.Random(seed), np.random.RandomState(seed)
+
+
+def _ecosystem(module, rng, np_rng, use_arrays=False):
+    return module.Ecosystem(use_arrays=use_arrays, rng=rng, np_rng=np_rng)
+
+
+def _creatures(module, rng, np_rng):
+    return module.Ecosystem(rng=rng)
+
+
+def _world(module, rng, np_rng):
+    return module.World(100, 40, rng=rng)
+
+
+def _evolution(module, rng, np_rng, **options):
+    sim = module.Simulation(rng=rng, np_rng=np_rng, **options)
+    sim.initialize_population()
+    return sim
+
+
+# name -> (script, method that advances one step, factory)
+SIMULATIONS = {
+    'ecosystem': ('0102_creature.py', 'update', _ecosystem),
+    'creatures': ('0105_creature.py', 'update', _creatures),
+    'world': ('89_creature.py', 'update', _world),
+    'evolution': ('91_neural.py', 'step', _evolution),
+}
+
+
+class _ScriptUnpickler(pickle.Unpickler):
+    """Resolves classes pickled from a script, whether it was imported or run as __main__"""
+
+    def __init__(self, file, module):
+        super().__init__(file)
+        self.module = module
+
+    def find_class(self, module, name):
+        if module in ('__main__', self.module.__name__):
+            return getattr(self.module, name)
+        return super().find_class(module, name)
+
+
+class RunController:
+    """Steps one simulation and writes checkpoints of its full state.
+
+    Checkpoints are the pickled simulation, compressed with zlib, behind a
+    small header naming the simulation and the number of steps taken.
+    """
+
+    def __init__(self, name, sim, steps_done=0, seed=None):
+        if name not in SIMULATIONS:
+            raise ValueError(f"Unknown simulation '{name}', expected one of {sorted(SIMULATIONS)}")
+        self.name = name
+        self.sim = sim
+        self.steps_done = steps_done
+        self.seed = seed
+        self._advance = getattr(sim, SIMULATIONS[name][1])
+
+    @classmethod
+    def start(cls, name, seed=0, **options):
+        """Create a fresh simulation driven by generators seeded with seed"""
+        script, _, factory = SIMULATIONS[name]
+        rng, np_rng = make_rngs(seed)
+        return cls(name, factory(load_script(script), rng, np_rng, **options), seed=seed)
+
+    def step(self):
+        self._advance()
+        self.steps_done += 1
+
+    def run(self, steps, checkpoint_every=None, checkpoint_path=None):
+        """Advance steps times, checkpointing every checkpoint_every steps and at the end"""
+        for _ in range(steps):
+            self.step()
+            if checkpoint_every and checkpoint_path and self.steps_done % checkpoint_every == 0:
+                self.save(checkpoint_path)
+        if checkpoint_path:
+            self.save(checkpoint_path)
+
+    def to_bytes(self):
+        """Checkpoint contents"""
+        buffer = io.BytesIO()
+        pickle.dump({'name': self.name, 'steps_done': self.steps_done, 'seed': self.seed},
+                    buffer, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(self.sim, buffer, pickle.HIGHEST_PROTOCOL)
+        return MAGIC + zlib.compress(buffer.getvalue(), 6)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a controller from checkpoint contents"""
+        if not data.startswith(MAGIC):
+            raise ValueError('Not a run checkpoint')
+        buffer = io.BytesIO(zlib.decompress(data[len(MAGIC):]))
+        header = pickle.load(buffer)
+        module = load_script(SIMULATIONS[header['name']][0])
+        sim = _ScriptUnpickler(buffer, module).load()
+        return cls(header['name'], sim, header['steps_done'], header['seed'])
+
+    def save(self, path):
+        """Write a checkpoint, replacing path atomically"""
+        temp = path + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(self.to_bytes())
+        os.replace(temp, path)
+
+    @classmethod
+    def resume(cls, path):
+        """Load a controller from a checkpoint file"""
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def summary(self):
+        """Steps taken plus whatever statistics the simulation reports"""
+        summary = {'simulation': self.name, 'seed': self.seed, 'steps_done': self.steps_done}
+        if hasattr(self.sim, 'get_stats'):
+            summary['stats'] = self.sim.get_stats()
+        elif hasattr(self.sim, 'stats'):
+            summary['stats'] = dict(self.sim.stats)
+        elif hasattr(self.sim, 'history') and self.sim.history:
+            summary['stats'] = self.sim.history[-1]
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seeded, checkpointable simulation runs')
+    parser.add_argument('simulation', nargs='?', choices=sorted(SIMULATIONS),
+                        help='Simulation to start (omit with --resume)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--steps', type=int, default=1000, help='Steps to run (default: 1000)')
+    parser.add_argument('--checkpoint', help='Checkpoint file to write')
+    parser.add_argument('--checkpoint-every', type=int, help='Steps between checkpoints')
+    parser.add_argument('--resume', help='Continue from this checkpoint')
+    parser.add_argument('--arrays', action='store_true', help='Array-backed population (ecosystem only)')
+    parser.add_argument('--flat-genomes', action='store_true', help='Flat float32 genome matrix (evolution only)')
+    args = parser.parse_args()
+
+    if args.resume:
+        controller = RunController.resume(args.resume)
+    elif args.simulation:
+        if args.arrays and args.simulation != 'ecosystem':
+            parser.error('--arrays only applies to the ecosystem simulation')
+        if args.flat_genomes and args.simulation != 'evolution':
+            parser.error('--flat-genomes only applies to the evolution simulation')
+        options = {'use_arrays': True} if args.arrays else {}
+        if args.flat_genomes:
+            options['flat_genomes'] = True
+        controller = RunController.start(args.simulation, args.seed, **options)
+    else:
+        parser.error('give a simulation to start or --resume a checkpoint')
+
+    controller.run(args.steps, args.checkpoint_every, args.checkpoint or args.resume)
+    print(json.dumps(controller.summary(), indent=2, default=float))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+import importlib.util
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename):
+    """Import one of the numbered scripts in this directory as a module"""
+    name = 'script_' + os.path.splitext(filename)[0]
+    if name in sys.modules:
+        return sys.modules[name]
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        # Don't leave a half-initialised module behind for the next caller
+        del sys.modules[name]
+        raise
+    return module
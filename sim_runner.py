@@ -0,0 +1,246 @@
+"""Run the pygame simulations headless for a fixed number of steps and report timings.
+
+Each simulation is split into physics, trail and draw phases that are timed
+separately; drawing goes to an off-screen surface and can be skipped entirely
+to measure pure simulation throughput.
+
+    python sim_runner.py gravity --steps 500 --count 1000 --solver barnes_hut --no-draw
+"""
+import os
+
+# Must be set before pygame is imported anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+import pygame
+
+from script_loader import load_script
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) with linear interpolation"""
+    if not values:
+        return 0.0
+    return float(np.percentile(values, q))
+
+
+class ParticleSystemSim:
+    """0109_particle.py: interactive particle system with connections"""
+    name = 'particles'
+    default_dt = None  # The particle physics advances one frame per step, with no timestep
+
+    def __init__(self, count=50, solver=None, use_arrays=False):
+        module = load_script('0109_particle.py')
+        self.system = module.ParticleSystem(num_particles=count, solver=solver,
+                                            use_arrays=use_arrays)
+
+    def body_count(self):
+        return len(self.system.particles)
+
+    def physics(self, dt):
+        self.system.step(record_trail=False)
+
+    def trail(self, dt):
+        self.system.record_trails()
+
+    def draw(self, dt):
+        self.system.screen.fill((10, 10, 20))
+        self.system.draw()
+
+
+class GravityParticlesSim:
+    """0113_partcile.py: particles orbiting a central mass"""
+    name = 'gravity'
+    default_dt = None  # The particle physics advances one frame per step, with no timestep
+
+    def __init__(self, count=150, solver=None, use_arrays=False):
+        self.module = load_script('0113_partcile.py')
+        self.solver = self.module.create_solver(solver)
+        self.store = None
+        if use_arrays:
+            self.store = self.module.ParticleArray(trail_length=self.module.TRAIL_LENGTH)
+            self.solver = self.solver or self.module.create_solver('exact')
+        self.particles = self.module.create_particles(count, self.store)
+        self.screen = pygame.Surface((self.module.WIDTH, self.module.HEIGHT))
+
+    def body_count(self):
+        return len(self.particles)
+
+    def physics(self, dt):
+        self.module.apply_gravity(self.particles, self.solver, self.store)
+        self.module.update_particles(self.particles, self.store, record_trail=False)
+
+    def trail(self, dt):
+        self.module.record_trails(self.particles, self.store)
+
+    def draw(self, dt):
+        self.screen.fill(self.module.BACKGROUND_COLOR)
+        self.module.draw_particles(self.screen, self.particles, self.store)
+
+
+class SolarSystemSim:
+    """93_celestial.py: planets and an asteroid belt around the sun"""
+    name = 'solar'
+
+    def __init__(self, count=None, solver=None, use_arrays=False, integrator=None,
+                 ring_trails=False):
+        self.module = load_script('93_celestial.py')
+        self.default_dt = self.module.TIMESTEP
+        if not hasattr(self.module, 'FONT'):
+            self.module.FONT = pygame.font.Font(None, 16)
+        if count is None:
+            count = self.module.ASTEROID_COUNT
+        self.bodies = self.module.create_solar_system(count)
+        self.engine = None
+        self.drawn = self.bodies
+        if integrator is not None:
+            self.engine, self.drawn = self.module.create_engine(self.bodies, integrator)
+        self.trails = self.module.create_trails(self.drawn) if ring_trails else None
+        self.screen = pygame.Surface((self.module.WIDTH, self.module.HEIGHT))
+
+    def body_count(self):
+        return len(self.bodies)
+
+    def physics(self, dt):
+        if self.engine is not None:
+            self.engine.step(dt)
+            self.module.sync_bodies(self.engine, self.drawn, record_orbit=False)
+        else:
+            for body in self.bodies:
+                body.update_position(self.bodies, record_orbit=False, timestep=dt)
+
+    def trail(self, dt):
+        if self.trails is not None and self.engine is not None:
+            self.trails.record(self.engine.pos)
+        elif self.trails is not None:
+            self.trails.record([(body.x, body.y) for body in self.drawn])
+        else:
+            for body in self.drawn:
+                body.record_orbit()
+
+    def draw(self, dt):
+        self.screen.fill(self.module.BLACK)
+        if self.engine is not None:
+            self.module.draw_test_particles(self.screen, self.engine, 0, 0)
+        if self.trails is not None:
+            self.module.draw_orbits(self.screen, self.trails, self.drawn, 0, 0)
+        for body in self.drawn:
+            body.draw(self.screen, 0, 0, draw_orbit=self.trails is None)
+
+
+SIMULATIONS = {
+    'particles': ParticleSystemSim,
+    'gravity': GravityParticlesSim,
+    'solar': SolarSystemSim,
+}
+
+
+def run(sim, steps, dt=None, draw=True, warmup=0):
+    """Step a simulation with a fixed dt and return a timing report"""
+    if dt is not None and sim.default_dt is None:
+        raise ValueError(f"The {sim.name} simulation has no timestep to set")
+    dt = sim.default_dt if dt is None else dt
+    phases = [('physics', sim.physics), ('trail', sim.trail)]
+    if draw:
+        phases.append(('draw', sim.draw))
+
+    for _ in range(warmup):
+        for _, phase in phases:
+            phase(dt)
+
+    samples = {name: [] for name, _ in phases}
+    latencies = []
+    run_start = time.perf_counter()
+    for _ in range(steps):
+        step_start = time.perf_counter()
+        for name, phase in phases:
+            start = time.perf_counter()
+            phase(dt)
+            samples[name].append(time.perf_counter() - start)
+        latencies.append(time.perf_counter() - step_start)
+    elapsed = time.perf_counter() - run_start
+
+    total_phase_time = sum(sum(values) for values in samples.values()) or 1.0
+    report = {
+        'simulation': sim.name,
+        'steps': steps,
+        'bodies': sim.body_count(),
+        'draw': draw,
+        'elapsed_s': elapsed,
+        'steps_per_sec': steps / elapsed if elapsed else 0.0,
+        'step_latency_ms': {
+            'p50': percentile(latencies, 50) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'mean': float(np.mean(latencies)) * 1000 if latencies else 0.0,
+            'max': max(latencies, default=0.0) * 1000,
+        },
+        'phases': {
+            name: {
+                'total_s': sum(values),
+                'share': sum(values) / total_phase_time,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+            }
+            for name, values in samples.items()
+        },
+    }
+    if dt is not None:
+        report['dt'] = dt
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless fixed-timestep simulation runner')
+    parser.add_argument('simulation', choices=sorted(SIMULATIONS), help='Simulation to run')
+    parser.add_argument('--steps', type=int, default=300, help='Timed steps (default: 300)')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed steps before measuring (default: 10)')
+    parser.add_argument('--dt', type=float, help='Fixed timestep (default: the simulation\'s own)')
+    parser.add_argument('--count', type=int, help='Number of particles')
+    parser.add_argument('--solver', choices=['exact', 'barnes_hut'], help='Gravity solver for particle systems')
+    parser.add_argument('--arrays', action='store_true', help='Use ParticleArray storage')
+    parser.add_argument('--integrator', choices=['euler', 'verlet', 'yoshida4'],
+                        help='N-body integrator for the solar system')
+    parser.add_argument('--ring-trails', action='store_true',
+                        help='Keep solar system orbits in a shared TrailBuffer')
+    parser.add_argument('--no-draw', action='store_true', help='Skip the draw phase')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    pygame.init()
+
+    options = {'solver': args.solver, 'use_arrays': args.arrays}
+    if args.count is not None:
+        options['count'] = args.count
+    if args.integrator is not None:
+        if args.simulation != 'solar':
+            parser.error('--integrator only applies to the solar simulation')
+        options['integrator'] = args.integrator
+    if args.ring_trails:
+        if args.simulation != 'solar':
+            parser.error('--ring-trails only applies to the solar simulation')
+        options['ring_trails'] = True
+    sim = SIMULATIONS[args.simulation](**options)
+    if args.dt is not None and sim.default_dt is None:
+        parser.error(f'--dt does not apply to the {args.simulation} simulation, which has no timestep')
+    report = run(sim, args.steps, args.dt, draw=not args.no_draw, warmup=args.warmup)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
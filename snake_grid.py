@@ -0,0 +1,116 @@
+"""Shared board state for the Snake simulation in 0110_vector.py.
+
+Every snake used to test a move against each segment of every body, so a
+tick cost O(snakes x length) list scans per snake. An OccupancyGrid
+records which snake holds each cell, so a collision test is one array
+lookup. A DistanceField is computed from it once per tick, and every
+snake steers toward food along it.
+"""
+from array import array
+
+EMPTY = 0
+
+
+class OccupancyGrid:
+    """Owner id of every cell of a width x height board, kept in one flat array.
+
+    Snakes occupy a cell when their head enters it and vacate it when their
+    tail leaves, so a collision test is a single lookup instead of a walk
+    over every body. Segments may overlap (a new snake starts coiled on one
+    cell), so each cell also counts its segments and only empties when the
+    last one leaves. Owner ids are 1..65535; 0 means empty.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.owner = array('H', bytes(2 * width * height))
+        self.count = array('H', bytes(2 * width * height))
+        # 1 for every empty cell, on a board padded with a blocked border so
+        # searches can step to any neighbour without bounds checks
+        self.stride = width + 2
+        self.free = bytearray(self.stride * (height + 2))
+        for y in range(height):
+            start = (y + 1) * self.stride + 1
+            self.free[start:start + width] = b'\x01' * width
+
+    def inside(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def blocked(self, x, y):
+        """Whether (x, y) is off the board or holds a segment"""
+        return not (0 <= x < self.width and 0 <= y < self.height) or self.count[y * self.width + x] > 0
+
+    def owner_at(self, x, y):
+        """Id of the last snake to enter (x, y), or EMPTY"""
+        return self.owner[y * self.width + x]
+
+    def occupy(self, x, y, owner):
+        """Add a segment of owner at (x, y); cells off the board are ignored"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            self.owner[i] = owner
+            self.count[i] += 1
+            self.free[(y + 1) * self.stride + x + 1] = 0
+
+    def vacate(self, x, y):
+        """Remove one segment from (x, y)"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            if self.count[i]:
+                self.count[i] -= 1
+                if not self.count[i]:
+                    self.owner[i] = EMPTY
+                    self.free[(y + 1) * self.stride + x + 1] = 1
+
+
+class DistanceField:
+    """Steps from every free cell to the nearest target, by one BFS from all targets at once.
+
+    Computing the field costs O(width * height) however many snakes read
+    it, and a snake steers by stepping to its neighbour with the smallest
+    distance, which routes it around bodies instead of into dead ends.
+    Occupied cells and cells no target can reach hold UNREACHABLE. The
+    buffers are reused between compute() calls.
+    """
+
+    UNREACHABLE = 0x7FFFFFFF
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._blank = [self.UNREACHABLE] * len(grid.free)
+        self.dist = list(self._blank)  # Indexed like grid.free
+
+    def compute(self, targets):
+        """Refill the field from the current occupancy; targets are (x, y) pairs"""
+        grid, stride = self.grid, self.grid.stride
+        dist = self.dist
+        dist[:] = self._blank
+        # Cells still to visit: free and not reached yet
+        todo = bytearray(grid.free)
+        frontier = []
+        for x, y in targets:
+            if grid.inside(x, y):
+                i = (y + 1) * stride + x + 1
+                if todo[i]:
+                    todo[i] = 0
+                    dist[i] = 0
+                    frontier.append(i)
+
+        steps = 0
+        while frontier:
+            steps += 1
+            reached = []
+            for i in frontier:
+                for j in (i - 1, i + 1, i - stride, i + stride):
+                    if todo[j]:
+                        todo[j] = 0
+                        dist[j] = steps
+                        reached.append(j)
+            frontier = reached
+
+    def distance(self, x, y):
+        """Steps from (x, y) to the nearest target, UNREACHABLE if blocked or cut off"""
+        if not self.grid.inside(x, y):
+            return self.UNREACHABLE
+        return self.dist[(y + 1) * self.grid.stride + x + 1]
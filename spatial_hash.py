@@ -0,0 +1,136 @@
+import math
+
+
+class SpatialHash:
+    """Uniform grid of buckets for fixed-radius neighbour queries.
+
+    Items are any hashable objects (particles, creatures, ...) with a position
+    supplied by the caller. Moving an item only touches its buckets when it
+    crosses into a new cell, so keeping the grid current is cheap each frame.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> {item: None}, an insertion-ordered set
+        self.positions = {}  # item -> (x, y)
+        self._cell_of = {}  # item -> (cell_x, cell_y)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, item, x, y):
+        """Add an item at (x, y), or move it there if already present"""
+        if item in self.positions:
+            self.move(item, x, y)
+            return
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, {})[item] = None
+        self._cell_of[item] = cell
+        self.positions[item] = (x, y)
+
+    def move(self, item, x, y):
+        """Update an item's position, changing bucket only when it leaves its cell"""
+        self.positions[item] = (x, y)
+        cell = self._cell(x, y)
+        old = self._cell_of[item]
+        if cell != old:
+            bucket = self.cells[old]
+            del bucket[item]
+            if not bucket:
+                del self.cells[old]
+            self.cells.setdefault(cell, {})[item] = None
+            self._cell_of[item] = cell
+
+    def remove(self, item):
+        """Remove an item from the grid"""
+        cell = self._cell_of.pop(item)
+        del self.positions[item]
+        bucket = self.cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self.cells[cell]
+
+    def clear(self):
+        """Remove every item"""
+        self.cells.clear()
+        self.positions.clear()
+        self._cell_of.clear()
+
+    def sync(self, items, position=lambda item: (item.x, item.y)):
+        """Bring the grid in line with items: insert new ones, move existing, drop missing"""
+        current = set()
+        for item in items:
+            current.add(item)
+            x, y = position(item)
+            if item in self.positions:
+                self.move(item, x, y)
+            else:
+                self.insert(item, x, y)
+        for item in [i for i in self.positions if i not in current]:
+            self.remove(item)
+
+    def bucket_at(self, x, y):
+        """Items in the grid cell containing (x, y), in the order they entered it"""
+        return list(self.cells.get(self._cell(x, y), ()))
+
+    def query_point(self, x, y, radius):
+        """All items strictly within radius of (x, y)"""
+        span = math.ceil(radius / self.cell_size)
+        cx, cy = self._cell(x, y)
+        radius_sq = radius * radius
+        found = []
+        for gx in range(cx - span, cx + span + 1):
+            for gy in range(cy - span, cy + span + 1):
+                bucket = self.cells.get((gx, gy))
+                if not bucket:
+                    continue
+                for item in bucket:
+                    px, py = self.positions[item]
+                    if (px - x) ** 2 + (py - y) ** 2 < radius_sq:
+                        found.append(item)
+        return found
+
+    def neighbors(self, item, radius):
+        """All other items strictly within radius of item"""
+        x, y = self.positions[item]
+        return [other for other in self.query_point(x, y, radius) if other is not item]
+
+    def pairs_within(self, radius):
+        """Every unordered pair strictly closer than radius, as (a, b, distance)"""
+        span = math.ceil(radius / self.cell_size)
+        # Only look "forward" from each cell so every pair of cells is visited once
+        forward = [(dx, dy) for dx in range(-span, span + 1) for dy in range(0, span + 1)
+                   if dy > 0 or dx > 0]
+        radius_sq = radius * radius
+        positions = self.positions
+        pairs = []
+        for (cx, cy), bucket in self.cells.items():
+            members = list(bucket)
+            coords = [positions[item] for item in members]
+
+            for i, a in enumerate(members):
+                ax, ay = coords[i]
+                for j in range(i + 1, len(members)):
+                    bx, by = coords[j]
+                    dist_sq = (ax - bx) ** 2 + (ay - by) ** 2
+                    if dist_sq < radius_sq:
+                        pairs.append((a, members[j], math.sqrt(dist_sq)))
+
+            for dx, dy in forward:
+                other = self.cells.get((cx + dx, cy + dy))
+                if not other:
+                    continue
+                for b in other:
+                    bx, by = positions[b]
+                    for i, a in enumerate(members):
+                        ax, ay = coords[i]
+                        dist_sq = (ax - bx) ** 2 + (ay - by) ** 2
+                        if dist_sq < radius_sq:
+                            pairs.append((a, b, math.sqrt(dist_sq)))
+        return pairs
@@ -0,0 +1,305 @@
+"""Flicker-free terminal animation: draw into a back buffer, write only what changed.
+
+The ASCII animations used to clear the screen through a shell every frame
+and reprint every cell, often with a full color escape around each
+character. A TerminalRenderer keeps the last frame shown (the front
+buffer) next to the one being drawn (the back buffer). present() sends
+only the cells that differ, with a cursor move to the start of each run,
+and emits a color change only when the attribute actually changes. The
+whole frame goes out in one write.
+
+    with TerminalRenderer(80, 24) as screen:
+        screen.clear()
+        screen.text(0, 0, 'Hello', '1;32')
+        screen.present()
+
+Attributes are SGR parameter strings such as '1;32' (bold green), with ''
+for the terminal default. Run directly to compare bytes per frame and
+frames/sec with clearing and reprinting:
+
+    python terminal_frame.py matrix fractal creatures dna --frames 200
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+import unicodedata
+from contextlib import contextmanager, redirect_stdout
+
+from script_loader import load_script
+
+CSI = '\033['
+# Skipping this many unchanged cells costs less to rewrite than a cursor move
+MAX_GAP = 4
+
+_narrow = {}
+
+
+def is_narrow(char):
+    """Whether char takes exactly one terminal column"""
+    narrow = _narrow.get(char)
+    if narrow is None:
+        narrow = (len(char) == 1 and unicodedata.east_asian_width(char) not in 'WF'
+                  and not unicodedata.combining(char))
+        _narrow[char] = narrow
+    return narrow
+
+
+def sgr(attr):
+    """Escape sequence switching to attr from any previous attribute"""
+    return f'{CSI}0;{attr}m' if attr else f'{CSI}0m'
+
+
+class TerminalRenderer:
+    """A width x height grid of characters and attributes, written to the terminal as diffs.
+
+    Rows holding wide characters (emoji, CJK) cannot be patched cell by
+    cell, because every column after them shifts, so a changed row of that
+    kind is rewritten from its first column. stream defaults to whatever
+    sys.stdout is when a frame is presented.
+    """
+
+    def __init__(self, width, height, stream=None):
+        self.width = width
+        self.height = height
+        self.stream = stream
+        self.chars = [[' '] * width for _ in range(height)]
+        self.attrs = [[''] * width for _ in range(height)]
+        self._front = None  # (chars, attrs) as last presented, None to redraw everything
+        self.frames = 0
+        self.bytes_written = 0
+        self.last_bytes = 0
+        self.present_time = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Restore the default attribute and cursor, leaving the cursor below the frame"""
+        self._write(f'{CSI}0m{CSI}{self.height + 1};1H{CSI}?25h\n')
+
+    def _write(self, data):
+        stream = self.stream or sys.stdout
+        stream.write(data)
+        stream.flush()
+
+    def invalidate(self):
+        """Redraw the whole screen on the next present, e.g. after something else wrote to it"""
+        self._front = None
+
+    def clear(self, char=' ', attr=''):
+        """Fill the back buffer"""
+        for row in self.chars:
+            row[:] = [char] * self.width
+        for row in self.attrs:
+            row[:] = [attr] * self.width
+
+    def put(self, x, y, char, attr=''):
+        """Set one cell; cells off the grid are ignored"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.chars[y][x] = char
+            self.attrs[y][x] = attr
+
+    def text(self, x, y, string, attr=''):
+        """Write string left to right from (x, y), clipped to the grid"""
+        if not 0 <= y < self.height:
+            return
+        for i, char in enumerate(string, x):
+            if 0 <= i < self.width:
+                self.chars[y][i] = char
+                self.attrs[y][i] = attr
+
+    def blit(self, rows, x=0, y=0, attrs=''):
+        """Copy rows of characters (strings or lists) to (x, y); attrs is one attribute or rows of them"""
+        for dy, row in enumerate(rows):
+            row_attrs = attrs if isinstance(attrs, str) else attrs[dy]
+            for dx, char in enumerate(row):
+                self.put(x + dx, y + dy, char, row_attrs if isinstance(row_attrs, str) else row_attrs[dx])
+
+    def diff(self):
+        """Escape sequences turning the front buffer into the back buffer"""
+        out = []
+        front = self._front
+        if front is None:
+            out.append(f'{CSI}?25l{CSI}0m{CSI}2J')  # Hide the cursor and clear
+        current = None  # Attribute in effect on the terminal, None if unknown
+        for y in range(self.height):
+            chars, attrs = self.chars[y], self.attrs[y]
+            if front is not None and front[0][y] == chars and front[1][y] == attrs:
+                continue
+            if not all(map(is_narrow, chars)) or (front is not None and not all(map(is_narrow, front[0][y]))):
+                out.append(f'{CSI}{y + 1};1H')
+                for char, attr in zip(chars, attrs):
+                    if attr != current:
+                        out.append(sgr(attr))
+                        current = attr
+                    out.append(char)
+                if current:
+                    out.append(sgr(''))
+                    current = ''
+                out.append(f'{CSI}K')
+                continue
+
+            old_chars = old_attrs = None
+            if front is not None:
+                old_chars, old_attrs = front[0][y], front[1][y]
+            cursor = None  # Column the terminal cursor is at in this row, if known
+            for x in range(self.width):
+                char, attr = chars[x], attrs[x]
+                if old_chars is not None and old_chars[x] == char and old_attrs[x] == attr:
+                    continue
+                if cursor != x:
+                    gap = range(cursor, x) if cursor is not None and x - cursor <= MAX_GAP else None
+                    if gap is not None and all(attrs[i] == current for i in gap):
+                        out.extend(chars[i] for i in gap)
+                    else:
+                        out.append(f'{CSI}{y + 1};{x + 1}H')
+                if attr != current:
+                    out.append(sgr(attr))
+                    current = attr
+                out.append(char)
+                cursor = x + 1
+        if current:
+            out.append(f'{CSI}0m')
+        return ''.join(out)
+
+    def present(self):
+        """Write the back buffer to the terminal in one write; returns the bytes sent"""
+        start = time.perf_counter()
+        frame = self.diff()
+        if frame:
+            self._write(frame)
+        self._front = ([row[:] for row in self.chars], [row[:] for row in self.attrs])
+        self.last_bytes = len(frame.encode('utf-8'))
+        self.bytes_written += self.last_bytes
+        self.frames += 1
+        self.present_time += time.perf_counter() - start
+        return self.last_bytes
+
+    def stats(self):
+        """Frames presented, average bytes per frame and presents/sec"""
+        return {
+            'frames': self.frames,
+            'bytes_per_frame': self.bytes_written / self.frames if self.frames else 0.0,
+            'last_bytes': self.last_bytes,
+            'present_fps': self.frames / self.present_time if self.present_time else 0.0,
+        }
+
+
+# Benchmark ------------------------------------------------------------------
+
+def _matrix(diff_render):
+    clock = load_script('0104_matrix.py').MatrixClock(diff_render=diff_render)
+
+    def frame():
+        clock.update_rain()
+        clock.render_frame()
+    return frame
+
+
+def _fractal(diff_render):
+    tree = load_script('86_fractal.py').FractalTree(diff_render=diff_render)
+    return tree.draw_frame
+
+
+def _creatures(diff_render):
+    ecosystem = load_script('0105_creature.py').Ecosystem(rng=random.Random(0), diff_render=diff_render)
+
+    def frame():
+        ecosystem.update()
+        ecosystem.render()
+    return frame
+
+
+def _dna(diff_render):
+    return load_script('85_dna.py').DNAHelix(diff_render=diff_render).render
+
+
+# name -> builder taking diff_render (False for the old clear-and-print path) and returning one frame
+ANIMATIONS = {
+    'matrix': _matrix,
+    'fractal': _fractal,
+    'creatures': _creatures,
+    'dna': _dna,
+}
+
+
+class _CountingStream(io.TextIOBase):
+    """Discards text, counting the UTF-8 bytes and write calls"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.writes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.bytes += len(text.encode('utf-8'))
+        self.writes += 1
+        return len(text)
+
+
+@contextmanager
+def _silenced_fd():
+    """Point file descriptor 1 at /dev/null, so 'clear' run through the shell stays quiet"""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 1)
+        yield
+    finally:
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def benchmark(names=None, frames=100, seed=0):
+    """Bytes and writes per frame, and frames/sec, for each animation with and without a renderer"""
+    results = []
+    for name in names or sorted(ANIMATIONS):
+        for mode in ('clear', 'diff'):
+            random.seed(seed)
+            stream = _CountingStream()
+            with _silenced_fd(), redirect_stdout(stream):
+                frame = ANIMATIONS[name](mode == 'diff')
+                start = time.perf_counter()
+                for _ in range(frames):
+                    frame()
+                elapsed = time.perf_counter() - start
+            results.append({
+                'animation': name,
+                'mode': mode,
+                'frames': frames,
+                'bytes_per_frame': stream.bytes / frames,
+                'writes_per_frame': stream.writes / frames,
+                'fps': frames / elapsed if elapsed else math.inf,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff-based terminal rendering benchmark')
+    parser.add_argument('animations', nargs='*',
+                        help=f'Animations to run (default: all of {", ".join(sorted(ANIMATIONS))})')
+    parser.add_argument('--frames', type=int, default=100, help='Frames per measurement (default: 100)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+    unknown = [name for name in args.animations if name not in ANIMATIONS]
+    if unknown:
+        parser.error(f"unknown animation {', '.join(map(repr, unknown))} "
+                     f"(choose from {', '.join(sorted(ANIMATIONS))})")
+
+    print(json.dumps(benchmark(args.animations, args.frames, args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Render escape-time fractals as tiles on a pool of worker processes.
+
+Tiles are streamed back in the order they finish, so a caller can show
+partial images during deep zooms. Run directly to benchmark tiles/sec:
+
+    python tile_renderer.py --workers 1 2 4 --max-iter 256 1024 4096
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from escape_time import escape_time, mandelbrot_counts
+
+
+def tile_bounds(width, height, tile_size):
+    """(x0, y0, x1, y1) for every tile covering a width x height image, row by row"""
+    return [(x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+            for y0 in range(0, height, tile_size)
+            for x0 in range(0, width, tile_size)]
+
+
+def render_tile(job):
+    """Escape counts for one tile; runs in a worker process"""
+    bounds, real, imag, max_iter, julia_c, options = job
+    points = real[None, :] + 1j * imag[:, None]
+    if julia_c is None:
+        counts = mandelbrot_counts(points, max_iter, **options)
+    else:
+        counts = escape_time(points, julia_c, max_iter, periodicity=options['periodicity'])
+    return bounds, counts
+
+
+class TiledRenderer:
+    """Splits a viewport into tiles and renders them on a process pool.
+
+    The main cardioid and period-2 bulb are skipped analytically and interior
+    orbits stop early once they are seen to cycle. With workers <= 1 tiles
+    are rendered in this process, which keeps the same streaming interface.
+    """
+
+    def __init__(self, workers=None, tile_size=64, skip_interior=True, periodicity=True):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.tile_size = tile_size
+        self.skip_interior = skip_interior
+        self.periodicity = periodicity
+        self.pool = multiprocessing.Pool(self.workers) if self.workers > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def _jobs(self, xmin, xmax, ymin, ymax, width, height, max_iter, julia_c, endpoint):
+        # Axes are built once for the whole image so tiles agree with an untiled render
+        if endpoint:
+            real = np.linspace(xmin, xmax, width)
+            imag = np.linspace(ymin, ymax, height)
+        else:
+            real = xmin + (np.arange(width) / width) * (xmax - xmin)
+            imag = ymin + (np.arange(height) / height) * (ymax - ymin)
+        options = {'periodicity': self.periodicity}
+        if julia_c is None:
+            options['skip_interior'] = self.skip_interior
+        return [((x0, y0, x1, y1), real[x0:x1], imag[y0:y1], max_iter, julia_c, options)
+                for x0, y0, x1, y1 in tile_bounds(width, height, self.tile_size)]
+
+    def iter_tiles(self, xmin, xmax, ymin, ymax, width, height, max_iter,
+                   julia_c=None, endpoint=True):
+        """Yield ((x0, y0, x1, y1), counts) for each tile as soon as it is done"""
+        jobs = self._jobs(xmin, xmax, ymin, ymax, width, height, max_iter, julia_c, endpoint)
+        if self.pool is None:
+            for job in jobs:
+                yield render_tile(job)
+        else:
+            yield from self.pool.imap_unordered(render_tile, jobs)
+
+    def render(self, xmin, xmax, ymin, ymax, width, height, max_iter,
+               julia_c=None, endpoint=True):
+        """Escape counts for the whole viewport, shape (height, width)"""
+        counts = np.empty((height, width), dtype=np.int64)
+        for (x0, y0, x1, y1), tile in self.iter_tiles(xmin, xmax, ymin, ymax, width, height,
+                                                      max_iter, julia_c, endpoint):
+            counts[y0:y1, x0:x1] = tile
+        return counts
+
+
+def benchmark(workers=(1, 2, 4), max_iters=(256, 1024, 4096), width=512, height=512,
+              tile_size=64, viewport=(-0.7533 - 0.01, -0.7533 + 0.01, 0.1138 - 0.01, 0.1138 + 0.01),
+              repeats=1):
+    """Tiles/sec for every combination of worker count and max_iter"""
+    results = []
+    for count in workers:
+        with TiledRenderer(count, tile_size) as renderer:
+            renderer.render(*viewport, tile_size, tile_size, 16)  # Start the workers
+            for max_iter in max_iters:
+                tiles = 0
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    for _ in renderer.iter_tiles(*viewport, width, height, max_iter):
+                        tiles += 1
+                elapsed = time.perf_counter() - start
+                results.append({
+                    'workers': count,
+                    'max_iter': max_iter,
+                    'tiles': tiles,
+                    'elapsed_s': elapsed,
+                    'tiles_per_sec': tiles / elapsed if elapsed else 0.0,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiled fractal renderer benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='Worker counts to compare (default: 1 2 4)')
+    parser.add_argument('--max-iter', type=int, nargs='+', default=[256, 1024, 4096],
+                        help='Iteration limits to compare (default: 256 1024 4096)')
+    parser.add_argument('--size', type=int, default=512, help='Image width and height (default: 512)')
+    parser.add_argument('--tile-size', type=int, default=64, help='Tile edge in pixels (default: 64)')
+    parser.add_argument('--center', type=float, nargs=2, default=[-0.7533, 0.1138],
+                        help='Viewport centre (default: Elephant Valley)')
+    parser.add_argument('--scale', type=float, default=0.01, help='Viewport half-width (default: 0.01)')
+    parser.add_argument('--repeats', type=int, default=1, help='Renders per measurement (default: 1)')
+    args = parser.parse_args()
+
+    cx, cy = args.center
+    viewport = (cx - args.scale, cx + args.scale, cy - args.scale, cy + args.scale)
+    results = benchmark(args.workers, args.max_iter, args.size, args.size,
+                        args.tile_size, viewport, args.repeats)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import math
+import numpy as np
+
+
+class TrailBuffer:
+    """Preallocated ring buffers holding a trail of 2-D points for each of N bodies.
+
+    A new point is only kept when the body has moved at least min_distance
+    from the last kept point, or when its heading has turned by more than
+    max_turn radians, so straight stretches are stored sparsely and bends
+    keep their detail. Memory is fixed at N x capacity points.
+    """
+
+    def __init__(self, bodies, capacity=500, min_distance=0.0, max_turn=None):
+        self.capacity = capacity
+        self.min_distance = min_distance
+        self.cos_max_turn = math.cos(max_turn) if max_turn is not None else None
+        self.points = np.zeros((bodies, capacity, 2))
+        self.count = np.zeros(bodies, dtype=np.int64)
+        self.head = np.zeros(bodies, dtype=np.int64)  # Slot for each body's next point
+
+    def __len__(self):
+        return len(self.points)
+
+    def clear(self):
+        """Forget every trail"""
+        self.count[:] = 0
+        self.head[:] = 0
+
+    def _last(self, back):
+        """Point recorded `back` steps ago for every body"""
+        rows = np.arange(len(self.points))
+        return self.points[rows, (self.head - back) % self.capacity]
+
+    def record(self, positions):
+        """Offer the current (N, 2) positions; returns the mask of bodies that kept a point"""
+        positions = np.asarray(positions, dtype=float)
+        step = positions - self._last(1)
+        dist_sq = (step ** 2).sum(axis=1)
+
+        keep = (self.count == 0) | (dist_sq >= self.min_distance ** 2)
+        if self.cos_max_turn is not None:
+            # Compare the heading since the last kept point with the previous segment
+            previous = self._last(1) - self._last(2)
+            dot = (previous * step).sum(axis=1)
+            norms = np.sqrt((previous ** 2).sum(axis=1) * dist_sq)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                turned = (norms > 0) & (dot / norms < self.cos_max_turn)
+            keep |= turned & (self.count >= 2)
+        keep &= (dist_sq > 0) | (self.count == 0)
+
+        rows = np.flatnonzero(keep)
+        self.points[rows, self.head[rows]] = positions[rows]
+        self.head[rows] = (self.head[rows] + 1) % self.capacity
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.capacity)
+        return keep
+
+    def ordered(self, i):
+        """Trail of body i, oldest point first"""
+        n = self.count[i]
+        return self.points[i, (self.head[i] - n + np.arange(n)) % self.capacity]
+
+    def screen_points(self, scale, offset_x, offset_y):
+        """Every trail transformed to screen space in one pass.
+
+        Returns an (N, capacity, 2) array with each body's points in order,
+        oldest first, padded at the end; use count[i] to slice.
+        """
+        slots = (self.head[:, None] - self.count[:, None] + np.arange(self.capacity)) % self.capacity
+        ordered = np.take_along_axis(self.points, slots[:, :, None], axis=1)
+        return ordered * scale + np.array([offset_x, offset_y])
+
+    def nbytes(self):
+        """Bytes held by the buffers"""
+        return self.points.nbytes + self.count.nbytes + self.head.nbytes